@@ -0,0 +1,82 @@
+"""
+Adaptive shot allocation: submit jobs in rounds until chosen outcome probabilities are precise enough
+"""
+
+import math
+import numpy as np
+from config import DEFAULT_TARGET_CI_WIDTH, ADAPTIVE_PILOT_JOBS, ADAPTIVE_MAX_ROUND_JOBS
+from result_statistics import wilson_interval
+
+class PrecisionTarget:
+    """Stop a run once the Wilson intervals of the chosen outcomes are at most ``width`` wide
+    
+    ``outcomes`` are bitstrings whose probabilities must be that precise in
+    every circuit; when empty, each circuit's leading outcome is used. The
+    first round submits ``pilot_jobs`` jobs; later rounds are sized from the
+    current estimates and never add more than ``max_round_jobs``.
+    """
+    
+    def __init__(self, width=DEFAULT_TARGET_CI_WIDTH, outcomes=None, pilot_jobs=ADAPTIVE_PILOT_JOBS,
+                 max_round_jobs=ADAPTIVE_MAX_ROUND_JOBS):
+        invalid = [label for label in outcomes or [] if not label or set(label) - {'0', '1'}]
+        if invalid:
+            raise ValueError(f"Not a bitstring: {', '.join(map(repr, invalid))}")
+        self.width = width
+        self.outcomes = list(outcomes or [])
+        self.pilot_jobs = pilot_jobs
+        self.max_round_jobs = max_round_jobs
+    
+    def as_params(self):
+        """JSON-friendly form recorded with the run"""
+        return {'width': self.width, 'outcomes': self.outcomes}
+    
+    def limiting(self, statistics):
+        """``(label, width)`` of the target outcome with the widest interval in a ``RunStatistics``"""
+        pooled = statistics.pooled()
+        total_shots = pooled['total_shots']
+        if not total_shots:
+            return (self.outcomes or [None])[0], 1.0
+        
+        if self.outcomes:
+            # Compare by value so "1" and "01" name the same outcome
+            positions = {int(label, 2): position for position, label in enumerate(pooled['labels'])}
+            labels = self.outcomes
+            counts = [
+                pooled['counts'][positions[int(label, 2)]] if int(label, 2) in positions else 0
+                for label in labels
+            ]
+        else:
+            labels, counts = pooled['labels'][:1], pooled['counts'][:1]
+        
+        low, high = wilson_interval(counts, total_shots, statistics.confidence)
+        widest = int(np.argmax(high - low))
+        return labels[widest], float(high[widest] - low[widest])
+    
+    def met(self, statistics_by_circuit):
+        """Whether every circuit has reached the target"""
+        return bool(statistics_by_circuit) and all(
+            self.limiting(statistics)[1] <= self.width for statistics in statistics_by_circuit.values()
+        )
+    
+    def next_round(self, statistics_by_circuit, shots, jobs_done, budget):
+        """Jobs to submit next: 0 once the target is met or ``budget`` jobs have run
+        
+        Interval widths shrink with the square root of the shots, so the
+        shots still missing for the slowest circuit are estimated from its
+        current width and rounded up to whole jobs.
+        """
+        remaining = budget - jobs_done
+        if remaining <= 0:
+            return 0
+        if not jobs_done or not statistics_by_circuit:
+            return min(self.pilot_jobs, remaining)
+        
+        needed = 0
+        for statistics in statistics_by_circuit.values():
+            _, width = self.limiting(statistics)
+            if width > self.width:
+                missing_shots = statistics.total_shots * ((width / self.width) ** 2 - 1)
+                needed = max(needed, math.ceil(missing_shots / shots))
+        if not needed:
+            return 0
+        return max(1, min(needed, remaining, self.max_round_jobs))
\ No newline at end of file
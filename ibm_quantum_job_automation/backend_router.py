@@ -0,0 +1,117 @@
+"""
+Queue-aware routing of runs to the least-loaded IBM Quantum backend
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import IBM_BACKENDS, BACKEND_STATUS_TTL, BACKEND_STATUS_WORKERS, SECONDS_PER_PENDING_JOB
+from service_pool import hash_token, is_auth_error, service_pool
+
+def fetch_snapshot(backend_name, backend):
+    """Read operational state, queue length and width from a backend handle"""
+    status = backend.status()
+    return {
+        'name': backend_name,
+        'operational': bool(getattr(status, 'operational', True)),
+        'pending_jobs': int(getattr(status, 'pending_jobs', 0) or 0),
+        'num_qubits': int(backend.num_qubits),
+        'status_msg': getattr(status, 'status_msg', '') or '',
+        'error': None
+    }
+
+def _failed_snapshot(backend_name, error):
+    return {
+        'name': backend_name,
+        'operational': False,
+        'pending_jobs': None,
+        'num_qubits': None,
+        'status_msg': '',
+        'error': str(error)
+    }
+
+class BackendStatusCache:
+    """Short-lived status snapshots keyed by hashed token and backend name"""
+    
+    def __init__(self, ttl=BACKEND_STATUS_TTL, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._snapshots = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._snapshots.get(key)
+            if entry is None or self._clock() - entry[1] >= self.ttl:
+                return None
+            return entry[0]
+    
+    def put(self, key, snapshot):
+        with self._lock:
+            self._snapshots[key] = (snapshot, self._clock())
+    
+    def clear(self):
+        with self._lock:
+            self._snapshots.clear()
+
+status_cache = BackendStatusCache()
+
+def get_backend_snapshots(ibm_api_key, backend_names=IBM_BACKENDS, backend_getter=None, cache=status_cache):
+    """Status snapshots for every candidate backend, fetched concurrently
+    
+    Fresh snapshots come from the cache; the rest are fetched in parallel.
+    ``backend_getter(token, name)`` defaults to the shared service pool and
+    may be replaced with a stub returning objects with ``status()`` and
+    ``num_qubits``. A backend that cannot be reached is reported as not
+    operational.
+    """
+    backend_getter = backend_getter or service_pool.get_backend
+    account = hash_token(ibm_api_key or '')
+    snapshots = {name: cache.get((account, name)) for name in backend_names}
+    stale = [name for name, snapshot in snapshots.items() if snapshot is None]
+    
+    def fetch(name):
+        try:
+            return fetch_snapshot(name, backend_getter(ibm_api_key, name))
+        except Exception as e:
+            if is_auth_error(e):
+                service_pool.invalidate(ibm_api_key)
+            return _failed_snapshot(name, e)
+    
+    if stale:
+        with ThreadPoolExecutor(max_workers=min(BACKEND_STATUS_WORKERS, len(stale))) as executor:
+            for name, snapshot in zip(stale, executor.map(fetch, stale)):
+                if snapshot['error'] is None:
+                    cache.put((account, name), snapshot)
+                snapshots[name] = snapshot
+    
+    return [snapshots[name] for name in backend_names]
+
+def expected_wait(snapshot, seconds_per_job=SECONDS_PER_PENDING_JOB):
+    """Estimated queue wait in seconds from the number of pending jobs"""
+    return snapshot['pending_jobs'] * seconds_per_job
+
+def rank_backends(snapshots, num_qubits):
+    """Operational backends that fit the circuit, lowest expected wait first"""
+    usable = [
+        snapshot for snapshot in snapshots
+        if snapshot['operational'] and snapshot['num_qubits'] >= num_qubits
+    ]
+    return sorted(usable, key=lambda snapshot: (expected_wait(snapshot), snapshot['name']))
+
+def _unusable_reason(snapshot):
+    if snapshot['error']:
+        return snapshot['error']
+    if not snapshot['operational']:
+        return snapshot['status_msg'] or "offline"
+    return f"{snapshot['num_qubits']} qubits"
+
+def select_backend(ibm_api_key, num_qubits, backend_names=IBM_BACKENDS, backend_getter=None,
+                   cache=status_cache):
+    """Name of the least-loaded backend that can run a circuit of this width"""
+    snapshots = get_backend_snapshots(ibm_api_key, backend_names, backend_getter, cache)
+    ranked = rank_backends(snapshots, num_qubits)
+    if not ranked:
+        reasons = ', '.join(f"{s['name']} ({_unusable_reason(s)})" for s in snapshots)
+        raise ValueError(f"No operational backend fits {num_qubits} qubits: {reasons}")
+    return ranked[0]['name']
\ No newline at end of file
@@ -0,0 +1,38 @@
+"""
+Backend layer resolving backend names to IBM Quantum hardware or local simulators
+"""
+
+import threading
+from config import LOCAL_BACKENDS
+from service_pool import service_pool
+from dependencies import load_module
+
+_local_backends = {}
+_local_lock = threading.Lock()
+
+def is_local_backend(backend_name):
+    """Check whether a backend runs locally without an IBM Quantum token"""
+    return backend_name in LOCAL_BACKENDS
+
+def _create_local_backend(backend_name):
+    """Instantiate a local simulator or fake backend"""
+    class_name = LOCAL_BACKENDS[backend_name]
+    if class_name == "AerSimulator":
+        return load_module('qiskit_aer').AerSimulator()
+    
+    fake_provider = load_module('qiskit_ibm_runtime.fake_provider')
+    return getattr(fake_provider, class_name)()
+
+def get_backend(backend_name, ibm_api_key=None):
+    """Return a backend handle usable with the runtime Sampler
+    
+    Local backends are created once per process; hardware backends come from
+    the shared service pool.
+    """
+    if is_local_backend(backend_name):
+        with _local_lock:
+            if backend_name not in _local_backends:
+                _local_backends[backend_name] = _create_local_backend(backend_name)
+            return _local_backends[backend_name]
+    
+    return service_pool.get_backend(ibm_api_key, backend_name)
\ No newline at end of file
@@ -0,0 +1,10 @@
+"""
+Benchmark suite for the job pipeline, run against a fake Sampler
+
+Run from the application directory:
+    python -m benchmarks --repeats 5 --latency 0.05 --output bench.json
+"""
+
+from benchmarks.fake_runtime import FakeSampler, FakeJob, fake_sampler_factory
+from benchmarks.scenarios import SCENARIOS
+from benchmarks.runner import run_benchmarks, run_scenario
\ No newline at end of file
@@ -0,0 +1,47 @@
+"""
+Command line entry point: python -m benchmarks
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the job pipeline against a fake Sampler")
+    parser.add_argument("--scenario", action="append", dest="scenarios",
+                        help="Scenario name to run (repeatable, default: all)")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed repetitions per stage")
+    parser.add_argument("--latency", type=float, default=0.0, help="Fake job latency in seconds")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--list", action="store_true", help="List the scenarios and exit")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    
+    # Keep benchmark runs out of the real job ledger and export directory
+    workdir = tempfile.mkdtemp(prefix="qjob-bench-")
+    os.environ.setdefault("JOB_STORE_PATH", os.path.join(workdir, "job_store.sqlite3"))
+    os.environ.setdefault("RESULTS_EXPORT_DIR", "")
+    
+    from benchmarks.scenarios import SCENARIOS
+    if args.list:
+        for scenario in SCENARIOS:
+            print(json.dumps(scenario))
+        return 0
+    
+    from benchmarks.runner import run_benchmarks
+    report = run_benchmarks(args.scenarios, repeats=args.repeats, latency=args.latency)
+    
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
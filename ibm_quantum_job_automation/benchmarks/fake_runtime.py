@@ -0,0 +1,86 @@
+"""
+Fake Sampler producing synthetic histograms after a configurable latency
+"""
+
+import itertools
+import threading
+import time
+import numpy as np
+
+class FakeJob:
+    """Runtime job stand-in whose result becomes available after ``latency`` seconds"""
+    
+    _ids = itertools.count()
+    
+    def __init__(self, result, latency):
+        self._job_id = f"fake-{next(self._ids)}"
+        self._result = result
+        self._ready_at = time.perf_counter() + latency
+        self._cancelled = threading.Event()
+    
+    def job_id(self):
+        return self._job_id
+    
+    def status(self):
+        if self._cancelled.is_set():
+            return "CANCELLED"
+        return "DONE" if time.perf_counter() >= self._ready_at else "RUNNING"
+    
+    def result(self):
+        remaining = self._ready_at - time.perf_counter()
+        if remaining > 0 and self._cancelled.wait(remaining):
+            raise RuntimeError("Job cancelled")
+        return self._result
+    
+    def cancel(self):
+        self._cancelled.set()
+
+class FakeSampler:
+    """Sampler returning random counts over at most ``histogram_size`` outcomes
+    
+    Each classical register gets its own BitArray, shaped like the PUB's
+    parameter values, so every execution mode and sweeps work unchanged.
+    """
+    
+    def __init__(self, mode=None, latency=0.0, histogram_size=16, seed=1234):
+        self.mode = mode
+        self.latency = latency
+        self.histogram_size = histogram_size
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+    
+    def _bit_array(self, num_bits, shape, shots):
+        from qiskit.primitives.containers import BitArray
+        
+        with self._lock:
+            # Outcomes are drawn below 2**62 so they stay in int64
+            distinct = min(self.histogram_size, 2 ** min(num_bits, 62))
+            support = self._rng.choice(2 ** min(num_bits, 62), size=distinct, replace=False)
+            samples = support[self._rng.integers(0, distinct, size=shape + (shots,))]
+        
+        num_bytes = (num_bits + 7) // 8
+        # Big-endian bytes per shot, as BitArray stores them
+        shifts = np.arange(num_bytes - 1, -1, -1, dtype=np.uint64) * np.uint64(8)
+        array = (samples[..., None].astype(np.uint64) >> np.minimum(shifts, np.uint64(63))) & np.uint64(0xFF)
+        array = np.where(shifts < 64, array, 0).astype(np.uint8)
+        return BitArray(array, num_bits)
+    
+    def run(self, pubs, shots=None):
+        from qiskit.primitives.containers import DataBin, PrimitiveResult, SamplerPubResult
+        
+        pub_results = []
+        for pub in pubs:
+            circuit, values = (pub[0], pub[1]) if isinstance(pub, tuple) else (pub, None)
+            shape = tuple(np.shape(values)[:-1]) if values is not None else ()
+            data = {
+                register.name: self._bit_array(register.size, shape, shots)
+                for register in circuit.cregs
+            }
+            pub_results.append(SamplerPubResult(DataBin(shape=shape, **data)))
+        return FakeJob(PrimitiveResult(pub_results), self.latency)
+
+def fake_sampler_factory(latency=0.0, histogram_size=16, seed=1234):
+    """``sampler_factory`` for ``execute_quantum_circuit`` building FakeSamplers"""
+    def factory(mode):
+        return FakeSampler(mode, latency=latency, histogram_size=histogram_size, seed=seed)
+    return factory
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""
+Benchmark runner timing the job pipeline against the fake Sampler
+"""
+
+import platform
+import time
+import tracemalloc
+from datetime import datetime
+import numpy as np
+from benchmarks.fake_runtime import fake_sampler_factory
+from benchmarks.scenarios import SCENARIOS, scenario_qasm, scenario_response
+
+BENCHMARK_BACKEND = "aer_simulator"
+
+def measure(fn, repeats):
+    """Time ``repeats`` warm calls of ``fn`` and one traced call for peak memory
+    
+    The first call is reported separately as ``cold_ms`` because it fills
+    the parse and compile caches.
+    """
+    start = time.perf_counter()
+    fn()
+    cold = time.perf_counter() - start
+    
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    timings_ms = np.array(timings) * 1000
+    return {
+        'cold_ms': round(cold * 1000, 3),
+        'p50_ms': round(float(np.percentile(timings_ms, 50)), 3),
+        'p95_ms': round(float(np.percentile(timings_ms, 95)), 3),
+        'mean_ms': round(float(timings_ms.mean()), 3),
+        'peak_mem_mb': round(peak / 2 ** 20, 3)
+    }
+
+def run_scenario(scenario, repeats=5, latency=0.0):
+    """Benchmark every pipeline stage for one scenario"""
+    from quantum_service import execute_quantum_circuit
+    from llm_service import extract_qasm_from_response
+    from utils import get_results_csv, calculate_success_metrics
+    from adaptive_sampling import PrecisionTarget
+    
+    qasm_code = scenario_qasm(scenario['num_qubits'])
+    response = scenario_response(qasm_code)
+    sampler_factory = fake_sampler_factory(latency=latency, histogram_size=scenario['histogram_size'])
+    # Adaptive scenarios treat jobs_count as the budget
+    precision = PrecisionTarget(scenario['target_width']) if 'target_width' in scenario else None
+    rows = []
+    
+    def execute():
+        results, status = execute_quantum_circuit(
+            qasm_code, '', BENCHMARK_BACKEND, scenario['shots'], scenario['jobs_count'],
+            execution_mode=scenario.get('execution_mode', 'independent'),
+            max_in_flight=scenario.get('max_in_flight', 5),
+            progress_callback=lambda completed, total, row: None,
+            sampler_factory=sampler_factory,
+            precision=precision
+        )
+        if status != "Success":
+            raise RuntimeError(f"Scenario {scenario['name']} failed: {status}")
+        rows[:] = results
+    
+    stages = {'execute_quantum_circuit': measure(execute, repeats)}
+    jobs_per_second = len(rows) / (stages['execute_quantum_circuit']['p50_ms'] / 1000)
+    stages['execute_quantum_circuit']['throughput_jobs_per_s'] = round(jobs_per_second, 1)
+    if precision:
+        stages['execute_quantum_circuit']['jobs_run'] = len(rows)
+    
+    stages['extract_qasm_from_response'] = measure(lambda: extract_qasm_from_response(response), repeats)
+    stages['get_results_csv'] = measure(lambda: get_results_csv(rows).close(), repeats)
+    stages['calculate_success_metrics'] = measure(lambda: calculate_success_metrics(rows), repeats)
+    
+    return {
+        'scenario': scenario,
+        'latency_s': latency,
+        'repeats': repeats,
+        'stages': stages
+    }
+
+def run_benchmarks(names=None, repeats=5, latency=0.0):
+    """Run the selected scenarios (all by default) and build the JSON report"""
+    import qiskit
+    
+    selected = [s for s in SCENARIOS if not names or s['name'] in names]
+    unknown = set(names or ()) - {s['name'] for s in selected}
+    if unknown:
+        raise ValueError(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+    
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'qiskit': qiskit.__version__,
+            'backend': BENCHMARK_BACKEND
+        },
+        'results': [run_scenario(scenario, repeats, latency) for scenario in selected]
+    }
\ No newline at end of file
@@ -0,0 +1,38 @@
+"""
+Benchmark scenarios covering job count, shots, circuit width and histogram size
+"""
+
+SCENARIOS = [
+    {'name': 'small', 'jobs_count': 10, 'shots': 1024, 'num_qubits': 2, 'histogram_size': 4},
+    {'name': 'many_jobs', 'jobs_count': 50, 'shots': 1024, 'num_qubits': 2, 'histogram_size': 4},
+    {'name': 'many_shots', 'jobs_count': 10, 'shots': 10000, 'num_qubits': 5, 'histogram_size': 32},
+    {'name': 'wide_circuit', 'jobs_count': 10, 'shots': 4096, 'num_qubits': 27, 'histogram_size': 4096},
+    {'name': 'large_histogram', 'jobs_count': 20, 'shots': 10000, 'num_qubits': 16, 'histogram_size': 10000},
+    {'name': 'batched', 'jobs_count': 50, 'shots': 1024, 'num_qubits': 5, 'histogram_size': 32,
+     'execution_mode': 'batched'},
+    # Uniform over 4 outcomes, so the leading outcome has p = 0.25
+    {'name': 'adaptive', 'jobs_count': 200, 'shots': 1024, 'num_qubits': 2, 'histogram_size': 4,
+     'target_width': 0.01},
+]
+
+def scenario_qasm(num_qubits):
+    """OpenQASM 2 circuit putting every qubit in superposition and measuring it"""
+    lines = [
+        'OPENQASM 2.0;',
+        'include "qelib1.inc";',
+        f'qreg q[{num_qubits}];',
+        f'creg c[{num_qubits}];'
+    ]
+    lines.extend(f'h q[{qubit}];' for qubit in range(num_qubits))
+    lines.extend(f'cx q[{qubit}],q[{qubit + 1}];' for qubit in range(num_qubits - 1))
+    lines.append('measure q -> c;')
+    return '\n'.join(lines)
+
+def scenario_response(qasm_code):
+    """Assistant-style response wrapping the circuit in prose and a code fence"""
+    return (
+        "Here is a circuit that entangles every qubit in a chain.\n\n"
+        f"```qasm\n{qasm_code}\n```\n\n"
+        "Each Hadamard creates a superposition and the CNOT chain spreads it. "
+        "Run it with enough shots to see the full distribution."
+    )
\ No newline at end of file
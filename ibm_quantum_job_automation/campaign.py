@@ -0,0 +1,241 @@
+"""
+Headless campaign runner: execute many QASM circuits without the Streamlit UI
+
+Run from the application directory, for example from cron:
+    python campaign.py circuits/ --backend ibm_brisbane --shots 4000 --jobs 10
+    python campaign.py manifest.json --concurrency 8 --export-dir exports/nightly
+    python campaign.py circuits/ --pack --jobs 20
+    python campaign.py circuits/ --reuse --max-age 7200 --jobs 20
+    python campaign.py circuits/ --target-width 0.01 --target-outcomes 00,11 --jobs 200
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+logger = logging.getLogger("campaign")
+
+# Per-circuit settings a manifest entry may override
+ENTRY_OPTIONS = (
+    'backend', 'shots', 'jobs_count', 'execution_mode', 'optimization_level', 'max_in_flight', 'sweep', 'mitigation'
+)
+
+def load_campaign(source, defaults):
+    """Circuits to run from a directory of ``.qasm`` files or a JSON manifest
+    
+    A manifest is a list of entries (or ``{"circuits": [...]}``), each with a
+    ``path`` relative to the manifest or inline ``qasm``, an optional ``name``
+    and any of ``ENTRY_OPTIONS`` overriding ``defaults``.
+    """
+    if os.path.isdir(source):
+        paths = sorted(glob.glob(os.path.join(source, '*.qasm')))
+        entries = [{'path': os.path.basename(path)} for path in paths]
+        base_dir = source
+    else:
+        with open(source) as f:
+            manifest = json.load(f)
+        entries = manifest['circuits'] if isinstance(manifest, dict) else manifest
+        base_dir = os.path.dirname(os.path.abspath(source))
+    
+    circuits = []
+    taken = set()
+    for number, entry in enumerate(entries):
+        circuit = dict(defaults)
+        circuit.update((key, entry[key]) for key in ENTRY_OPTIONS if key in entry)
+        if 'qasm' in entry:
+            circuit['qasm'] = entry['qasm']
+            circuit['name'] = entry.get('name', f"circuit_{number}")
+        else:
+            with open(os.path.join(base_dir, entry['path'])) as f:
+                circuit['qasm'] = f.read()
+            circuit['name'] = entry.get('name', os.path.splitext(os.path.basename(entry['path']))[0])
+        # Names tag result rows, so they must be unique within a campaign
+        if circuit['name'] in taken:
+            circuit['name'] = f"{circuit['name']}_{number}"
+        taken.add(circuit['name'])
+        circuits.append(circuit)
+    return circuits
+
+def pack_circuits(circuits):
+    """Group circuits with identical settings so each group shares its submissions
+    
+    Every job of a group carries one PUB per circuit; sweeps always run alone.
+    """
+    groups = {}
+    for number, circuit in enumerate(circuits):
+        key = ('sweep', number) if circuit.get('sweep') else tuple(circuit.get(option) for option in ENTRY_OPTIONS)
+        groups.setdefault(key, []).append(circuit)
+    return list(groups.values())
+
+def run_group(group, ibm_api_key):
+    """Execute a group of circuits sharing their settings and summarize each circuit"""
+    from quantum_service import execute_circuits
+    from job_store import new_run_id
+    from result_statistics import RunStatistics
+    
+    settings = group[0]
+    names = ', '.join(circuit['name'] for circuit in group)
+    run_id = new_run_id()
+    start = time.perf_counter()
+    
+    def progress(completed, total, row):
+        logger.info("%s: %d/%d rows complete", names, completed, total)
+    
+    results, status = execute_circuits(
+        [(circuit['name'], circuit['qasm']) for circuit in group],
+        ibm_api_key, settings['backend'], settings['shots'], settings['jobs_count'],
+        max_in_flight=settings['max_in_flight'],
+        execution_mode=settings['execution_mode'],
+        optimization_level=settings['optimization_level'],
+        run_id=run_id,
+        progress_callback=progress,
+        sweep=settings.get('sweep'),
+        owner="campaign",
+        mitigation=settings['mitigation'],
+        reuse=settings.get('reuse'),
+        precision=settings.get('precision')
+    )
+    seconds = round(time.perf_counter() - start, 3)
+    
+    summaries = []
+    for circuit in group:
+        rows = [row for row in results if row['circ_name'] == circuit['name']]
+        summary = {
+            'name': circuit['name'],
+            'run_id': run_id,
+            'backend': rows[0]['backend'] if rows else circuit['backend'],
+            'circ_hash': rows[0]['circ_hash'] if rows else None,
+            'status': status,
+            'rows': len(rows),
+            'reused': sum(1 for row in rows if row.get('reused_from')),
+            'seconds': seconds
+        }
+        if settings.get('precision') and rows:
+            # Adaptive runs report the widest target interval they ended with
+            label, width = settings['precision'].limiting(RunStatistics.from_rows(rows))
+            summary['target_outcome'] = label
+            summary['ci_width'] = round(width, 6)
+            summary['target_met'] = width <= settings['precision'].width
+        summaries.append(summary)
+    return summaries
+
+def run_campaign(circuits, ibm_api_key, concurrency, pack=False):
+    """Run circuits concurrently, yielding each summary as its circuit finishes
+    
+    With ``pack`` circuits sharing their settings run as one multi-PUB run.
+    """
+    groups = pack_circuits(circuits) if pack else [[circuit] for circuit in circuits]
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = {executor.submit(run_group, group, ibm_api_key): group for group in groups}
+        for future in as_completed(futures):
+            try:
+                yield from future.result()
+            except Exception as e:
+                for circuit in futures[future]:
+                    yield {'name': circuit['name'], 'status': f"Error: {e}", 'rows': 0}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run a campaign of QASM circuits without the UI")
+    parser.add_argument("source", help="Directory of .qasm files or a JSON manifest")
+    parser.add_argument("--backend", default="aer_simulator",
+                        help="Backend name, a local simulator or 'auto' (default: aer_simulator)")
+    parser.add_argument("--shots", type=int, default=1024)
+    parser.add_argument("--jobs", type=int, default=1, dest="jobs_count", help="Repetitions per circuit")
+    parser.add_argument("--execution-mode", default="independent", choices=["independent", "batched", "session"])
+    parser.add_argument("--optimization-level", type=int, default=1, choices=[0, 1, 2, 3])
+    parser.add_argument("--mitigation", default="none", choices=["none", "backend", "circuits"],
+                        help="Readout-error mitigation source (default: none)")
+    parser.add_argument("--max-in-flight", type=int, default=5, help="Jobs in flight per circuit")
+    parser.add_argument("--concurrency", type=int, default=4, help="Circuits (or packed groups) run at the same time")
+    parser.add_argument("--pack", action="store_true",
+                        help="Submit circuits with identical settings together, one PUB per circuit in each job")
+    parser.add_argument("--reuse", action="store_true",
+                        help="Take repetitions measured on the same backend calibration from the result cache")
+    parser.add_argument("--max-age", type=float, default=None,
+                        help="Oldest cached result to reuse, in seconds (default: RESULT_CACHE_MAX_AGE)")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Submit every job again but still cache the new results")
+    parser.add_argument("--target-width", type=float,
+                        help="Adaptive shot allocation: submit jobs in rounds until every target outcome's "
+                             "confidence interval is this narrow; --jobs becomes the budget")
+    parser.add_argument("--target-outcomes", default="",
+                        help="Comma-separated bitstrings for --target-width (default: each circuit's leading outcome)")
+    parser.add_argument("--token", default=os.environ.get("IBM_QUANTUM_TOKEN", ""),
+                        help="IBM Quantum API token (default: $IBM_QUANTUM_TOKEN)")
+    parser.add_argument("--job-store", help="SQLite job store path (default: JOB_STORE_PATH)")
+    parser.add_argument("--export-dir", help="Directory for per-run Parquet files ('' disables export)")
+    parser.add_argument("--output", help="Write JSON-lines summaries here instead of stdout")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log per-job progress")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s %(name)s %(message)s"
+    )
+    
+    # Storage settings are read by config at import time
+    if args.job_store:
+        os.environ["JOB_STORE_PATH"] = args.job_store
+    if args.export_dir is not None:
+        os.environ["RESULTS_EXPORT_DIR"] = args.export_dir
+    
+    defaults = {
+        'backend': args.backend,
+        'shots': args.shots,
+        'jobs_count': args.jobs_count,
+        'execution_mode': args.execution_mode,
+        'optimization_level': args.optimization_level,
+        'max_in_flight': args.max_in_flight,
+        'mitigation': args.mitigation
+    }
+    if args.target_width:
+        from adaptive_sampling import PrecisionTarget
+        outcomes = [label.strip() for label in args.target_outcomes.split(',') if label.strip()]
+        try:
+            defaults['precision'] = PrecisionTarget(width=args.target_width, outcomes=outcomes)
+        except ValueError as e:
+            logger.error("Invalid --target-outcomes: %s", e)
+            return 2
+    if args.reuse or args.refresh:
+        from result_cache import ReusePolicy
+        from config import RESULT_CACHE_MAX_AGE
+        defaults['reuse'] = ReusePolicy(
+            max_age=RESULT_CACHE_MAX_AGE if args.max_age is None else args.max_age,
+            refresh=args.refresh
+        )
+    circuits = load_campaign(args.source, defaults)
+    if not circuits:
+        logger.error("No circuits found in %s", args.source)
+        return 2
+    
+    output = open(args.output, 'w') if args.output else sys.stdout
+    failed = 0
+    try:
+        for summary in run_campaign(circuits, args.token, args.concurrency, args.pack):
+            if summary['status'] != "Success":
+                failed += 1
+            output.write(json.dumps(summary) + '\n')
+            output.flush()
+    finally:
+        if args.output:
+            output.close()
+    
+    logger.warning("Campaign finished: %d circuits, %d failed", len(circuits), failed)
+    if 'reuse' in defaults:
+        from result_cache import get_result_cache
+        result_cache = get_result_cache()
+        logger.warning(
+            "Result cache: %d jobs reused, %d submitted (%.0f%% hit rate)",
+            result_cache.hits, result_cache.misses, 100 * (result_cache.hit_rate or 0)
+        )
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+Token-budgeted conversation context for the Groq assistant
+"""
+
+from config import (
+    LLM_SYSTEM_PROMPT, CHAT_CONTEXT_TOKENS, CHAT_SUMMARY_TOKENS, CHAT_QASM_TOKENS,
+    CHAT_SUMMARY_LINE_CHARS
+)
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token)"""
+    return len(text) // 4 + 1
+
+def truncate_to_tokens(text, max_tokens, keep='head'):
+    """Cut text to roughly ``max_tokens`` tokens, keeping its head or its tail"""
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    if keep == 'tail':
+        return "…" + text[-max_chars:]
+    return text[:max_chars] + "…"
+
+def summarize_message(message):
+    """One compact line standing in for an evicted chat message"""
+    first_line = next((line.strip() for line in message["content"].splitlines() if line.strip()), "")
+    if len(first_line) > CHAT_SUMMARY_LINE_CHARS:
+        first_line = first_line[:CHAT_SUMMARY_LINE_CHARS] + "…"
+    if "OPENQASM" in message["content"]:
+        first_line += " [QASM code]"
+    role = "User" if message["role"] == "user" else "Assistant"
+    return f"{role}: {first_line}"
+
+def compact_summary(summary, messages, max_tokens=CHAT_SUMMARY_TOKENS):
+    """Fold messages into the running summary, keeping its most recent part"""
+    lines = [summary] if summary else []
+    lines.extend(summarize_message(message) for message in messages)
+    return truncate_to_tokens("\n".join(lines), max_tokens, keep='tail')
+
+def evict_messages(history, summary, limit):
+    """Drop the oldest messages beyond ``limit`` into the summary
+    
+    Returns ``(history, summary)``.
+    """
+    overflow = len(history) - limit
+    if overflow <= 0:
+        return history, summary
+    return history[overflow:], compact_summary(summary, history[:overflow])
+
+def build_messages(user_message, history=(), summary="", qasm=None, budget=CHAT_CONTEXT_TOKENS):
+    """Assemble the request messages within a token budget
+    
+    The system prompt, current editor QASM, summary of older turns and the
+    new message are always sent; recent turns fill the remaining budget,
+    newest first. Turns that do not fit are folded into the summary.
+    """
+    system = LLM_SYSTEM_PROMPT
+    if qasm and qasm.strip():
+        system += "\n\nThe user's current QASM editor contents:\n" + truncate_to_tokens(qasm.strip(), CHAT_QASM_TOKENS)
+    
+    remaining = budget - estimate_tokens(system) - estimate_tokens(user_message)
+    if summary or history:
+        # Room for the summary, which older turns may be folded into
+        remaining -= CHAT_SUMMARY_TOKENS
+    recent = []
+    for message in reversed(history):
+        cost = estimate_tokens(message["content"])
+        if cost > remaining:
+            break
+        recent.append({"role": message["role"], "content": message["content"]})
+        remaining -= cost
+    recent.reverse()
+    
+    older = history[:len(history) - len(recent)]
+    if older:
+        summary = compact_summary(summary, older)
+    if summary:
+        system += "\n\nSummary of the earlier conversation:\n" + summary
+    
+    return [{"role": "system", "content": system}] + recent + [{"role": "user", "content": user_message}]
\ No newline at end of file
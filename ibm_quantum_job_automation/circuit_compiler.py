@@ -0,0 +1,242 @@
+"""
+Compile pipeline for QASM circuits: parse, transpile to the backend ISA and cache
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dependencies import load_module
+from config import (
+    CIRCUIT_CACHE_SIZE, CIRCUIT_CACHE_DIR, DEFAULT_OPTIMIZATION_LEVEL, QASM_PARSE_CACHE_SIZE, CIRCUIT_HASH_CHARS
+)
+
+logger = logging.getLogger(__name__)
+
+def normalize_qasm(qasm_code):
+    """Strip comments, trailing whitespace and blank lines from QASM source"""
+    lines = []
+    for line in qasm_code.splitlines():
+        line = line.split('//', 1)[0].strip()
+        if line:
+            lines.append(line)
+    return '\n'.join(lines)
+
+def is_qasm3(qasm_code):
+    """Check whether the source declares OpenQASM 3"""
+    return normalize_qasm(qasm_code).startswith('OPENQASM 3')
+
+def qasm_hash(qasm_code):
+    """Content hash of the normalized QASM source"""
+    return hashlib.sha256(normalize_qasm(qasm_code).encode('utf-8')).hexdigest()
+
+def circuit_hash(qasm_code):
+    """Short content hash identifying a circuit in results rows"""
+    return qasm_hash(qasm_code)[:CIRCUIT_HASH_CHARS]
+
+class ParseCache:
+    """LRU cache of parsed circuits and parse errors keyed on the QASM content hash"""
+    
+    def __init__(self, maxsize=QASM_PARSE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def parse(self, qasm_code):
+        key = qasm_hash(qasm_code)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if entry is None:
+            entry = _parse_uncached(qasm_code)
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = entry
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        
+        circuit, error = entry
+        if error is not None:
+            raise error
+        return circuit
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+def _parse_uncached(qasm_code):
+    """Parse once, returning ``(circuit, None)`` or ``(None, error)``"""
+    try:
+        if is_qasm3(qasm_code):
+            qasm3 = load_module('qiskit.qasm3')
+            return qasm3.loads(qasm_code), None
+        
+        qasm2 = load_module('qiskit.qasm2')
+        return qasm2.loads(qasm_code, custom_instructions=qasm2.LEGACY_CUSTOM_INSTRUCTIONS), None
+    except Exception as e:
+        return None, e
+
+parse_cache = ParseCache()
+
+def parse_qasm(qasm_code):
+    """Parse OpenQASM 2 or 3 source into a QuantumCircuit
+    
+    OpenQASM 3 ``input float`` declarations become free circuit parameters
+    that can be swept. Circuits are shared through the parse cache, so
+    callers must not modify them.
+    """
+    return parse_cache.parse(qasm_code)
+
+def circuit_parameters(qasm_code):
+    """Names of the free parameters of a circuit, in binding order"""
+    return tuple(parameter.name for parameter in parse_qasm(qasm_code).parameters)
+
+def check_qasm(qasm_code):
+    """Validate QASM source, returning ``(is_valid, message)``"""
+    try:
+        qc = parse_qasm(qasm_code)
+        return True, f"Circuit: {qc.num_qubits} qubits, {qc.depth()} depth"
+    except Exception as e:
+        return False, str(e)
+
+def circuit_cache_key(qasm_code, backend, optimization_level):
+    """Hash the normalized QASM together with the backend and transpile settings"""
+    backend_version = getattr(backend, 'backend_version', None) or ''
+    parts = [
+        normalize_qasm(qasm_code),
+        str(getattr(backend, 'name', backend)),
+        str(backend_version),
+        str(optimization_level)
+    ]
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+class CircuitCache:
+    """LRU cache of transpiled ISA circuits with optional QPY persistence"""
+    
+    def __init__(self, maxsize=CIRCUIT_CACHE_SIZE, cache_dir=CIRCUIT_CACHE_DIR):
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        self._circuits = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.hit_seconds = 0.0
+        self.miss_seconds = 0.0
+        self.last = None
+    
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.qpy")
+    
+    def _load(self, key):
+        """Load a circuit persisted by an earlier process"""
+        if not self.cache_dir or not os.path.exists(self._path(key)):
+            return None
+        from qiskit import qpy
+        try:
+            with open(self._path(key), 'rb') as f:
+                return qpy.load(f)[0]
+        except Exception:
+            return None
+    
+    def _save(self, key, circuit):
+        """Persist a circuit as QPY; failures leave only the in-memory copy"""
+        if not self.cache_dir:
+            return
+        from qiskit import qpy
+        tmp_path = self._path(key) + '.tmp'
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                qpy.dump(circuit, f)
+            os.replace(tmp_path, self._path(key))
+        except Exception as e:
+            logger.warning("Could not write circuit cache entry to %s: %s", self.cache_dir, e)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    
+    def get(self, key):
+        """Return the cached circuit for a key, or None"""
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is not None:
+                self._circuits.move_to_end(key)
+                return circuit
+        
+        circuit = self._load(key)
+        if circuit is not None:
+            self._store(key, circuit)
+        return circuit
+    
+    def _store(self, key, circuit):
+        with self._lock:
+            self._circuits[key] = circuit
+            self._circuits.move_to_end(key)
+            while len(self._circuits) > self.maxsize:
+                self._circuits.popitem(last=False)
+    
+    def put(self, key, circuit):
+        """Add a circuit to memory and, if configured, to disk"""
+        self._store(key, circuit)
+        self._save(key, circuit)
+    
+    def record(self, hit, seconds):
+        """Record the timing of one lookup"""
+        with self._lock:
+            if hit:
+                self.hits += 1
+                self.hit_seconds += seconds
+            else:
+                self.misses += 1
+                self.miss_seconds += seconds
+            self.last = {'hit': hit, 'seconds': seconds}
+    
+    def stats(self):
+        """Hit/miss counters and average lookup time in milliseconds"""
+        with self._lock:
+            return {
+                'size': len(self._circuits),
+                'hits': self.hits,
+                'misses': self.misses,
+                'avg_hit_ms': (self.hit_seconds / self.hits * 1000) if self.hits else 0.0,
+                'avg_miss_ms': (self.miss_seconds / self.misses * 1000) if self.misses else 0.0,
+                'last': self.last
+            }
+    
+    def clear(self):
+        """Drop every in-memory entry"""
+        with self._lock:
+            self._circuits.clear()
+
+# Shared across jobs, reruns and sessions in this process
+circuit_cache = CircuitCache()
+
+def compile_circuit(qasm_code, backend, optimization_level=DEFAULT_OPTIMIZATION_LEVEL):
+    """Parse QASM and transpile it to the backend ISA, reusing cached results"""
+    start = time.perf_counter()
+    key = circuit_cache_key(qasm_code, backend, optimization_level)
+    
+    isa_circuit = circuit_cache.get(key)
+    if isa_circuit is not None:
+        circuit_cache.record(True, time.perf_counter() - start)
+        return isa_circuit
+    
+    generate_preset_pass_manager = load_module('qiskit.transpiler').generate_preset_pass_manager
+    
+    qc = parse_qasm(qasm_code)
+    pass_manager = generate_preset_pass_manager(
+        optimization_level=optimization_level,
+        backend=backend
+    )
+    isa_circuit = pass_manager.run(qc)
+    
+    circuit_cache.put(key, isa_circuit)
+    circuit_cache.record(False, time.perf_counter() - start)
+    return isa_circuit
\ No newline at end of file
@@ -3,6 +3,9 @@ Configuration file for IBM Quantum Circuit JOB Automation
 Contains all constants, default values, and configuration settings
 """
 
+import os
+import tempfile
+
 # Default QASM circuit
 DEFAULT_QASM = """OPENQASM 2.0;
 include "qelib1.inc";
@@ -15,6 +18,117 @@ measure q[0] -> c[0];"""
 DEFAULT_SHOTS = 1024
 DEFAULT_JOBS_COUNT = 10
 
+# Circuit workspace: name of an unnamed circuit and the length of the
+# content hash tagging each circuit's result rows
+DEFAULT_CIRCUIT_NAME = "quantum_circuit"
+CIRCUIT_HASH_CHARS = 12
+
+# Maximum number of jobs submitted to the backend at the same time
+DEFAULT_MAX_IN_FLIGHT = 5
+MAX_IN_FLIGHT_LIMIT = 20
+
+# How repeated jobs are submitted to the backend
+EXECUTION_MODES = {
+    "independent": "Independent jobs",
+    "batched": "One batched job",
+    "session": "Session"
+}
+DEFAULT_EXECUTION_MODE = "independent"
+
+# Readout-error mitigation: where per-qubit assignment matrices come from,
+# the longest a calibration is reused (seconds; a backend recalibration ends it sooner),
+# shots per calibration circuit and the smallest quasi-probability kept for
+# an outcome that was never observed
+READOUT_MITIGATION_MODES = {
+    "none": "Off",
+    "backend": "Backend-reported readout errors",
+    "circuits": "Calibration circuits"
+}
+DEFAULT_READOUT_MITIGATION = "none"
+READOUT_CACHE_TTL = 3600
+READOUT_CALIBRATION_SHOTS = 4000
+READOUT_PRUNE_THRESHOLD = 1e-5
+
+# Transpilation: preset pass manager level and compiled circuit cache
+DEFAULT_OPTIMIZATION_LEVEL = 1
+OPTIMIZATION_LEVELS = [0, 1, 2, 3]
+CIRCUIT_CACHE_SIZE = 64
+QASM_PARSE_CACHE_SIZE = 128  # parsed circuits keyed on the QASM content hash
+CIRCUIT_CACHE_DIR = os.environ.get("CIRCUIT_CACHE_DIR")  # set to persist compiled circuits as QPY
+
+# IBM Quantum channel and how long authenticated services are reused (seconds)
+IBM_CHANNEL = "ibm_cloud"
+SERVICE_CACHE_TTL = 1800
+
+# Background execution engine: concurrent runs per server process, how long
+# finished runs are kept for polling (seconds) and the UI polling interval
+ENGINE_MAX_WORKERS = 4
+ENGINE_RUN_RETENTION = 3600
+RUN_STATUS_REFRESH_SECONDS = 1
+
+# Submission scheduler shared by every session using an IBM Quantum account
+SCHEDULER_ACCOUNT_CONCURRENCY = 10  # jobs in flight per account
+SCHEDULER_SUBMIT_RATE = 2.0  # submissions per second per account
+SCHEDULER_SUBMIT_BURST = 5
+JOB_RETRIES = 3  # retries of a job after a transient failure
+RETRY_BASE_DELAY = 1.0  # seconds, doubled on every retry
+RETRY_MAX_DELAY = 30.0
+
+# Parameter sweeps: largest grid submitted in one PUB and an example circuit
+# (OpenQASM 3 "input" declarations become sweepable parameters)
+MAX_SWEEP_POINTS = 1000
+DEFAULT_SWEEP_POINTS = 11
+SWEEP_EXAMPLE_QASM = """OPENQASM 3.0;
+include "stdgates.inc";
+input float[64] theta;
+qubit[1] q;
+bit[1] c;
+rx(theta) q[0];
+c[0] = measure q[0];"""
+
+# Result export: CSV chunk size, Parquet row group size and the directory
+# each run is streamed to as <run_id>.parquet (empty to disable)
+CSV_CHUNK_ROWS = 5000
+PARQUET_ROW_GROUP_ROWS = 256
+RESULTS_EXPORT_DIR = os.environ.get("RESULTS_EXPORT_DIR", "exports")
+
+# Session results: columnar run tables and views derived from them held in
+# memory per session (MB), runs kept in a session's history, where runs over
+# the memory cap are spilled and after how long an unused spill directory
+# left behind by a session is removed (seconds)
+RESULTS_SESSION_MEMORY_MB = 64
+RESULTS_HISTORY_RUNS = 20
+RESULTS_SPILL_DIR = os.environ.get("RESULTS_SPILL_DIR") or os.path.join(tempfile.gettempdir(), "qjob-results")
+RESULTS_SPILL_MAX_AGE = 24 * 3600
+
+# Local SQLite ledger of submitted jobs and their results
+JOB_STORE_PATH = os.environ.get("JOB_STORE_PATH", "job_store.sqlite3")
+
+# Result reuse: cached rows live in the job store database and are reused
+# for at most this many seconds (a new calibration invalidates them sooner).
+# Backend calibration times are fetched fresh and trusted for at most
+# CALIBRATION_STAMP_TTL seconds
+RESULT_CACHE_MAX_AGE = 24 * 3600
+CALIBRATION_STAMP_TTL = 60
+
+# Per-job timing export: histogram bucket bounds (seconds) and OpenTelemetry spans
+TELEMETRY_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 60, 300, 1800, 3600)
+OTEL_EXPORT = os.environ.get("OTEL_EXPORT", "").lower() in ("1", "true", "yes")
+
+# Repeated-job statistics: confidence level, bootstrap resamples, outcomes
+# analysed per job and weight-matrix cells drawn per bootstrap chunk
+STATS_CONFIDENCE = 0.95
+STATS_BOOTSTRAP_RESAMPLES = 1000
+STATS_TOP_OUTCOMES = 8
+STATS_BOOTSTRAP_CELLS = 2 ** 22
+
+# Adaptive shot allocation: default target interval width, jobs in the pilot
+# round, most jobs added in one round and the largest job budget
+DEFAULT_TARGET_CI_WIDTH = 0.02
+ADAPTIVE_PILOT_JOBS = 2
+ADAPTIVE_MAX_ROUND_JOBS = 20
+ADAPTIVE_MAX_JOBS = 1000
+
 # Available IBM Quantum backends
 IBM_BACKENDS = [
     "ibm_brisbane", 
@@ -23,6 +137,22 @@ IBM_BACKENDS = [
     "ibm_kyoto"
 ]
 
+# Automatic routing to the least-loaded hardware backend
+AUTO_BACKEND = "auto"
+BACKEND_STATUS_TTL = 60  # seconds a status snapshot is reused
+BACKEND_STATUS_WORKERS = 8
+SECONDS_PER_PENDING_JOB = 30  # rough queue wait added by each pending job
+
+# Local backends that run offline through the same Sampler interface
+# (fake backends carry the noise model of the device they mimic)
+LOCAL_BACKENDS = {
+    "aer_simulator": "AerSimulator",
+    "fake_brisbane": "FakeBrisbane",
+    "fake_kyoto": "FakeKyoto",
+    "fake_perth": "FakePerth",
+    "fake_lagos": "FakeLagosV2"
+}
+
 # LLM System prompt for quantum computing assistance
 LLM_SYSTEM_PROMPT = """You are a quantum computing assistant helping users create and modify QASM code for quantum circuits. 
 
@@ -55,4 +185,17 @@ PAGE_CONFIG = {
 # Model configuration for Groq
 GROQ_MODEL = "llama-3.1-8b-instant"
 GROQ_TEMPERATURE = 0.7
-GROQ_MAX_TOKENS = 1000
\ No newline at end of file
+GROQ_MAX_TOKENS = 1000
+GROQ_BASE_URL = os.environ.get("GROQ_BASE_URL")  # point at a local fake server for testing
+
+# Assistant response cache (entries, seconds)
+LLM_CACHE_SIZE = 128
+LLM_CACHE_TTL = 3600
+
+# Chat context window (estimated tokens) and per-session history cap
+CHAT_CONTEXT_TOKENS = 4000
+CHAT_SUMMARY_TOKENS = 400
+CHAT_QASM_TOKENS = 1000
+CHAT_SUMMARY_LINE_CHARS = 120
+CHAT_HISTORY_LIMIT = 100
+CHAT_PAGE_SIZE = 20
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""
+Import-free dependency probing and lazy loading of heavy modules
+"""
+
+import functools
+import importlib
+import importlib.util
+import sys
+import threading
+import time
+
+_import_times = {}
+_import_lock = threading.Lock()
+
+@functools.lru_cache(maxsize=None)
+def is_available(module_name):
+    """Check whether a module is installed without importing it (memoized per process)"""
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        return False
+
+def check_qiskit():
+    """Check if Qiskit is available"""
+    return is_available('qiskit') and is_available('qiskit_ibm_runtime')
+
+def check_groq():
+    """Check if Groq is available"""
+    return is_available('groq')
+
+def load_module(module_name):
+    """Import a module on first use, recording how long the import took"""
+    # A module still initialising on another thread is already in
+    # sys.modules; import_module waits on its import lock instead
+    if module_name in sys.modules:
+        return importlib.import_module(module_name)
+    
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    with _import_lock:
+        _import_times.setdefault(module_name, time.perf_counter() - start)
+    return module
+
+def import_report():
+    """``(module, milliseconds)`` for every lazily loaded module, slowest first"""
+    with _import_lock:
+        times = list(_import_times.items())
+    return sorted(((name, seconds * 1000) for name, seconds in times), key=lambda item: -item[1])
\ No newline at end of file
@@ -0,0 +1,150 @@
+"""
+Background execution engine running quantum jobs independently of Streamlit reruns
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import ENGINE_MAX_WORKERS, ENGINE_RUN_RETENTION, DEFAULT_CIRCUIT_NAME
+from job_store import new_run_id
+from quantum_service import execute_circuits, CancelToken
+from result_statistics import RunStatistics
+
+class RunRecord:
+    """State of one background run, updated by the worker thread"""
+    
+    def __init__(self, run_id, total):
+        self.run_id = run_id
+        self.total = total
+        self.status = "queued"
+        self.message = ""
+        self.completed = 0
+        self.results = []
+        # Per-circuit statistics updated as rows arrive, so the UI never recomputes from scratch
+        self.statistics = {}
+        self.submitted_at = time.time()
+        self.finished_at = None
+        self.cancel_token = CancelToken()
+        self.lock = threading.Lock()
+    
+    def update(self, completed, total, row):
+        """Progress callback handed to execute_quantum_circuit"""
+        with self.lock:
+            self.completed = completed
+            self.total = total
+            self.results.append(row)
+            statistics = self.statistics.setdefault(row['circ_name'], RunStatistics())
+        statistics.add(row)
+    
+    def snapshot(self):
+        """Copy of the run state that is safe to read from the UI thread"""
+        with self.lock:
+            return {
+                'run_id': self.run_id,
+                'status': self.status,
+                'message': self.message,
+                'completed': self.completed,
+                'total': self.total,
+                'results': sorted(self.results, key=lambda row: row['idx']),
+                'statistics': dict(self.statistics),
+                'submitted_at': self.submitted_at,
+                'finished_at': self.finished_at,
+                'finished': self.status in ("done", "failed", "cancelled")
+            }
+
+class ExecutionEngine:
+    """Accept run requests and execute them on a worker pool
+    
+    Runs are addressed by their run ID; the UI polls ``status`` and may call
+    ``cancel`` at any time, which cancels the runtime jobs still in flight.
+    """
+    
+    def __init__(self, max_workers=ENGINE_MAX_WORKERS, retention=ENGINE_RUN_RETENTION):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="qjob-run")
+        self._retention = retention
+        self._runs = {}
+        self._lock = threading.Lock()
+    
+    def submit(self, circuits, ibm_api_key, backend_name, shots, jobs_count, **options):
+        """Queue a run and return its run ID immediately
+        
+        ``circuits`` is a QASM string or a list of ``(name, qasm)`` pairs run
+        together as one campaign.
+        """
+        if isinstance(circuits, str):
+            circuits = [(DEFAULT_CIRCUIT_NAME, circuits)]
+        run_id = new_run_id()
+        record = RunRecord(run_id, jobs_count * len(circuits))
+        
+        with self._lock:
+            self._evict_finished()
+            self._runs[run_id] = record
+        
+        self._executor.submit(
+            self._execute, record, circuits, ibm_api_key, backend_name, shots, jobs_count, options
+        )
+        return run_id
+    
+    def _execute(self, record, circuits, ibm_api_key, backend_name, shots, jobs_count, options):
+        with record.lock:
+            if record.cancel_token.cancelled:
+                record.status = "cancelled"
+                record.finished_at = time.time()
+                return
+            record.status = "running"
+        
+        results, status = execute_circuits(
+            circuits, ibm_api_key, backend_name, shots, jobs_count,
+            run_id=record.run_id,
+            progress_callback=record.update,
+            cancel_token=record.cancel_token,
+            **options
+        )
+        
+        with record.lock:
+            if status == "Success":
+                record.status = "done"
+            elif status == "Cancelled":
+                record.status = "cancelled"
+            else:
+                record.status = "failed"
+            record.message = status
+            record.results = results or record.results
+            record.finished_at = time.time()
+    
+    def status(self, run_id):
+        """Snapshot of a run, or None if it is unknown"""
+        with self._lock:
+            record = self._runs.get(run_id)
+        return record.snapshot() if record else None
+    
+    def cancel(self, run_id):
+        """Request cancellation of a run and its in-flight runtime jobs"""
+        with self._lock:
+            record = self._runs.get(run_id)
+        if record:
+            record.cancel_token.cancel()
+        return record is not None
+    
+    def forget(self, run_id):
+        """Drop a finished run once its results have been collected"""
+        with self._lock:
+            record = self._runs.get(run_id)
+            if record and record.finished_at:
+                del self._runs[run_id]
+    
+    def _evict_finished(self):
+        now = time.time()
+        for run_id in [
+            run_id for run_id, record in self._runs.items()
+            if record.finished_at and now - record.finished_at > self._retention
+        ]:
+            del self._runs[run_id]
+    
+    def shutdown(self):
+        """Cancel every run and stop the worker pool"""
+        with self._lock:
+            records = list(self._runs.values())
+        for record in records:
+            record.cancel_token.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
\ No newline at end of file
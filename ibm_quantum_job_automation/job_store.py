@@ -0,0 +1,213 @@
+"""
+Append-only local job ledger backed by SQLite
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+import numpy as np
+from config import JOB_STORE_PATH
+from service_pool import hash_token
+
+# Local simulator jobs from runs started before this time cannot be recovered
+PROCESS_STARTED = time.time()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    account TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    params TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    job_id TEXT,
+    pub_index INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    recorded_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS job_events_run ON job_events (run_id, idx);
+"""
+
+# Latest event for every (run, idx) pair
+LATEST_EVENTS = """
+SELECT e.run_id, e.idx, e.job_id, e.pub_index, e.status, e.result, e.error,
+       r.backend, r.params, r.account, r.created_at
+FROM job_events e
+JOIN runs r ON r.run_id = e.run_id
+WHERE e.id IN (SELECT MAX(id) FROM job_events GROUP BY run_id, idx)
+"""
+
+def new_run_id():
+    """Generate an identifier for a run"""
+    return uuid.uuid4().hex
+
+def account_key(ibm_api_key):
+    """Ledger owner key: the hashed token, never the token itself"""
+    return hash_token(ibm_api_key or '')
+
+def row_to_json(row):
+    """Serialize a results row, histogram included"""
+    record = dict(row)
+    record['outcomes'] = [int(o) for o in row['outcomes']]
+    record['counts'] = [int(c) for c in row['counts']]
+    return json.dumps(record)
+
+def row_from_json(text):
+    """Results row from ``row_to_json`` output with its histogram as arrays"""
+    row = json.loads(text)
+    dtype = np.uint64 if row['num_bits'] <= 64 else object
+    row['outcomes'] = np.array(row['outcomes'], dtype=dtype)
+    row['counts'] = np.array(row['counts'], dtype=np.int64)
+    return row
+
+class JobStore:
+    """Record every submitted job, its status and result as soon as they are known
+    
+    Events are only ever appended; the current state of a job is its latest
+    event.
+    """
+    
+    def __init__(self, path=JOB_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+    
+    def _append(self, run_id, idx, job_id, status, pub_index=0, result=None, error=None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO job_events (run_id, idx, job_id, pub_index, status, result, error, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, idx, job_id, pub_index, status, result, error, time.time())
+            )
+    
+    def record_run(self, run_id, ibm_api_key, backend_name, params):
+        """Record the parameters of a run before any job is submitted"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO runs (run_id, account, backend, params, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (run_id, account_key(ibm_api_key), backend_name, json.dumps(params), time.time())
+            )
+    
+    def record_submitted(self, run_id, idx, job_id, pub_index=0):
+        """Record a job ID as soon as the backend has accepted it"""
+        self._append(run_id, idx, job_id, 'submitted', pub_index=pub_index)
+    
+    def record_result(self, run_id, row):
+        """Record a finished job's results row"""
+        self._append(run_id, row['idx'], row['job_id'], 'done', result=row_to_json(row))
+    
+    def record_failed(self, run_id, idx, job_id, error):
+        """Record a job that failed or was cancelled"""
+        self._append(run_id, idx, job_id, 'failed', error=str(error))
+    
+    def _latest(self, where="", args=()):
+        with self._lock:
+            cursor = self._conn.execute(f"{LATEST_EVENTS} {where}", args)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, values)) for values in cursor.fetchall()]
+    
+    def pending_jobs(self, ibm_api_key):
+        """Jobs of this account that were submitted but have no result yet"""
+        return self._latest(
+            "AND e.status = 'submitted' AND r.account = ?",
+            (account_key(ibm_api_key),)
+        )
+    
+    def load_run(self, run_id):
+        """Completed result rows of a run, sorted by idx"""
+        events = self._latest("AND e.status = 'done' AND e.run_id = ? ORDER BY e.idx", (run_id,))
+        return [row_from_json(event['result']) for event in events]
+    
+    def latest_run_id(self, ibm_api_key):
+        """Most recent run recorded for this account"""
+        with self._lock:
+            found = self._conn.execute(
+                "SELECT run_id FROM runs WHERE account = ? ORDER BY created_at DESC LIMIT 1",
+                (account_key(ibm_api_key),)
+            ).fetchone()
+        return found[0] if found else None
+
+def reconcile_pending_jobs(store, ibm_api_key):
+    """Poll pending job IDs and record their results instead of resubmitting
+    
+    Returns ``(recovered, still_pending)`` counts.
+    """
+    from backends import is_local_backend
+    from result_processing import build_result_row, sweep_row_fields
+    from service_pool import service_pool
+    
+    pending = store.pending_jobs(ibm_api_key)
+    recovered = still_pending = 0
+    jobs = {}
+    
+    for event in pending:
+        if is_local_backend(event['backend']):
+            # Local simulator jobs do not survive a restart
+            if event['created_at'] < PROCESS_STARTED:
+                store.record_failed(event['run_id'], event['idx'], event['job_id'], "Local job lost on restart")
+            else:
+                still_pending += 1
+            continue
+        if not ibm_api_key:
+            still_pending += 1
+            continue
+        
+        try:
+            if event['job_id'] not in jobs:
+                jobs[event['job_id']] = service_pool.get_service(ibm_api_key).job(event['job_id'])
+            job = jobs[event['job_id']]
+            status = str(getattr(job.status(), 'name', job.status())).upper()
+            
+            if status == 'DONE':
+                params = json.loads(event['params'])
+                pub_result = job.result()[event['pub_index']]
+                index, extra = (), None
+                if params.get('sweep'):
+                    # Sweep rows are (repetition, point) elements of one PUB
+                    points = params['sweep']['points']
+                    repetition, point = divmod(event['idx'], len(points))
+                    index = (repetition, point)
+                    extra = sweep_row_fields(params['sweep']['names'], points[point], point, repetition)
+                row = build_result_row(
+                    event['job_id'], event['idx'], pub_result, params['shots'],
+                    index=index, extra=extra
+                )
+                row['backend'] = event['backend']
+                circuits = params.get('circuits')
+                if circuits:
+                    circuit = circuits[event['idx'] % len(circuits)]
+                    row['circ_name'], row['circ_hash'] = circuit['name'], circuit['hash']
+                    if len(circuits) > 1:
+                        row['repetition'] = event['idx'] // len(circuits)
+                store.record_result(event['run_id'], row)
+                recovered += 1
+            elif status in ('ERROR', 'CANCELLED'):
+                store.record_failed(event['run_id'], event['idx'], event['job_id'], status)
+            else:
+                still_pending += 1
+        except Exception:
+            still_pending += 1
+    
+    return recovered, still_pending
+
+_job_store = None
+_job_store_lock = threading.Lock()
+
+def get_job_store():
+    """Process-wide job store, opened on first use"""
+    global _job_store
+    with _job_store_lock:
+        if _job_store is None:
+            _job_store = JobStore()
+        return _job_store
\ No newline at end of file
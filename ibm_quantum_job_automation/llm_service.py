@@ -2,55 +2,185 @@
 LLM integration service for AI-powered quantum computing assistance
 """
 
-from utils import check_groq
-from config import LLM_SYSTEM_PROMPT, GROQ_MODEL, GROQ_TEMPERATURE, GROQ_MAX_TOKENS
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dependencies import check_groq, load_module
+from service_pool import hash_token
+from chat_context import build_messages
+from qasm_extraction import extract_qasm_candidates
+from config import (
+    GROQ_MODEL, GROQ_TEMPERATURE, GROQ_MAX_TOKENS, GROQ_BASE_URL,
+    LLM_CACHE_SIZE, LLM_CACHE_TTL
+)
 
-def get_llm_response(user_message, groq_api_key):
-    """Get response from Groq LLM"""
+# Finish reasons of a completion that ended normally (at a stop token or the token limit)
+COMPLETE_FINISH_REASONS = ('stop', 'length')
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_groq_client(groq_api_key):
+    """Return a pooled Groq client for the key (keyed by its hash)"""
+    key = hash_token(groq_api_key, channel="groq")
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = load_module('groq').Groq(api_key=groq_api_key, base_url=GROQ_BASE_URL)
+            _clients[key] = client
+        return client
+
+class ResponseCache:
+    """LRU cache of completed responses with a time-to-live
+    
+    Keys leave out the Groq API key on purpose: a completion depends only on
+    the model, temperature and messages, so answers are shared across
+    accounts and sessions.
+    """
+    
+    def __init__(self, maxsize=LLM_CACHE_SIZE, ttl=LLM_CACHE_TTL, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def key(messages, model=GROQ_MODEL, temperature=GROQ_TEMPERATURE):
+        """Hash everything that determines the completion"""
+        payload = json.dumps([model, temperature, messages], sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._clock() - entry[1] >= self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, key, response):
+        with self._lock:
+            self._entries[key] = (response, self._clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+# Shared across sessions; only completed, successful responses are stored
+response_cache = ResponseCache()
+
+def get_llm_response(user_message, groq_api_key, use_cache=False, history=(), summary="", qasm=None):
+    """Get response from Groq LLM, with earlier turns and the editor QASM as context"""
     if not check_groq():
         return "Error: Groq library not available"
     
+    messages = build_messages(user_message, history, summary, qasm)
+    cache_key = ResponseCache.key(messages)
+    if use_cache:
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    
     try:
-        from groq import Groq
-        
-        client = Groq(api_key=groq_api_key)
+        client = get_groq_client(groq_api_key)
         
         response = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": LLM_SYSTEM_PROMPT},
-                {"role": "user", "content": user_message}
-            ],
+            messages=messages,
             model=GROQ_MODEL,
             temperature=GROQ_TEMPERATURE,
             max_tokens=GROQ_MAX_TOKENS
         )
         
-        return response.choices[0].message.content
+        choice = response.choices[0]
+        content = choice.message.content
+        if content and choice.finish_reason in COMPLETE_FINISH_REASONS:
+            response_cache.put(cache_key, content)
+        return content
     except Exception as e:
         return f"Error getting LLM response: {str(e)}"
 
+def stream_llm_response(user_message, groq_api_key, use_cache=False, history=(), summary="", qasm=None):
+    """Yield the Groq response token by token as it is generated
+    
+    A cached response is yielded in one piece. A stream is added to the cache
+    only when it produced text and ended with a normal finish reason, so an
+    empty or interrupted answer is never served again.
+    """
+    if not check_groq():
+        yield "Error: Groq library not available"
+        return
+    
+    messages = build_messages(user_message, history, summary, qasm)
+    cache_key = ResponseCache.key(messages)
+    if use_cache:
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+    
+    chunks = []
+    finish_reason = None
+    try:
+        client = get_groq_client(groq_api_key)
+        
+        stream = client.chat.completions.create(
+            messages=messages,
+            model=GROQ_MODEL,
+            temperature=GROQ_TEMPERATURE,
+            max_tokens=GROQ_MAX_TOKENS,
+            stream=True
+        )
+        
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            finish_reason = chunk.choices[0].finish_reason or finish_reason
+            if delta:
+                chunks.append(delta)
+                yield delta
+    except Exception as e:
+        yield f"Error getting LLM response: {str(e)}"
+        return
+    
+    if chunks and finish_reason in COMPLETE_FINISH_REASONS:
+        response_cache.put(cache_key, ''.join(chunks))
+
 def process_quick_action(action_type, groq_api_key):
-    """Process a quick action request"""
+    """Process a quick action request (served from the response cache when possible)"""
     from config import QUICK_ACTIONS
     
     if action_type not in QUICK_ACTIONS:
         return "Error: Unknown action type"
     
     prompt = QUICK_ACTIONS[action_type]
-    return get_llm_response(prompt, groq_api_key)
+    return get_llm_response(prompt, groq_api_key, use_cache=True)
+
+def stream_quick_action(action_type, groq_api_key):
+    """Stream a quick action response, served from the response cache when possible"""
+    from config import QUICK_ACTIONS
+    
+    if action_type not in QUICK_ACTIONS:
+        yield "Error: Unknown action type"
+        return
+    
+    yield from stream_llm_response(QUICK_ACTIONS[action_type], groq_api_key, use_cache=True)
 
 def extract_qasm_from_response(response):
-    """Extract QASM code from AI response"""
-    lines = response.split('\n')
-    qasm_lines = []
-    in_qasm = False
-    
-    for line in lines:
-        if 'OPENQASM' in line:
-            in_qasm = True
-        if in_qasm:
-            qasm_lines.append(line)
-        if in_qasm and line.strip() == '' and len(qasm_lines) > 5:
-            break
-    
-    return '\n'.join(qasm_lines).strip() if qasm_lines else None
\ No newline at end of file
+    """Extract QASM code from AI response, preferring the first program that parses"""
+    candidates = extract_qasm_candidates(response)
+    if not candidates:
+        return None
+    valid = [code for code, is_valid, _ in candidates if is_valid]
+    return valid[0] if valid else candidates[0][0]
\ No newline at end of file
@@ -3,13 +3,14 @@ Main application file for IBM Quantum Circuit JOB Automation
 Run with: streamlit run main.py
 """
 
+import time
 import streamlit as st
 from config import PAGE_CONFIG
 from styles import CUSTOM_CSS
 from utils import init_session_state, check_qiskit, check_groq
 from ui_components import (
     render_header, render_api_keys_section, render_circuit_parameters,
-    render_qasm_editor, render_execution_section, render_results_section,
+    render_qasm_editor, render_workspace_section, render_sweep_section, render_job_recovery, render_execution_section, render_results_section,
     render_chat_interface, render_quick_actions, render_status_indicators,
     render_footer
 )
@@ -24,6 +25,8 @@ def check_dependencies():
 
 def main():
     """Main application function"""
+    rerun_started = time.perf_counter()
+    
     # Page configuration
     st.set_page_config(**PAGE_CONFIG)
     
@@ -55,6 +58,15 @@ def main():
         # QASM Code Editor
         render_qasm_editor()
         
+        # Named circuits run together as one campaign
+        render_workspace_section()
+        
+        # Parameter Sweep
+        render_sweep_section()
+        
+        # Resume jobs left over from an earlier session
+        render_job_recovery(ibm_api_key)
+        
         # Execute Circuit
         render_execution_section(ibm_api_key, backend_name)
         
@@ -74,6 +86,9 @@ def main():
     
     # Footer
     render_footer()
+    
+    # Shown in the timings report on the next rerun
+    st.session_state.last_rerun_ms = (time.perf_counter() - rerun_started) * 1000
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
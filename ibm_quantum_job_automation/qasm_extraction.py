@@ -0,0 +1,65 @@
+"""
+Extraction of QASM programs from assistant responses
+"""
+
+import re
+from circuit_compiler import check_qasm, normalize_qasm
+
+# ```lang ... ``` blocks; an unterminated final fence runs to the end of the text
+CODE_FENCE = re.compile(r"```[^\n]*\n(.*?)(?:```|\Z)", re.DOTALL)
+QASM_HEADER = re.compile(r"\bOPENQASM\s+[23](\.\d+)?\s*;")
+
+def _looks_like_qasm(line):
+    """Whether an unfenced line can belong to a QASM program"""
+    stripped = line.strip()
+    return (
+        not stripped
+        or stripped.startswith(('//', '/*', '*'))
+        or stripped.endswith((';', '{', '}'))
+    )
+
+def _program_from(text, start):
+    """The QASM program beginning at ``start``, ending at the first prose line"""
+    lines = []
+    for line in text[start:].splitlines():
+        if not _looks_like_qasm(line):
+            break
+        lines.append(line)
+    return '\n'.join(lines).strip()
+
+def find_qasm_programs(response):
+    """Every distinct QASM 2/3 program in a response, in order of appearance
+    
+    Fenced code blocks are taken whole from their ``OPENQASM`` header on;
+    programs outside fences run until the first line that is not QASM.
+    """
+    programs = []
+    prose = response
+    for match in CODE_FENCE.finditer(response):
+        block = match.group(1)
+        for header in QASM_HEADER.finditer(block):
+            # A block may hold several programs, one per header
+            end = next((h.start() for h in QASM_HEADER.finditer(block, header.end())), len(block))
+            programs.append((match.start(1) + header.start(), block[header.start():end].strip()))
+        # Blank out the fence, keeping offsets so programs stay in order
+        prose = prose[:match.start()] + re.sub(r"[^\n]", " ", match.group(0)) + prose[match.end():]
+    
+    for header in QASM_HEADER.finditer(prose):
+        programs.append((header.start(), _program_from(prose, header.start())))
+    
+    seen = set()
+    unique = []
+    for _, program in sorted(programs, key=lambda found: found[0]):
+        key = normalize_qasm(program)
+        if key not in seen:
+            seen.add(key)
+            unique.append(program)
+    return unique
+
+def extract_qasm_candidates(response):
+    """QASM programs in a response with their validation result
+    
+    Returns a list of ``(qasm_code, is_valid, message)``; parsing goes
+    through the shared parse cache.
+    """
+    return [(program, *check_qasm(program)) for program in find_qasm_programs(response)]
\ No newline at end of file
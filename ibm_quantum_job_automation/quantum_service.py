@@ -2,92 +2,568 @@
 Quantum computing service for executing circuits on IBM Quantum backends
 """
 
-import streamlit as st
-from datetime import datetime
-from utils import check_qiskit
+import contextlib
+import threading
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dependencies import check_qiskit, load_module
+from service_pool import service_pool, is_auth_error
+from backends import get_backend, is_local_backend
+from backend_router import select_backend, get_backend_snapshots, expected_wait
+from circuit_compiler import compile_circuit, parse_qasm, circuit_hash
+from result_processing import build_result_row, sweep_row_fields
+from job_store import get_job_store, new_run_id, account_key
+from submission_scheduler import submission_scheduler, call_with_retry, is_transient_error
+from result_export import open_result_writer
+from telemetry import job_timing, timed_row, record_row_timing
+from readout_mitigation import readout_columns, READOUT_COLUMNS
+from result_cache import get_result_cache, cache_key, calibration_stamp
+from result_statistics import RunStatistics
+from config import (
+    DEFAULT_MAX_IN_FLIGHT, DEFAULT_EXECUTION_MODE, EXECUTION_MODES, DEFAULT_OPTIMIZATION_LEVEL,
+    MAX_SWEEP_POINTS, AUTO_BACKEND, DEFAULT_CIRCUIT_NAME
+)
 
-def execute_quantum_circuit(qasm_code, ibm_api_key, backend_name, shots, jobs_count):
-    """Execute the quantum circuit on IBM Quantum backend"""
+class RunCancelled(Exception):
+    """Raised inside a run once cancellation has been requested"""
+
+class CancelToken:
+    """Cancellation flag shared by a run and whoever may cancel it
+    
+    Runtime jobs register themselves while in flight so that ``cancel`` can
+    call ``job.cancel()`` on each of them.
+    """
+    
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._jobs = set()
+    
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+    
+    def register(self, job):
+        with self._lock:
+            self._jobs.add(job)
+        if self.cancelled:
+            _cancel_job(job)
+    
+    def unregister(self, job):
+        with self._lock:
+            self._jobs.discard(job)
+    
+    def wait(self, seconds):
+        """Sleep up to ``seconds``, returning True early if the run is cancelled"""
+        return self._event.wait(seconds)
+    
+    def cancel(self):
+        """Stop submitting new jobs and cancel every job still in flight"""
+        self._event.set()
+        with self._lock:
+            in_flight = list(self._jobs)
+        for job in in_flight:
+            _cancel_job(job)
+
+def _cancel_job(job):
+    try:
+        job.cancel()
+    except Exception:
+        pass
+
+def _submit_and_wait(sampler, pubs, shots, slot, cancel_token, on_job):
+    """Submit one runtime job inside a scheduler slot and wait for its result
+    
+    Transient submission failures are retried with exponential backoff and
+    jitter, each attempt in a fresh slot. Once a job exists it is never
+    submitted again: ``on_job(job_id)`` is called once and transient errors
+    while fetching the result poll the same job. Returns
+    ``(job_id, result, timing)``.
+    """
+    should_retry = lambda e: not cancel_token.cancelled and is_transient_error(e)
+    
+    def submit():
+        if cancel_token.cancelled:
+            raise RunCancelled()
+        held = contextlib.ExitStack()
+        held.enter_context(slot())
+        try:
+            submitted_at = time.time()
+            start = time.perf_counter()
+            job = sampler.run(pubs, shots=shots)
+            return held.pop_all(), job, submitted_at, time.perf_counter() - start
+        finally:
+            held.close()
+    
+    held, job, submitted_at, submit_s = call_with_retry(submit, should_retry=should_retry, sleep=cancel_token.wait)
+    with held:
+        cancel_token.register(job)
+        try:
+            on_job(job.job_id())
+            start = time.perf_counter()
+            result = call_with_retry(job.result, should_retry=should_retry, sleep=cancel_token.wait)
+            wait_s = time.perf_counter() - start
+        finally:
+            cancel_token.unregister(job)
+        return job.job_id(), result, job_timing(job, result, submitted_at, submit_s, wait_s)
+
+def _run_job(sampler, circuits, shots, job_idx, on_submit, cancel_token, slot):
+    """Submit one repetition of every circuit as a single job and block until its results are available
+    
+    The row of circuit ``k`` gets index ``job_idx * len(circuits) + k``.
+    """
+    first = job_idx * len(circuits)
+    
+    def on_job(job_id):
+        for pub_index in range(len(circuits)):
+            on_submit(job_id, first + pub_index, pub_index)
+    
+    job_id, result, timing = _submit_and_wait(sampler, circuits, shots, slot, cancel_token, on_job)
+    return [
+        timed_row(lambda: build_result_row(job_id, first + pub_index, pub_result, shots), timing)
+        for pub_index, pub_result in enumerate(result)
+    ]
+
+def _run_concurrent(sampler, circuits, shots, jobs_count, first_job, max_in_flight, on_submit, on_row, on_failure,
+                    cancel_token, slot):
+    """Queue every repetition as its own job and collect them as they finish
+    
+    Jobs are numbered from ``first_job`` and each carries one PUB per
+    circuit. A job that still fails after its
+    retries is reported to ``on_failure`` and the run carries on, so
+    finished jobs are never thrown away.
+    """
+    results_data = []
+    workers = max(1, min(max_in_flight, jobs_count))
+    
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {
+            executor.submit(_run_job, sampler, circuits, shots, job_idx, on_submit, cancel_token, slot): job_idx
+            for job_idx in range(first_job, first_job + jobs_count)
+        }
+        
+        # Collect results as each job finishes
+        for future in as_completed(futures):
+            try:
+                rows = future.result()
+            except Exception as e:
+                # Jobs torn down by a cancellation are simply left out
+                if not cancel_token.cancelled:
+                    on_failure(futures[future], e)
+                continue
+            for row in rows:
+                results_data.append(row)
+                on_row(row, len(results_data))
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    
+    return results_data
+
+def _run_batched(sampler, circuits, shots, jobs_count, first_job, on_submit, on_row, cancel_token, slot):
+    """Pack every repetition of every circuit into one multi-PUB job and split the PubResults
+    
+    Repetitions are numbered from ``first_job``.
+    """
+    if cancel_token.cancelled:
+        return []
+    
+    pubs = list(circuits) * jobs_count
+    first = first_job * len(circuits)
+    
+    def on_job(job_id):
+        for pub_index in range(len(pubs)):
+            on_submit(job_id, first + pub_index, pub_index)
+    
+    try:
+        job_id, result, timing = _submit_and_wait(sampler, pubs, shots, slot, cancel_token, on_job)
+    except Exception:
+        if cancel_token.cancelled:
+            return []
+        raise
+    
+    results_data = []
+    for pub_index, pub_result in enumerate(result):
+        row = timed_row(lambda: build_result_row(job_id, first + pub_index, pub_result, shots), timing)
+        results_data.append(row)
+        on_row(row, len(results_data))
+    
+    return results_data
+
+def build_sweep_grid(parameter_names, sweep_ranges):
+    """Expand per-parameter ``{'start', 'stop', 'points'}`` ranges into a grid
+    
+    Returns ``(axes, points)`` where ``points`` has one row per grid point and
+    one column per parameter, in ``parameter_names`` order.
+    """
+    missing = [name for name in parameter_names if name not in sweep_ranges]
+    if missing:
+        raise ValueError(f"No sweep range for parameter(s): {', '.join(missing)}")
+    
+    axes = [
+        np.linspace(sweep_ranges[name]['start'], sweep_ranges[name]['stop'], int(sweep_ranges[name]['points']))
+        for name in parameter_names
+    ]
+    grid = np.meshgrid(*axes, indexing='ij')
+    points = np.stack([axis.ravel() for axis in grid], axis=-1)
+    
+    if len(points) > MAX_SWEEP_POINTS:
+        raise ValueError(f"Sweep has {len(points)} points, the limit is {MAX_SWEEP_POINTS}")
+    return axes, points
+
+def _run_sweep(sampler, qc, shots, jobs_count, names, points, on_submit, on_row, cancel_token, slot):
+    """Submit the whole sweep grid, for every repetition, as one PUB"""
+    if cancel_token.cancelled:
+        return []
+    
+    def on_job(job_id):
+        for row_idx in range(jobs_count * len(points)):
+            on_submit(job_id, row_idx, 0)
+    
+    # Parameter values of shape (repetitions, points, parameters)
+    values = np.broadcast_to(points, (jobs_count,) + points.shape)
+    try:
+        job_id, result, timing = _submit_and_wait(sampler, [(qc, values)], shots, slot, cancel_token, on_job)
+    except Exception:
+        if cancel_token.cancelled:
+            return []
+        raise
+    
+    results_data = []
+    for repetition in range(jobs_count):
+        for point, point_values in enumerate(points):
+            row = timed_row(lambda: build_result_row(
+                job_id, repetition * len(points) + point, result[0], shots,
+                index=(repetition, point),
+                extra=sweep_row_fields(names, point_values, point, repetition)
+            ), timing)
+            results_data.append(row)
+            on_row(row, len(results_data))
+    
+    return results_data
+
+def _no_progress(completed, total, row):
+    pass
+
+def execute_quantum_circuit(qasm_code, ibm_api_key, backend_name, shots, jobs_count, circ_name=None, **options):
+    """Execute one QASM circuit on IBM Quantum backend; see ``execute_circuits`` for the options"""
+    return execute_circuits(
+        [(circ_name or DEFAULT_CIRCUIT_NAME, qasm_code)], ibm_api_key, backend_name, shots, jobs_count, **options
+    )
+
+def execute_circuits(circuits, ibm_api_key, backend_name, shots, jobs_count,
+                     max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                     execution_mode=DEFAULT_EXECUTION_MODE,
+                     optimization_level=DEFAULT_OPTIMIZATION_LEVEL,
+                     run_id=None, progress_callback=None, cancel_token=None,
+                     sweep=None, owner=None, sampler_factory=None, mitigation=None, reuse=None,
+                     precision=None):
+    """Execute ``(name, qasm)`` circuits together on one backend
+    
+    Every job carries one PUB per circuit, so a workspace of circuits costs
+    the same number of submissions as a single circuit. Rows are tagged with
+    ``circ_name`` and ``circ_hash``; with several circuits, the row of
+    circuit ``k`` in repetition ``r`` has ``idx = r * len(circuits) + k`` and a
+    ``repetition`` column.
+    
+    ``execution_mode`` is one of ``config.EXECUTION_MODES``. Independent jobs
+    are queued up front, with at most ``max_in_flight`` of them submitted at
+    once, and results are collected in completion order. Batched mode packs
+    all repetitions into a single Sampler call; session mode runs the
+    independent jobs inside a runtime Session. Each circuit is transpiled to
+    the backend ISA once and reused from the compile cache for every job.
+    
+    ``backend_name`` may be ``config.AUTO_BACKEND``, in which case the run goes
+    to the hardware backend with the shortest expected queue that is
+    operational and wide enough for the widest circuit.
+    
+    Every job ID and result is written to the job store under ``run_id`` as
+    soon as it is known, so a crash or refresh never loses finished work.
+    
+    ``progress_callback(completed, total, row)`` is called as each job
+    finishes; this module never touches the UI, so callers draw progress
+    themselves (see ``execution_engine.RunRecord.update``). Setting
+    ``cancel_token`` lets another thread stop the run, in which case the
+    finished rows are returned with a "Cancelled" status.
+    
+    Hardware submissions go through the process-wide submission scheduler,
+    which rate-limits each account and shares it fairly between ``owner``
+    sessions. Transient failures are retried per job; jobs that still fail
+    are recorded as failed while every finished row is kept and returned
+    with the error status.
+    
+    ``sampler_factory(mode)`` replaces the runtime ``SamplerV2``, e.g. with a
+    fake Sampler for benchmarks.
+    
+    With ``sweep`` (ranges for every free circuit parameter, see
+    ``build_sweep_grid``) the circuit is transpiled once and the whole grid is
+    submitted as a single PUB with a parameter-value array; each repetition
+    of each grid point becomes one row with ``param_<name>`` columns. Sweeps
+    take a single circuit.
+    
+    ``mitigation`` (a ``config.READOUT_MITIGATION_MODES`` key) attaches the
+    readout error of every classical bit to each row, from the backend's
+    calibration data or from calibration circuits run before the jobs; both
+    are cached per backend, so calibration runs once per cycle, not per run.
+    
+    With ``reuse`` (a ``result_cache.ReusePolicy``) repetitions measured
+    earlier on the same backend calibration with the same shots and options
+    are taken from the result cache and only the rest are submitted. Reused
+    rows come first, keep their original job ID and name their source run
+    in ``reused_from``; every new row is added to the cache. Sweeps are never
+    reused.
+    
+    With ``precision`` (an ``adaptive_sampling.PrecisionTarget``) jobs are
+    submitted in rounds and ``jobs_count`` is only the budget: estimates are
+    updated as rows arrive and the run stops once the target interval width
+    is reached or the budget is spent.
+    """
     if not check_qiskit():
         return [], "Qiskit not available"
     
+    if execution_mode not in EXECUTION_MODES:
+        return [], f"Error: Unknown execution mode '{execution_mode}'"
+    
+    if not circuits:
+        return [], "Error: No circuits to run"
+    
+    if sweep and len(circuits) > 1:
+        return [], "Error: Parameter sweeps run a single circuit"
+    
+    if sweep and precision:
+        return [], "Error: Adaptive shot allocation does not support parameter sweeps"
+    
+    cancel_token = cancel_token or CancelToken()
+    completed_rows = []
+    failures = []
+    
     try:
-        # Import Qiskit components
-        from qiskit import QuantumCircuit
-        from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2 as Sampler
+        # Import Qiskit components on first use
+        runtime = load_module('qiskit_ibm_runtime')
+        Sampler, Session = sampler_factory or runtime.SamplerV2, runtime.Session
+        
+        # Route to the least-loaded hardware backend wide enough for every circuit
+        if backend_name == AUTO_BACKEND:
+            width = max(parse_qasm(qasm_code).num_qubits for _, qasm_code in circuits)
+            backend_name = select_backend(ibm_api_key, width)
+        
+        # Local simulator, or the authenticated backend handle from the pool
+        backend = get_backend(backend_name, ibm_api_key)
         
-        # Authenticate with IBM Quantum
-        service = QiskitRuntimeService(channel="ibm_cloud", token=ibm_api_key)
+        # Parse and transpile to the backend ISA (cached across jobs and reruns)
+        compiled = [compile_circuit(qasm_code, backend, optimization_level) for _, qasm_code in circuits]
+        labels = [(circ_name, circuit_hash(qasm_code)) for circ_name, qasm_code in circuits]
         
-        # Load QASM circuit
-        qc = QuantumCircuit.from_qasm_str(qasm_code)
+        for (circ_name, _), qc in zip(circuits, compiled):
+            if qc.parameters and not sweep:
+                names = ', '.join(parameter.name for parameter in qc.parameters)
+                return [], f"Error: Circuit {circ_name} has free parameters ({names}); enable sweep mode"
+        names = [parameter.name for parameter in compiled[0].parameters]
+        total_rows = jobs_count * len(circuits)
+        if sweep:
+            axes, points = build_sweep_grid(names, sweep)
+            total_rows = jobs_count * len(points)
         
-        # Choose backend
-        backend = service.backend(backend_name)
+        # Take whole repetitions from the result cache and top up with new jobs
+        result_cache = get_result_cache()
+        cache_keys, reused_rows, reused_jobs = None, [], 0
+        if reuse and not sweep:
+            calibrated_at = calibration_stamp(backend)
+            cache_keys = [
+                cache_key(qasm_code, ibm_api_key, backend_name, calibrated_at, shots, optimization_level)
+                for _, qasm_code in circuits
+            ]
+            cached = [
+                result_cache.lookup(key, reuse.reusable(jobs_count), reuse.max_age) for key in cache_keys
+            ]
+            reused_jobs = min(len(entries) for entries in cached)
+            for repetition in range(reused_jobs):
+                for circuit, entries in enumerate(cached):
+                    source_run, row = entries[repetition]
+                    row.pop('repetition', None)
+                    row['idx'] = repetition * len(circuits) + circuit
+                    row['reused_from'] = source_run
+                    reused_rows.append(row)
+        new_jobs = jobs_count - reused_jobs
         
-        # Initialize sampler
-        sampler = Sampler(backend)
+        # Record the run in the job ledger before anything is submitted
+        store = get_job_store()
+        run_id = run_id or new_run_id()
+        store.record_run(run_id, ibm_api_key, backend_name, {
+            'circuits': [
+                {'name': circ_name, 'hash': circ_hash, 'qasm': qasm_code}
+                for (circ_name, circ_hash), (_, qasm_code) in zip(labels, circuits)
+            ],
+            'shots': shots,
+            'jobs_count': jobs_count,
+            'execution_mode': execution_mode,
+            'optimization_level': optimization_level,
+            'sweep': {'names': names, 'points': points.tolist()} if sweep else None,
+            'mitigation': mitigation,
+            'reused_jobs': reused_jobs,
+            'precision': precision.as_params() if precision else None
+        })
+        
+        def on_submit(job_id, job_idx, pub_index):
+            store.record_submitted(run_id, job_idx, job_id, pub_index)
+        
+        # Local simulators bypass the per-account rate limit
+        if is_local_backend(backend_name):
+            slot = contextlib.nullcontext
+        else:
+            account = account_key(ibm_api_key)
+            slot = lambda: submission_scheduler.slot(account, owner or run_id, cancel_token)
+        
+        # Readout errors of the measured qubits, calibrated only when the cache is stale
+        readouts = [{}] * len(compiled)
+        if mitigation and mitigation != "none":
+            readouts = [
+                readout_columns(
+                    backend_name, backend, qc, mitigation,
+                    lambda calibration, calibration_shots: _submit_and_wait(
+                        Sampler(backend), calibration, calibration_shots, slot, cancel_token, lambda job_id: None
+                    )[1]
+                )
+                for qc in compiled
+            ]
+        
+        if progress_callback is None:
+            progress_callback = _no_progress
+        
+        # Stream rows to Parquet as they arrive
+        writer = open_result_writer(run_id)
+        
+        def on_row(row, completed=None):
+            row['backend'] = backend_name
+            circuit = row['idx'] % len(circuits)
+            row['circ_name'], row['circ_hash'] = labels[circuit]
+            if len(circuits) > 1:
+                row['repetition'] = row['idx'] // len(circuits)
+            if row.get('reused_from'):
+                # Readout errors follow this run's mitigation setting, not that of the run that stored the row
+                for column in READOUT_COLUMNS:
+                    row.pop(column, None)
+            row.update(readouts[circuit])
+            if cache_keys:
+                row.setdefault('reused_from', None)
+            if precision:
+                statistics.setdefault(row['circ_name'], RunStatistics()).add(row)
+            if not row.get('reused_from'):
+                record_row_timing(row)
+                if cache_keys:
+                    result_cache.record(cache_keys[circuit], run_id, row)
+            store.record_result(run_id, row)
+            if writer:
+                writer.append(row)
+            completed_rows.append(row)
+            # Reused rows arrive first, so progress counts every row seen so far
+            progress_callback(len(completed_rows), total_rows, row)
+        
+        def on_failure(job_idx, error):
+            failures.append(error)
+            if is_auth_error(error):
+                service_pool.invalidate(ibm_api_key)
+            for row_idx in range(job_idx * len(circuits), (job_idx + 1) * len(circuits)):
+                store.record_failed(run_id, row_idx, None, error)
+        
+        def run_round(sampler, round_jobs, first_job):
+            if sweep:
+                return _run_sweep(
+                    sampler, compiled[0], shots, round_jobs, names, points, on_submit, on_row, cancel_token, slot
+                )
+            if execution_mode == "batched":
+                return _run_batched(
+                    sampler, compiled, shots, round_jobs, first_job, on_submit, on_row, cancel_token, slot
+                )
+            return _run_concurrent(
+                sampler, compiled, shots, round_jobs, first_job, max_in_flight,
+                on_submit, on_row, on_failure, cancel_token, slot
+            )
+        
+        # One runtime Session is kept open across every round
+        if execution_mode == "session" and new_jobs and not sweep:
+            context = Session(backend=backend)
+        else:
+            context = contextlib.nullcontext()
         
-        # Store results
         results_data = []
+        statistics = {}
+        first_job = reused_jobs
+        try:
+            for row in reused_rows:
+                on_row(row)
+            with context as session:
+                sampler = Sampler(backend if session is None else session)
+                # A fixed run is a single round; an adaptive one sizes each round from the estimates so far
+                while first_job < jobs_count and not cancel_token.cancelled and not failures:
+                    if precision:
+                        round_jobs = precision.next_round(statistics, shots, first_job, jobs_count)
+                    else:
+                        round_jobs = jobs_count - first_job
+                    if not round_jobs:
+                        break
+                    results_data.extend(run_round(sampler, round_jobs, first_job))
+                    first_job += round_jobs
+        finally:
+            if writer:
+                writer.close()
+        if cache_keys:
+            result_cache.count_usage(reused_jobs, first_job - reused_jobs)
         
-        # Progress tracking
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        for job_idx in range(jobs_count):
-            status_text.text(f"Running Job {job_idx + 1}/{jobs_count}...")
-            progress_bar.progress((job_idx + 1) / jobs_count)
-            
-            # Run the circuit
-            job = sampler.run([qc], shots=shots)
-            result = job.result()
-            
-            job_id = job.job_id()
-            
-            # Extract results
-            pub_result = result[0]
-            counts = pub_result.data.c.get_counts()
-            
-            # Get counts for each bit value
-            count_0 = counts.get('0', 0)
-            count_1 = counts.get('1', 0)
-            
-            # Append to results list
-            results_data.append({
-                'job_id': job_id,
-                'idx': job_idx,
-                'circ_name': 'quantum_circuit',
-                'bit1': '1',
-                'count1': count_1,
-                'bit0': '0',
-                'count0': count_0,
-                'shots': shots,
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            })
-        
-        progress_bar.empty()
-        status_text.empty()
+        results_data = sorted(results_data + reused_rows, key=lambda row: row['idx'])
         
+        if cancel_token.cancelled:
+            return results_data, "Cancelled"
+        if failures:
+            return results_data, (
+                f"Error: {len(failures)} of {first_job - reused_jobs} jobs failed after retries ({failures[0]})"
+            )
         return results_data, "Success"
-        
+    
     except Exception as e:
-        return [], f"Error: {str(e)}"
+        if is_auth_error(e):
+            service_pool.invalidate(ibm_api_key)
+        # Keep whatever finished before the failure
+        return sorted(completed_rows, key=lambda row: row['idx']), f"Error: {str(e)}"
+
+def reusable_jobs(circuits, ibm_api_key, backend_name, shots, jobs_count, optimization_level, reuse):
+    """How many of ``jobs_count`` repetitions a run of ``(name, qasm)`` circuits would take from the result cache
+    
+    Returns None when it cannot be known before the run, e.g. for automatic
+    routing or an unreachable backend.
+    """
+    if backend_name == AUTO_BACKEND or not check_qiskit():
+        return None
+    try:
+        calibrated_at = calibration_stamp(get_backend(backend_name, ibm_api_key))
+    except Exception:
+        return None
+    
+    result_cache = get_result_cache()
+    available = min(
+        result_cache.count(
+            cache_key(qasm_code, ibm_api_key, backend_name, calibrated_at, shots, optimization_level), reuse.max_age
+        )
+        for _, qasm_code in circuits
+    )
+    return min(available, reuse.reusable(jobs_count))
 
 def get_backend_status(ibm_api_key, backend_name):
     """Get status of the selected backend"""
     if not check_qiskit():
         return "Unknown - Qiskit not available"
     
-    try:
-        from qiskit_ibm_runtime import QiskitRuntimeService
-        
-        service = QiskitRuntimeService(channel="ibm_cloud", token=ibm_api_key)
-        backend = service.backend(backend_name)
-        
-        # Get backend properties
-        status = backend.status()
-        return f"Available ({status.pending_jobs} pending jobs)"
-        
-    except Exception as e:
-        return f"Error: {str(e)}"
\ No newline at end of file
+    if is_local_backend(backend_name):
+        return "Available (local simulator)"
+    
+    # Shares the router's short-lived status snapshots
+    snapshot = get_backend_snapshots(ibm_api_key, [backend_name])[0]
+    if snapshot['error']:
+        return f"Error: {snapshot['error']}"
+    if not snapshot['operational']:
+        return f"Offline ({snapshot['status_msg'] or 'not operational'})"
+    return (
+        f"Available ({snapshot['pending_jobs']} pending jobs, "
+        f"~{expected_wait(snapshot) / 60:.0f} min wait)"
+    )
\ No newline at end of file
@@ -0,0 +1,230 @@
+"""
+Readout-error mitigation: cached per-qubit assignment matrices and tensored inversion
+"""
+
+import json
+import threading
+import time
+from datetime import datetime, timezone
+import numpy as np
+from config import READOUT_CACHE_TTL, READOUT_CALIBRATION_SHOTS, READOUT_PRUNE_THRESHOLD
+from dependencies import load_module
+from result_processing import extract_counts, count_matrix
+from result_cache import calibration_stamp, calibration_stamps
+
+# Row columns recording the readout errors a run was mitigated with
+READOUT_COLUMNS = ('readout_error', 'readout_calibrated_at')
+
+def measured_qubits(isa_circuit):
+    """Physical qubit measured into each classical bit of an ISA circuit (None if never measured)"""
+    qubits = [None] * isa_circuit.num_clbits
+    for instruction in isa_circuit.data:
+        if instruction.operation.name == 'measure':
+            clbit = isa_circuit.find_bit(instruction.clbits[0]).index
+            qubits[clbit] = isa_circuit.find_bit(instruction.qubits[0]).index
+    return qubits
+
+def backend_readout_errors(backend, qubits):
+    """``{qubit: (p(1|0), p(0|1))}`` from the backend's calibration data and when it was taken
+    
+    Uses the asymmetric preparation errors when reported, the symmetric
+    readout error of the ``measure`` instruction otherwise, and zero for
+    simulators that report neither. Properties are refetched, since a pooled
+    backend handle keeps the ones from before any recalibration.
+    """
+    properties = None
+    if hasattr(backend, 'properties'):
+        try:
+            properties = backend.properties(refresh=True)
+        except TypeError:
+            properties = backend.properties()
+    errors = {}
+    for qubit in qubits:
+        try:
+            reported = properties.qubit_property(qubit)
+            errors[qubit] = (reported['prob_meas1_prep0'][0], reported['prob_meas0_prep1'][0])
+            continue
+        except Exception:
+            pass
+        try:
+            error = backend.target['measure'][(qubit,)].error or 0.0
+        except Exception:
+            error = 0.0
+        errors[qubit] = (error, error)
+    
+    calibrated_at = getattr(properties, 'last_update_date', None) or datetime.now(timezone.utc)
+    return errors, calibrated_at
+
+def calibration_circuits(backend, qubits):
+    """Circuits preparing all zeros and all ones on ``qubits``, transpiled to the backend ISA"""
+    QuantumCircuit = load_module('qiskit').QuantumCircuit
+    generate_preset_pass_manager = load_module('qiskit.transpiler').generate_preset_pass_manager
+    
+    circuits = []
+    for prepare_ones in (False, True):
+        qc = QuantumCircuit(len(qubits), len(qubits))
+        if prepare_ones:
+            qc.x(range(len(qubits)))
+        qc.measure(range(len(qubits)), range(len(qubits)))
+        circuits.append(qc)
+    
+    pass_manager = generate_preset_pass_manager(optimization_level=0, backend=backend, initial_layout=list(qubits))
+    return pass_manager.run(circuits)
+
+def _ones_fraction(pub_result, num_bits):
+    """Fraction of shots reading 1 on each classical bit"""
+    outcomes, counts, _, _ = extract_counts(pub_result)
+    bits = (outcomes[:, None] >> np.arange(num_bits, dtype=np.uint64)) & np.uint64(1)
+    return bits.astype(np.int64).T @ counts / counts.sum()
+
+def calibration_errors(result, qubits):
+    """``{qubit: (p(1|0), p(0|1))}`` from the results of ``calibration_circuits``"""
+    flipped_up = _ones_fraction(result[0], len(qubits))
+    flipped_down = 1 - _ones_fraction(result[1], len(qubits))
+    return {qubit: (float(up), float(down)) for qubit, up, down in zip(qubits, flipped_up, flipped_down)}
+
+class ReadoutCalibrationCache:
+    """Per-qubit readout errors of each backend, reused while the backend's calibration is unchanged
+    
+    Entries are kept per qubit so a run on new qubits only calibrates those.
+    Each entry remembers the backend calibration it was taken under (see
+    ``result_cache.calibration_stamp``) and is dropped as soon as the backend
+    reports a newer one. ``ttl`` seconds bound the age of every entry, which
+    is all that applies to simulators without calibration data.
+    """
+    
+    def __init__(self, ttl=READOUT_CACHE_TTL, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, backend_name, source, qubits, stamp=None):
+        """Fresh ``{qubit: (errors, calibrated_at)}`` for whichever of ``qubits`` are cached under ``stamp``"""
+        now = self._clock()
+        found = {}
+        with self._lock:
+            for qubit in qubits:
+                key = (backend_name, source, qubit)
+                entry = self._entries.get(key)
+                if entry and entry[3] != stamp:
+                    # The backend was recalibrated since this entry was taken
+                    del self._entries[key]
+                elif entry and now - entry[2] < self.ttl:
+                    found[qubit] = entry[:2]
+            self.hits += len(found)
+            self.misses += len(qubits) - len(found)
+        return found
+    
+    def put(self, backend_name, source, errors, calibrated_at, stamp=None):
+        now = self._clock()
+        with self._lock:
+            for qubit, qubit_errors in errors.items():
+                self._entries[(backend_name, source, qubit)] = (qubit_errors, calibrated_at, now, stamp)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+# Shared by every run in this process
+readout_cache = ReadoutCalibrationCache()
+
+def readout_columns(backend_name, backend, isa_circuit, source, run_calibration, cache=readout_cache,
+                    stamps=calibration_stamps):
+    """Row columns with the readout errors of every classical bit of ``isa_circuit``
+    
+    ``source`` is ``"backend"`` for the backend's reported errors or
+    ``"circuits"`` to measure them; ``run_calibration(circuits, shots)``
+    executes the calibration circuits and returns their PrimitiveResult. Only
+    qubits missing from the cache for the backend's current calibration are
+    looked up or calibrated.
+    """
+    qubits = measured_qubits(isa_circuit)
+    wanted = sorted({qubit for qubit in qubits if qubit is not None})
+    stamp = calibration_stamp(backend, stamps)
+    known = cache.get(backend_name, source, wanted, stamp)
+    missing = [qubit for qubit in wanted if qubit not in known]
+    
+    if missing:
+        if source == "backend":
+            errors, calibrated_at = backend_readout_errors(backend, missing)
+        else:
+            result = run_calibration(calibration_circuits(backend, missing), READOUT_CALIBRATION_SHOTS)
+            errors, calibrated_at = calibration_errors(result, missing), datetime.now(timezone.utc)
+        cache.put(backend_name, source, errors, calibrated_at, stamp)
+        known.update((qubit, (errors[qubit], calibrated_at)) for qubit in missing)
+    
+    per_clbit = [known[qubit][0] if qubit is not None else (0.0, 0.0) for qubit in qubits]
+    oldest = min((known[qubit][1] for qubit in wanted), default=None)
+    return {
+        'readout_error': json.dumps([[round(p10, 6), round(p01, 6)] for p10, p01 in per_clbit]),
+        'readout_calibrated_at': oldest.isoformat(timespec='seconds') if oldest else None
+    }
+
+def nearest_probability(quasi):
+    """Closest probability vector (Euclidean) to a quasi-probability vector"""
+    if not len(quasi):
+        return quasi
+    descending = np.sort(quasi)[::-1]
+    excess = np.cumsum(descending) - 1
+    positive = descending - excess / np.arange(1, len(quasi) + 1) > 0
+    rho = np.nonzero(positive)[0][-1]
+    return np.maximum(quasi - excess[rho] / (rho + 1), 0.0)
+
+def mitigate_counts(outcomes, counts, errors, prune=READOUT_PRUNE_THRESHOLD):
+    """Apply the inverse of each bit's 2x2 assignment matrix to a sparse histogram
+    
+    ``errors`` holds ``(p(1|0), p(0|1))`` per classical bit. The inverse is
+    applied one bit at a time, so the cost grows with the histogram's
+    support rather than with 2**bits; outcomes that were never observed are
+    dropped along the way once their quasi-probability falls below
+    ``prune``. Returns ``(outcomes, probabilities)``.
+    """
+    keys = observed = np.asarray(outcomes, dtype=np.uint64)
+    values = np.asarray(counts, dtype=np.float64) / np.sum(counts)
+    
+    for bit, (p10, p01) in enumerate(errors):
+        determinant = 1 - p10 - p01
+        if (p10 == 0 and p01 == 0) or determinant <= 0:
+            continue
+        inverse = np.array([[1 - p01, -p01], [-p10, 1 - p10]]) / determinant
+        mask = np.uint64(1) << np.uint64(bit)
+        source = ((keys & mask) != 0).astype(np.int64)
+        
+        keys = np.concatenate([keys, keys ^ mask])
+        values = np.concatenate([inverse[source, source] * values, inverse[1 - source, source] * values])
+        keys, position = np.unique(keys, return_inverse=True)
+        values = np.bincount(position, weights=values)
+        keep = (np.abs(values) >= prune) | np.isin(keys, observed, assume_unique=True)
+        keys, values = keys[keep], values[keep]
+    
+    return keys, nearest_probability(values)
+
+def mitigated_distribution(results_data):
+    """Pooled outcome probabilities of the rows after readout mitigation
+    
+    Rows are grouped by the readout errors they carry, so a run that crossed
+    a calibration refresh is mitigated piecewise. Returns
+    ``(outcomes, probabilities)``, or ``None`` when no row carries readout
+    errors or a register is wider than 64 bits.
+    """
+    groups = {}
+    for row in results_data:
+        if row.get('readout_error') and row['num_bits'] <= 64:
+            groups.setdefault(row['readout_error'], []).append(row)
+    if not groups or sum(map(len, groups.values())) < len(results_data):
+        return None
+    
+    all_keys, all_values = [], []
+    total_shots = sum(int(np.sum(row['counts'])) for row in results_data)
+    for readout_error, rows in groups.items():
+        outcomes, matrix = count_matrix(rows)
+        totals = matrix.sum(axis=0)
+        keys, probabilities = mitigate_counts(outcomes, totals, json.loads(readout_error))
+        all_keys.append(keys)
+        all_values.append(probabilities * totals.sum() / total_shots)
+    
+    keys, position = np.unique(np.concatenate(all_keys), return_inverse=True)
+    return keys, np.bincount(position, weights=np.concatenate(all_values))
\ No newline at end of file
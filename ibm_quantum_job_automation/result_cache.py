@@ -0,0 +1,182 @@
+"""
+Result reuse: finished result rows stored by circuit content, backend calibration, shots and options
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from config import JOB_STORE_PATH, RESULT_CACHE_MAX_AGE, CALIBRATION_STAMP_TTL
+from circuit_compiler import qasm_hash
+from job_store import account_key, row_to_json, row_from_json
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cached_results (
+    key TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    recorded_at REAL NOT NULL,
+    UNIQUE (key, job_id, idx)
+);
+CREATE INDEX IF NOT EXISTS cached_results_key ON cached_results (key, recorded_at);
+"""
+
+def _fresh_calibration_stamp(backend):
+    """Calibration time read from properties fetched anew, not the copy the backend handle cached"""
+    try:
+        try:
+            properties = backend.properties(refresh=True)
+        except TypeError:
+            properties = backend.properties()
+        updated = properties.last_update_date
+    except Exception:
+        return None
+    return updated.isoformat() if updated else None
+
+class CalibrationStamps:
+    """Backend calibration times, refetched once they are ``ttl`` seconds old
+    
+    Backend handles are pooled for much longer than a calibration cycle and
+    keep the properties they first fetched, so the stamp is read from
+    refreshed properties; the short TTL keeps that to one request per
+    backend per ``ttl`` seconds.
+    """
+    
+    def __init__(self, ttl=CALIBRATION_STAMP_TTL, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stamps = {}
+    
+    def get(self, backend):
+        name = getattr(backend, 'name', None) or repr(backend)
+        now = self._clock()
+        with self._lock:
+            entry = self._stamps.get(name)
+            if entry and now - entry[1] < self.ttl:
+                return entry[0]
+        stamp = _fresh_calibration_stamp(backend)
+        with self._lock:
+            self._stamps[name] = (stamp, now)
+        return stamp
+    
+    def clear(self):
+        with self._lock:
+            self._stamps.clear()
+
+# Shared by every run in this process
+calibration_stamps = CalibrationStamps()
+
+def calibration_stamp(backend, stamps=calibration_stamps):
+    """When the backend was last calibrated (at most ``stamps.ttl`` seconds out of date), or None for noiseless simulators"""
+    return stamps.get(backend)
+
+def cache_key(qasm_code, ibm_api_key, backend_name, calibrated_at, shots, optimization_level):
+    """Content address of a circuit's results
+    
+    Only what changes the measured distribution is part of the key: the
+    normalized QASM, the account, the backend and its calibration, shots and
+    the transpiler level. Execution mode and readout mitigation are applied
+    around identical jobs, so rows are shared between them.
+    """
+    payload = json.dumps([
+        qasm_hash(qasm_code), account_key(ibm_api_key), backend_name, calibrated_at, shots, optimization_level
+    ])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class ReusePolicy:
+    """How a run may reuse cached results
+    
+    Rows older than ``max_age`` seconds are ignored, at most ``max_jobs``
+    repetitions are reused (all of them when None) and ``refresh`` submits
+    every job again while still caching the new results.
+    """
+    
+    def __init__(self, max_age=RESULT_CACHE_MAX_AGE, max_jobs=None, refresh=False):
+        self.max_age = max_age
+        self.max_jobs = max_jobs
+        self.refresh = refresh
+    
+    def reusable(self, jobs_count):
+        """Largest number of repetitions this policy lets a run take from the cache"""
+        if self.refresh:
+            return 0
+        return jobs_count if self.max_jobs is None else min(jobs_count, self.max_jobs)
+
+class ResultCache:
+    """Result rows of finished jobs addressed by ``cache_key``
+    
+    Lives next to the job ledger, so results survive restarts. ``hits`` and
+    ``misses`` count reused and newly submitted repetitions in this process.
+    """
+    
+    def __init__(self, path=JOB_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+    
+    def record(self, key, run_id, row):
+        """Store a freshly measured row; a job's row is only ever stored once"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO cached_results (key, run_id, job_id, idx, result, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, run_id, row['job_id'], row['idx'], row_to_json(row), time.time())
+            )
+    
+    def lookup(self, key, limit, max_age=RESULT_CACHE_MAX_AGE):
+        """Up to ``limit`` newest rows stored under ``key`` within ``max_age`` seconds
+        
+        Returns ``(run_id, row)`` pairs.
+        """
+        if limit <= 0:
+            return []
+        with self._lock:
+            found = self._conn.execute(
+                "SELECT run_id, result FROM cached_results WHERE key = ? AND recorded_at >= ? "
+                "ORDER BY recorded_at DESC LIMIT ?",
+                (key, time.time() - max_age, limit)
+            ).fetchall()
+        return [(run_id, row_from_json(result)) for run_id, result in found]
+    
+    def count(self, key, max_age=RESULT_CACHE_MAX_AGE):
+        """Number of rows stored under ``key`` within ``max_age`` seconds"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM cached_results WHERE key = ? AND recorded_at >= ?",
+                (key, time.time() - max_age)
+            ).fetchone()[0]
+    
+    def count_usage(self, reused, submitted):
+        with self._lock:
+            self.hits += reused
+            self.misses += submitted
+    
+    @property
+    def hit_rate(self):
+        """Fraction of repetitions served from the cache, or None before any run"""
+        total = self.hits + self.misses
+        return self.hits / total if total else None
+    
+    def purge(self, max_age=RESULT_CACHE_MAX_AGE):
+        """Delete rows older than ``max_age`` seconds"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cached_results WHERE recorded_at < ?", (time.time() - max_age,))
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+def get_result_cache():
+    """Process-wide result cache, opened on first use"""
+    global _result_cache
+    with _result_cache_lock:
+        if _result_cache is None:
+            _result_cache = ResultCache()
+        return _result_cache
\ No newline at end of file
@@ -0,0 +1,323 @@
+"""
+Columnar result export: compact DataFrames, Arrow/Parquet files and chunked CSV
+"""
+
+import io
+import logging
+import os
+import tempfile
+import numpy as np
+from config import CSV_CHUNK_ROWS, PARQUET_ROW_GROUP_ROWS, RESULTS_EXPORT_DIR
+from result_processing import count_matrix, outcome_label, row_values, TIMESTAMP_FORMAT
+from result_table import ResultTable, HISTOGRAM_KEYS
+from dependencies import is_available, load_module
+from telemetry import TIMING_COLUMNS
+from readout_mitigation import READOUT_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# Readout errors and reused-from run IDs repeat across rows, so they are dictionary-encoded too
+CATEGORICAL_COLUMNS = ('circ_name', 'circ_hash', 'backend', 'registers', 'reused_from') + READOUT_COLUMNS
+INT32_COLUMNS = ('idx', 'shots', 'num_bits', 'sweep_point', 'repetition')
+# Optional measurements; missing values become NaN/null
+FLOAT64_COLUMNS = TIMING_COLUMNS
+
+def check_pyarrow():
+    """Check if PyArrow is available for Parquet export"""
+    return is_available('pyarrow')
+
+def _scalar_columns(results_data):
+    """Ordered union of the non-histogram keys of every row"""
+    return list(dict.fromkeys(
+        key for row in results_data for key in row if key not in HISTOGRAM_KEYS
+    ))
+
+def results_to_frame(results_data):
+    """Build one compact DataFrame with a ``count_<bitstring>`` column per outcome
+    
+    Names are categorical, counts int32 and timestamps a datetime dtype. A
+    ``ResultTable`` provides its scalar columns without building row dicts.
+    """
+    pd = load_module('pandas')
+    
+    if not len(results_data):
+        return pd.DataFrame()
+    
+    num_bits = int(max(row_values(results_data, 'num_bits')))
+    outcomes, matrix = count_matrix(results_data)
+    
+    if isinstance(results_data, ResultTable):
+        df = results_data.scalar_frame()
+        # Interned strings that are not meant to be categorical, such as job IDs, go back to plain values
+        for column in df.columns[df.dtypes == 'category']:
+            if column not in CATEGORICAL_COLUMNS:
+                df[column] = pd.Series(results_data.column(column).tolist())
+    else:
+        df = pd.DataFrame({
+            column: [row.get(column) for row in results_data]
+            for column in _scalar_columns(results_data)
+        })
+    for column in CATEGORICAL_COLUMNS:
+        if column in df:
+            df[column] = df[column].astype('category')
+    for column in INT32_COLUMNS:
+        if column in df and df[column].notna().all():
+            df[column] = df[column].astype(np.int32)
+    for column in FLOAT64_COLUMNS:
+        if column in df:
+            df[column] = df[column].astype(np.float64)
+    if 'timestamp' in df and not pd.api.types.is_datetime64_any_dtype(df['timestamp']):
+        df['timestamp'] = pd.to_datetime(df['timestamp'], format=TIMESTAMP_FORMAT)
+    
+    counts = pd.DataFrame(
+        matrix.astype(np.int32),
+        columns=[f"count_{outcome_label(o, num_bits)}" for o in outcomes]
+    )
+    return pd.concat([df, counts], axis=1)
+
+def iter_csv_chunks(results_frame, chunk_rows=CSV_CHUNK_ROWS):
+    """Yield the CSV text of a results DataFrame a chunk of rows at a time"""
+    for start in range(0, len(results_frame), chunk_rows):
+        yield results_frame.iloc[start:start + chunk_rows].to_csv(
+            index=False,
+            header=(start == 0),
+            date_format=TIMESTAMP_FORMAT
+        )
+
+def results_csv_file(results_data, run_id=None, export_dir=RESULTS_EXPORT_DIR):
+    """CSV of the results written to a file chunk by chunk, returned open for reading from the start
+    
+    The file is ``<export_dir>/<run_id>.csv`` next to the run's Parquet
+    export when both are set, an anonymous temporary file otherwise.
+    """
+    f = None
+    if run_id and export_dir:
+        try:
+            os.makedirs(export_dir, exist_ok=True)
+            f = open(os.path.join(export_dir, f"{run_id}.csv"), 'w+b')
+        except OSError as e:
+            logger.warning("Could not write CSV export to %s: %s", export_dir, e)
+    if f is None:
+        f = tempfile.TemporaryFile()
+    for chunk in iter_csv_chunks(results_to_frame(results_data)):
+        f.write(chunk.encode('utf-8'))
+    f.seek(0)
+    return f
+
+def _table_to_arrow(table):
+    """Arrow table of a ``ResultTable``, wrapping its arrays instead of converting row by row"""
+    pa = load_module('pyarrow')
+    
+    columns = {}
+    for name, column in table.columns.items():
+        missing = column.missing()
+        mask = missing if missing.any() else None
+        if missing.all():
+            # No values to infer a kind from: use the type the row path gives an all-null column
+            values = pa.nulls(len(table))
+            if name in CATEGORICAL_COLUMNS:
+                columns[name] = values.cast(pa.string()).dictionary_encode()
+            elif name in INT32_COLUMNS:
+                columns[name] = values.cast(pa.int32())
+            elif name in FLOAT64_COLUMNS:
+                columns[name] = values.cast(pa.float64())
+            elif name == 'timestamp':
+                columns[name] = values.cast(pa.timestamp('s'))
+            else:
+                columns[name] = values
+        elif column.kind == 'category':
+            array = pa.DictionaryArray.from_arrays(
+                pa.array(column.values, mask=mask), pa.array(column.categories, type=pa.string())
+            )
+            columns[name] = array if name in CATEGORICAL_COLUMNS else array.dictionary_decode()
+        elif column.kind == 'timestamp':
+            columns[name] = pa.array(column.values, mask=mask).cast(pa.timestamp('s'))
+        elif column.kind == 'object':
+            columns[name] = pa.array(column.decoded().tolist())
+        elif name in INT32_COLUMNS:
+            columns[name] = pa.array(column.values, mask=mask).cast(pa.int32())
+        elif name in FLOAT64_COLUMNS:
+            columns[name] = pa.array(column.values, mask=mask).cast(pa.float64())
+        else:
+            columns[name] = pa.array(column.values, mask=mask)
+    
+    outcomes, counts, _ = table.histograms()
+    offsets = pa.array(table.offsets.astype(np.int32))
+    if outcomes.dtype == object:
+        columns['outcomes'] = pa.ListArray.from_arrays(offsets, pa.array([str(int(o)) for o in outcomes]))
+    else:
+        columns['outcomes'] = pa.ListArray.from_arrays(offsets, pa.array(outcomes))
+    columns['counts'] = pa.ListArray.from_arrays(offsets, pa.array(counts.astype(np.int32, copy=False)))
+    return pa.table(columns)
+
+def rows_to_arrow(results_data):
+    """Arrow table keeping each histogram as list columns of outcomes and counts"""
+    pa = load_module('pyarrow')
+    pc = load_module('pyarrow.compute')
+    
+    if isinstance(results_data, ResultTable):
+        return _table_to_arrow(results_data)
+    
+    wide = any(row['num_bits'] > 64 for row in results_data)
+    columns = {}
+    for column in _scalar_columns(results_data):
+        values = [row.get(column) for row in results_data]
+        if column in CATEGORICAL_COLUMNS:
+            columns[column] = pa.array(values, type=pa.string()).dictionary_encode()
+        elif column in INT32_COLUMNS:
+            columns[column] = pa.array(values, type=pa.int32())
+        elif column in FLOAT64_COLUMNS:
+            columns[column] = pa.array(values, type=pa.float64())
+        elif column == 'timestamp':
+            columns[column] = pc.strptime(pa.array(values, type=pa.string()), format=TIMESTAMP_FORMAT, unit='s')
+        else:
+            columns[column] = pa.array(values)
+    
+    if wide:
+        columns['outcomes'] = pa.array([[str(int(o)) for o in row['outcomes']] for row in results_data])
+    else:
+        columns['outcomes'] = pa.array(
+            [np.asarray(row['outcomes'], dtype=np.uint64) for row in results_data],
+            type=pa.list_(pa.uint64())
+        )
+    columns['counts'] = pa.array(
+        [np.asarray(row['counts'], dtype=np.int32) for row in results_data],
+        type=pa.list_(pa.int32())
+    )
+    return pa.table(columns)
+
+def results_to_parquet_bytes(results_data):
+    """Serialize results to an in-memory Parquet file"""
+    pq = load_module('pyarrow.parquet')
+    
+    buffer = io.BytesIO()
+    pq.write_table(rows_to_arrow(results_data), buffer, compression='zstd')
+    return buffer.getvalue()
+
+def known_fields():
+    """Arrow fields of the optional columns whose types are fixed, whichever rows carry them"""
+    pa = load_module('pyarrow')
+    categorical = pa.dictionary(pa.int32(), pa.string())
+    return (
+        [pa.field(name, categorical) for name in CATEGORICAL_COLUMNS]
+        + [pa.field(name, pa.int32()) for name in INT32_COLUMNS]
+        + [pa.field(name, pa.float64()) for name in FLOAT64_COLUMNS]
+    )
+
+def file_schema(table):
+    """Schema of an export file: ``table``'s columns plus every known optional column it lacks
+    
+    Reused rows arrive first and carry no timing columns, and mitigated and
+    plain rows can be mixed, so the first row group alone does not show
+    every column a run will produce.
+    """
+    pa = load_module('pyarrow')
+    scalars = [field for field in table.schema if field.name not in HISTOGRAM_KEYS]
+    extra = [field for field in known_fields() if table.schema.get_field_index(field.name) < 0]
+    histograms = [table.schema.field(name) for name in HISTOGRAM_KEYS]
+    return pa.schema(scalars + extra + histograms)
+
+def align_to_schema(table, schema, dropped=None):
+    """``table`` with exactly the fields of ``schema``
+    
+    Missing columns become nulls, and columns the schema lacks or cannot
+    hold are dropped; their names are added to ``dropped``.
+    """
+    pa = load_module('pyarrow')
+    
+    columns = []
+    for field in schema:
+        if field.name not in table.column_names:
+            columns.append(pa.nulls(len(table), field.type))
+            continue
+        column = table[field.name]
+        try:
+            columns.append(column if column.type == field.type else column.cast(field.type))
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            columns.append(pa.nulls(len(table), field.type))
+            if dropped is not None and column.null_count < len(column):
+                dropped.add(field.name)
+    if dropped is not None:
+        dropped.update(name for name in table.column_names if schema.get_field_index(name) < 0)
+    return pa.Table.from_arrays(columns, schema=schema)
+
+class ResultWriter:
+    """Append result rows to a Parquet file as jobs complete
+    
+    Rows are buffered and written as row groups, so a long run never holds
+    more than ``row_group_rows`` rows in the writer. The first row group and
+    the known optional columns fix the file's schema, and every group is
+    aligned to it. Export is a
+    by-product of a run, so a write error is logged and ends the export
+    instead of the run.
+    """
+    
+    def __init__(self, path, row_group_rows=PARQUET_ROW_GROUP_ROWS):
+        self.path = path
+        self.row_group_rows = row_group_rows
+        self.rows_written = 0
+        self.failed = False
+        self._buffer = []
+        self._writer = None
+        self._dropped = set()
+    
+    def append(self, row):
+        """Buffer one row, flushing a row group when the buffer is full"""
+        if self.failed:
+            return
+        self._buffer.append(row)
+        if len(self._buffer) >= self.row_group_rows:
+            self.flush()
+    
+    def flush(self):
+        """Write buffered rows as a Parquet row group"""
+        if not self._buffer or self.failed:
+            return
+        try:
+            self._write(rows_to_arrow(self._buffer))
+        except Exception as e:
+            logger.warning("Parquet export to %s stopped after %d rows: %s", self.path, self.rows_written, e)
+            self.failed = True
+        self._buffer = []
+    
+    def _write(self, table):
+        pq = load_module('pyarrow.parquet')
+        if self._writer is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._writer = pq.ParquetWriter(self.path, file_schema(table), compression='zstd')
+        dropped = set()
+        table = align_to_schema(table, self._writer.schema, dropped)
+        if dropped - self._dropped:
+            logger.warning("Columns missing from the Parquet schema of %s were not exported: %s",
+                           self.path, ", ".join(sorted(dropped - self._dropped)))
+            self._dropped |= dropped
+        self._writer.write_table(table)
+        self.rows_written += len(table)
+    
+    def close(self):
+        """Flush remaining rows and finalize the file"""
+        self.flush()
+        if self._writer is not None:
+            try:
+                self._writer.close()
+            except Exception as e:
+                logger.warning("Could not finalize Parquet export %s: %s", self.path, e)
+            self._writer = None
+
+def open_result_writer(run_id, export_dir=RESULTS_EXPORT_DIR):
+    """Writer for ``<export_dir>/<run_id>.parquet``, or None when export is disabled"""
+    if not export_dir or not check_pyarrow():
+        return None
+    return ResultWriter(os.path.join(export_dir, f"{run_id}.parquet"))
+
+def run_parquet_bytes(results_data, run_id=None, export_dir=RESULTS_EXPORT_DIR):
+    """Parquet file of a run, read from its streamed export when that holds every row"""
+    if run_id and export_dir:
+        path = os.path.join(export_dir, f"{run_id}.parquet")
+        try:
+            if load_module('pyarrow.parquet').read_metadata(path).num_rows == len(results_data):
+                with open(path, 'rb') as f:
+                    return f.read()
+        except Exception:
+            pass
+    return results_to_parquet_bytes(results_data)
\ No newline at end of file
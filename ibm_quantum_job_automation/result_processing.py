@@ -0,0 +1,221 @@
+"""
+Result extraction and vectorized aggregation of measurement histograms
+"""
+
+import numpy as np
+from datetime import datetime
+from config import DEFAULT_CIRCUIT_NAME
+
+# Wall-clock time of each row, as written by ``build_result_row``
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def extract_counts(pub_result, index=()):
+    """Read every classical register of a PubResult into a sparse count vector
+    
+    ``index`` selects one element of a PUB with a shape, such as one point of
+    a parameter sweep.
+    
+    Returns ``(outcomes, counts, registers, num_bits)`` where ``outcomes`` are
+    the integer values of the observed bitstrings (registers concatenated with
+    the first register in the least significant bits), ``counts`` the matching
+    shot counts and ``registers`` a ``"name[size]"`` description.
+    """
+    data = pub_result.data
+    bit_arrays = [bit_array[index] for bit_array in data.values()]
+    registers = ' '.join(f"{name}[{bit_array.num_bits}]" for name, bit_array in data.items())
+    
+    if len(bit_arrays) == 1:
+        joined = bit_arrays[0]
+    else:
+        from qiskit.primitives.containers import BitArray
+        joined = BitArray.concatenate_bits(bit_arrays)
+    
+    int_counts = joined.get_int_counts()
+    dtype = np.uint64 if joined.num_bits <= 64 else object
+    outcomes = np.fromiter(int_counts.keys(), dtype=dtype, count=len(int_counts))
+    counts = np.fromiter(int_counts.values(), dtype=np.int64, count=len(int_counts))
+    
+    return outcomes, counts, registers, joined.num_bits
+
+def build_result_row(job_id, job_idx, pub_result, shots, circ_name=DEFAULT_CIRCUIT_NAME,
+                     index=(), extra=None):
+    """Convert one PubResult into a results row covering every classical register"""
+    outcomes, counts, registers, num_bits = extract_counts(pub_result, index)
+    
+    row = {
+        'job_id': job_id,
+        'idx': job_idx,
+        'circ_name': circ_name,
+        'registers': registers,
+        'num_bits': num_bits,
+        'outcomes': outcomes,
+        'counts': counts,
+        'shots': shots,
+        'timestamp': datetime.now().strftime(TIMESTAMP_FORMAT)
+    }
+    if extra:
+        row.update(extra)
+    return row
+
+def sweep_row_fields(names, values, point, repetition):
+    """Extra row columns identifying one point of a parameter sweep"""
+    fields = {'sweep_point': point, 'repetition': repetition}
+    fields.update((f"param_{name}", float(value)) for name, value in zip(names, values))
+    return fields
+
+def outcome_label(outcome, num_bits):
+    """Format an integer outcome as a zero-padded bitstring"""
+    return format(int(outcome), f'0{num_bits}b')
+
+def row_values(results_data, name):
+    """One field of every row, read straight from the column of a ``ResultTable``"""
+    if hasattr(results_data, 'column'):
+        return results_data.column(name)
+    return [row.get(name) for row in results_data]
+
+def count_jobs(results_data, only=None):
+    """Number of distinct runtime jobs behind the rows (a job holds one row per circuit, register or sweep point)
+    
+    ``only`` restricts the count to rows whose field of that name is set.
+    """
+    job_ids = row_values(results_data, 'job_id')
+    if only is not None:
+        job_ids = [job_id for job_id, value in zip(job_ids, row_values(results_data, only)) if value]
+    return len(set(job_ids))
+
+def count_matrix(results_data):
+    """Stack per-job histograms into a dense ``(jobs, outcomes)`` count matrix
+    
+    Only outcomes observed in at least one job get a column, so the matrix
+    stays small even for wide registers. A ``ResultTable`` hands over its
+    concatenated histograms without touching individual rows.
+    """
+    if not len(results_data):
+        return np.zeros(0, dtype=np.uint64), np.zeros((0, 0), dtype=np.int64)
+    
+    if hasattr(results_data, 'histograms'):
+        outcomes, counts, lengths = results_data.histograms()
+    else:
+        outcomes = np.concatenate([row['outcomes'] for row in results_data])
+        counts = np.concatenate([row['counts'] for row in results_data])
+        lengths = np.fromiter((len(row['outcomes']) for row in results_data), dtype=np.int64)
+    job_index = np.repeat(np.arange(len(results_data)), lengths)
+    
+    unique, inverse = np.unique(outcomes, return_inverse=True)
+    flat = np.bincount(
+        job_index * len(unique) + inverse,
+        weights=counts,
+        minlength=len(results_data) * len(unique)
+    )
+    return unique, flat.reshape(len(results_data), len(unique)).astype(np.int64)
+
+def aggregate_counts(results_data):
+    """Totals, per-outcome probabilities and per-bit marginals across jobs"""
+    outcomes, matrix = count_matrix(results_data)
+    num_bits = int(max(row_values(results_data, 'num_bits'), default=0))
+    
+    totals = matrix.sum(axis=0)
+    shots_per_job = matrix.sum(axis=1)
+    total_shots = int(totals.sum())
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        job_probabilities = np.nan_to_num(matrix / shots_per_job[:, None])
+    probabilities = totals / total_shots if total_shots else np.zeros(len(totals))
+    
+    # Probability of reading 1 on each classical bit (bit 0 first)
+    marginals = np.zeros(num_bits)
+    if total_shots and outcomes.dtype != object:
+        bits = (outcomes[:, None] >> np.arange(num_bits, dtype=np.uint64)) & np.uint64(1)
+        marginals = bits.astype(np.int64).T @ totals / total_shots
+    elif total_shots:
+        for bit in range(num_bits):
+            mask = np.array([(int(o) >> bit) & 1 for o in outcomes], dtype=bool)
+            marginals[bit] = totals[mask].sum() / total_shots
+    
+    return {
+        'outcomes': outcomes,
+        'labels': [outcome_label(o, num_bits) for o in outcomes],
+        'num_bits': num_bits,
+        'matrix': matrix,
+        'totals': totals,
+        'total_shots': total_shots,
+        'probabilities': probabilities,
+        'job_probabilities': job_probabilities,
+        'marginals': marginals
+    }
+
+def results_to_records(results_data):
+    """Flatten rows into table records with one ``count_<bitstring>`` column per outcome"""
+    if not results_data:
+        return []
+    
+    num_bits = max(row['num_bits'] for row in results_data)
+    outcomes, matrix = count_matrix(results_data)
+    columns = [f"count_{outcome_label(o, num_bits)}" for o in outcomes]
+    
+    records = []
+    for row, job_counts in zip(results_data, matrix.tolist()):
+        record = {k: v for k, v in row.items() if k not in ('outcomes', 'counts')}
+        record.update(zip(columns, job_counts))
+        records.append(record)
+    return records
+
+def aggregate_sweep(results_data, names):
+    """Pool every repetition of each sweep point into outcome probabilities
+    
+    Returns ``(labels, point_values, probabilities)`` with one row per grid
+    point: ``point_values`` holds the ``names`` parameter values and
+    ``probabilities`` the per-outcome probabilities at that point.
+    """
+    num_bits = int(max(row_values(results_data, 'num_bits')))
+    outcomes, matrix = count_matrix(results_data)
+    points = np.asarray(row_values(results_data, 'sweep_point'), dtype=np.int64)
+    num_points = int(points.max()) + 1
+    
+    totals = np.zeros((num_points, len(outcomes)), dtype=np.int64)
+    np.add.at(totals, points, matrix)
+    shots = totals.sum(axis=1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        probabilities = np.nan_to_num(totals / shots)
+    
+    point_values = np.zeros((num_points, len(names)))
+    values = [np.asarray(row_values(results_data, f"param_{name}"), dtype=float) for name in names]
+    point_values[points] = np.array(values, dtype=float).T.reshape(len(results_data), len(names))
+    
+    labels = [outcome_label(o, num_bits) for o in outcomes]
+    return labels, point_values, probabilities
+
+def aggregate_by_circuit(results_data):
+    """Pool every repetition of each circuit into outcome probabilities
+    
+    Returns a dict with one row per circuit (in first-seen order) of
+    ``names``, ``hashes``, ``jobs``, per-outcome ``totals`` and
+    ``probabilities``, plus the shared outcome ``labels``.
+    """
+    num_bits = int(max(row_values(results_data, 'num_bits')))
+    outcomes, matrix = count_matrix(results_data)
+    
+    names = {}
+    circ_names = row_values(results_data, 'circ_name')
+    for name, circ_hash in zip(circ_names, row_values(results_data, 'circ_hash')):
+        names.setdefault(name, circ_hash)
+    position = {name: i for i, name in enumerate(names)}
+    groups = np.fromiter((position[name] for name in circ_names), dtype=np.int64, count=len(results_data))
+    
+    totals = np.zeros((len(names), len(outcomes)), dtype=np.int64)
+    np.add.at(totals, groups, matrix)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        probabilities = np.nan_to_num(totals / totals.sum(axis=1, keepdims=True))
+    
+    return {
+        'names': list(names),
+        'hashes': list(names.values()),
+        'jobs': np.bincount(groups, minlength=len(names)),
+        'labels': [outcome_label(o, num_bits) for o in outcomes],
+        'totals': totals,
+        'probabilities': probabilities
+    }
+
+def total_variation_distances(probabilities):
+    """Pairwise total variation distance between the rows of a probability matrix"""
+    return 0.5 * np.abs(probabilities[:, None, :] - probabilities[None, :, :]).sum(axis=2)
\ No newline at end of file
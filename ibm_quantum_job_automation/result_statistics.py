@@ -0,0 +1,350 @@
+"""
+Statistical analysis of repeated jobs: confidence intervals, job-to-job consistency and drift
+"""
+
+import threading
+import numpy as np
+from config import STATS_CONFIDENCE, STATS_BOOTSTRAP_RESAMPLES, STATS_TOP_OUTCOMES, STATS_BOOTSTRAP_CELLS
+from dependencies import load_module
+from result_processing import outcome_label
+
+def z_score(confidence):
+    """Two-sided normal critical value for a confidence level"""
+    return float(load_module('scipy.stats').norm.ppf(0.5 + confidence / 2))
+
+def wilson_interval(successes, trials, confidence=STATS_CONFIDENCE):
+    """Vectorized Wilson score interval ``(low, high)`` for binomial proportions
+    
+    Inputs broadcast against each other; zero trials give ``(0, 1)``.
+    """
+    successes, trials = np.broadcast_arrays(
+        np.asarray(successes, dtype=np.float64), np.asarray(trials, dtype=np.float64)
+    )
+    z = z_score(confidence)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p = successes / trials
+        denominator = 1 + z ** 2 / trials
+        center = (p + z ** 2 / (2 * trials)) / denominator
+        half = z * np.sqrt(p * (1 - p) / trials + z ** 2 / (4 * trials ** 2)) / denominator
+    empty = trials == 0
+    low = np.where(empty, 0.0, np.clip(center - half, 0.0, 1.0))
+    high = np.where(empty, 1.0, np.clip(center + half, 0.0, 1.0))
+    return low, high
+
+class RunStatistics:
+    """Statistics over the repeated jobs of one run, updated as rows arrive
+    
+    ``add`` folds a row into per-outcome running sums (and is a no-op for a
+    job it has already seen), so pooled probabilities and drift slopes cost
+    O(outcomes) to read however many jobs the run has. Per-job intervals,
+    the chi-square test and the bootstrap use the most frequent outcomes
+    only and are memoized until the next row arrives.
+    """
+    
+    def __init__(self, confidence=STATS_CONFIDENCE):
+        self.confidence = confidence
+        self._lock = threading.RLock()
+        self._seen = set()
+        self._cache = {}
+        self._num_bits = 0
+        
+        # Outcome -> column: sorted keys for vectorized lookup, or a dict
+        # once outcomes no longer fit in 64 bits
+        self._keys = []
+        self._sorted_keys = np.zeros(0, dtype=np.uint64)
+        self._sorted_columns = np.zeros(0, dtype=np.int64)
+        self._index = None
+        
+        # Per-outcome running sums: shot totals and, for the drift
+        # regression of per-job probability on job index, sums of p, x*p and p^2
+        self._totals = np.zeros(0, dtype=np.int64)
+        self._sum_p = np.zeros(0)
+        self._sum_xp = np.zeros(0)
+        self._sum_pp = np.zeros(0)
+        self._sum_x = 0.0
+        self._sum_xx = 0.0
+        
+        # Sparse per-job histograms in arrival order
+        self._job_x = []
+        self._job_shots = []
+        self._job_columns = []
+        self._job_counts = []
+    
+    @classmethod
+    def from_rows(cls, results_data, confidence=STATS_CONFIDENCE):
+        """Statistics over rows that have already been collected"""
+        statistics = cls(confidence)
+        statistics.extend(results_data)
+        return statistics
+    
+    @property
+    def num_jobs(self):
+        return len(self._job_x)
+    
+    @property
+    def total_shots(self):
+        return int(self._totals.sum())
+    
+    def extend(self, rows):
+        for row in rows:
+            self.add(row)
+    
+    def add(self, row):
+        """Fold one results row into the statistics; returns False for a job already added"""
+        key = (row.get('job_id'), row['idx'], row.get('sweep_point'))
+        counts = np.asarray(row['counts'], dtype=np.int64)
+        shots = int(counts.sum())
+        
+        with self._lock:
+            if key in self._seen:
+                return False
+            self._seen.add(key)
+            if not shots:
+                return True
+            
+            columns = self._columns(np.asarray(row['outcomes']))
+            self._num_bits = max(self._num_bits, row['num_bits'])
+            x = float(row['idx'])
+            p = counts / shots
+            
+            # Columns are unique within a row, so fancy-index increments are safe
+            self._totals[columns] += counts
+            self._sum_p[columns] += p
+            self._sum_xp[columns] += x * p
+            self._sum_pp[columns] += p * p
+            self._sum_x += x
+            self._sum_xx += x * x
+            
+            self._job_x.append(x)
+            self._job_shots.append(shots)
+            self._job_columns.append(columns)
+            self._job_counts.append(counts)
+            self._cache.clear()
+            return True
+    
+    def _columns(self, outcomes):
+        """Column of every outcome, allocating columns for unseen outcomes"""
+        if outcomes.dtype == object and self._index is None:
+            self._index = {key: column for column, key in enumerate(self._keys)}
+        if self._index is not None:
+            columns = np.empty(len(outcomes), dtype=np.int64)
+            for i, outcome in enumerate(outcomes.tolist()):
+                column = self._index.get(outcome)
+                if column is None:
+                    column = self._index[outcome] = len(self._keys)
+                    self._keys.append(outcome)
+                    self._grow(len(self._keys))
+                columns[i] = column
+            return columns
+        
+        outcomes = outcomes.astype(np.uint64)
+        positions = np.searchsorted(self._sorted_keys, outcomes)
+        found = np.zeros(len(outcomes), dtype=bool)
+        inside = positions < len(self._sorted_keys)
+        found[inside] = self._sorted_keys[positions[inside]] == outcomes[inside]
+        
+        columns = np.empty(len(outcomes), dtype=np.int64)
+        columns[found] = self._sorted_columns[positions[found]]
+        if not found.all():
+            new_keys = outcomes[~found]
+            new_columns = np.arange(len(self._keys), len(self._keys) + len(new_keys))
+            columns[~found] = new_columns
+            self._keys.extend(new_keys.tolist())
+            self._grow(len(self._keys))
+            
+            keys = np.concatenate([self._sorted_keys, new_keys])
+            order = np.argsort(keys, kind='stable')
+            self._sorted_keys = keys[order]
+            self._sorted_columns = np.concatenate([self._sorted_columns, new_columns])[order]
+        return columns
+    
+    def _grow(self, size):
+        """Make room for ``size`` outcome columns, doubling capacity"""
+        if size <= len(self._totals):
+            return
+        capacity = max(size, 2 * len(self._totals), 16)
+        for name in ('_totals', '_sum_p', '_sum_xp', '_sum_pp'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+    
+    def _memoized(self, key, compute):
+        with self._lock:
+            if key not in self._cache:
+                self._cache[key] = compute()
+            return self._cache[key]
+    
+    def pooled(self):
+        """Pooled count, probability and Wilson interval of every outcome, most frequent first"""
+        return self._memoized('pooled', self._compute_pooled)
+    
+    def _compute_pooled(self):
+        totals = self._totals[:len(self._keys)]
+        order = np.argsort(-totals, kind='stable')
+        counts = totals[order]
+        total_shots = int(counts.sum())
+        low, high = wilson_interval(counts, total_shots, self.confidence)
+        return {
+            'columns': order,
+            'labels': [outcome_label(self._keys[column], self._num_bits) for column in order.tolist()],
+            'counts': counts,
+            'probabilities': counts / total_shots if total_shots else np.zeros(len(counts)),
+            'ci_low': low,
+            'ci_high': high,
+            'total_shots': total_shots
+        }
+    
+    def per_job(self, top=STATS_TOP_OUTCOMES):
+        """Per-job counts, probabilities and Wilson intervals of the ``top`` outcomes in job order"""
+        return self._memoized(('per_job', top), lambda: self._compute_per_job(top))
+    
+    def _compute_per_job(self, top):
+        pooled = self.pooled()
+        columns = pooled['columns'][:top]
+        num_jobs = len(self._job_x)
+        
+        # Scatter the selected columns of the sparse histograms into a dense matrix
+        lookup = np.full(len(self._keys), -1, dtype=np.int64)
+        lookup[columns] = np.arange(len(columns))
+        counts = np.zeros((num_jobs, len(columns)), dtype=np.int64)
+        if num_jobs:
+            lengths = np.fromiter((len(c) for c in self._job_columns), dtype=np.int64, count=num_jobs)
+            job_index = np.repeat(np.arange(num_jobs), lengths)
+            selected = lookup[np.concatenate(self._job_columns)]
+            keep = selected >= 0
+            counts[job_index[keep], selected[keep]] = np.concatenate(self._job_counts)[keep]
+        
+        x = np.array(self._job_x)
+        order = np.argsort(x, kind='stable')
+        counts = counts[order]
+        shots = np.array(self._job_shots, dtype=np.int64)[order]
+        low, high = wilson_interval(counts, shots[:, None], self.confidence)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            probabilities = np.nan_to_num(counts / shots[:, None])
+        return {
+            'idx': x[order].astype(np.int64),
+            'labels': pooled['labels'][:top],
+            'counts': counts,
+            'shots': shots,
+            'probabilities': probabilities,
+            'ci_low': low,
+            'ci_high': high
+        }
+    
+    def consistency(self, top=STATS_TOP_OUTCOMES):
+        """Chi-square test that every job samples the same distribution
+        
+        Outcomes beyond the ``top`` most frequent are pooled into one bin so
+        sparse tails do not dominate the statistic. Returns ``None`` with
+        fewer than two jobs or outcome bins.
+        """
+        return self._memoized(('consistency', top), lambda: self._compute_consistency(top))
+    
+    def _compute_consistency(self, top):
+        per_job = self.per_job(top)
+        other = per_job['shots'] - per_job['counts'].sum(axis=1)
+        table = np.column_stack([per_job['counts'], other]).astype(np.float64)
+        table = table[:, table.sum(axis=0) > 0]
+        num_jobs, num_bins = table.shape
+        if num_jobs < 2 or num_bins < 2:
+            return None
+        
+        expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / table.sum()
+        chi2 = float(((table - expected) ** 2 / expected).sum())
+        dof = (num_jobs - 1) * (num_bins - 1)
+        return {
+            'chi2': chi2,
+            'dof': dof,
+            'reduced_chi2': chi2 / dof,
+            'p_value': float(load_module('scipy.stats').chi2.sf(chi2, dof)),
+            'min_expected': float(expected.min())
+        }
+    
+    def drift(self, top=STATS_TOP_OUTCOMES):
+        """Least-squares trend of each top outcome's per-job probability over job index
+        
+        Computed from the running sums; ``change`` is the fitted difference
+        between the first and last job. Returns ``None`` with fewer than
+        three jobs.
+        """
+        return self._memoized(('drift', top), lambda: self._compute_drift(top))
+    
+    def _compute_drift(self, top):
+        n = len(self._job_x)
+        centered_xx = self._sum_xx - self._sum_x ** 2 / n if n else 0.0
+        if n < 3 or centered_xx <= 0:
+            return None
+        
+        pooled = self.pooled()
+        columns = pooled['columns'][:top]
+        sum_p, sum_xp, sum_pp = self._sum_p[columns], self._sum_xp[columns], self._sum_pp[columns]
+        slope = (sum_xp - self._sum_x * sum_p / n) / centered_xx
+        intercept = (sum_p - slope * self._sum_x) / n
+        residual = np.maximum(sum_pp - intercept * sum_p - slope * sum_xp, 0.0)
+        stderr = np.sqrt(residual / (n - 2) / centered_xx)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            t = np.where(stderr > 0, slope / stderr, 0.0)
+        return {
+            'labels': pooled['labels'][:top],
+            'slope': slope,
+            'stderr': stderr,
+            'change': slope * (max(self._job_x) - min(self._job_x)),
+            'p_value': 2 * load_module('scipy.stats').t.sf(np.abs(t), n - 2)
+        }
+    
+    def bootstrap(self, top=STATS_TOP_OUTCOMES, resamples=STATS_BOOTSTRAP_RESAMPLES, seed=0):
+        """Percentile interval of the pooled top-outcome probabilities, resampling whole jobs
+        
+        Unlike the Wilson interval this includes job-to-job variation.
+        Returns ``(low, high)`` arrays, or ``None`` with fewer than two jobs.
+        """
+        return self._memoized(('bootstrap', top, resamples, seed),
+                              lambda: self._compute_bootstrap(top, resamples, seed))
+    
+    def _compute_bootstrap(self, top, resamples, seed):
+        per_job = self.per_job(top)
+        num_jobs = len(per_job['shots'])
+        if num_jobs < 2:
+            return None
+        
+        rng = np.random.default_rng(seed)
+        counts = per_job['counts'].astype(np.float64)
+        shots = per_job['shots'].astype(np.float64)
+        # Resample in chunks so the weight matrix stays bounded for huge runs;
+        # each resample's job multiplicities come from one bincount of draws
+        chunk = max(1, STATS_BOOTSTRAP_CELLS // num_jobs)
+        estimates = []
+        for start in range(0, resamples, chunk):
+            size = min(chunk, resamples - start)
+            draws = rng.integers(0, num_jobs, size * num_jobs) + np.repeat(np.arange(size) * num_jobs, num_jobs)
+            weights = np.bincount(draws, minlength=size * num_jobs).reshape(size, num_jobs).astype(np.float64)
+            estimates.append((weights @ counts) / (weights @ shots)[:, None])
+        
+        alpha = (1 - self.confidence) / 2
+        low, high = np.quantile(np.concatenate(estimates), [alpha, 1 - alpha], axis=0)
+        return low, high
+    
+    def outcome_table(self, top=STATS_TOP_OUTCOMES):
+        """One record per top outcome combining the pooled, bootstrap and drift statistics"""
+        pooled = self.pooled()
+        bootstrap = self.bootstrap(top)
+        drift = self.drift(top)
+        
+        records = []
+        for i, label in enumerate(pooled['labels'][:top]):
+            record = {
+                'outcome': label,
+                'count': int(pooled['counts'][i]),
+                'probability': float(pooled['probabilities'][i]),
+                'wilson_low': float(pooled['ci_low'][i]),
+                'wilson_high': float(pooled['ci_high'][i])
+            }
+            if bootstrap is not None:
+                record['bootstrap_low'] = float(bootstrap[0][i])
+                record['bootstrap_high'] = float(bootstrap[1][i])
+            if drift is not None:
+                record['drift_change'] = float(drift['change'][i])
+                record['drift_p_value'] = float(drift['p_value'][i])
+            records.append(record)
+        return records
\ No newline at end of file
@@ -0,0 +1,444 @@
+"""
+Compact columnar result storage: one table per run and a bounded per-session run history
+"""
+
+import calendar
+import json
+import os
+import shutil
+import sys
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+import numpy as np
+from config import RESULTS_SESSION_MEMORY_MB, RESULTS_HISTORY_RUNS, RESULTS_SPILL_DIR, RESULTS_SPILL_MAX_AGE
+from result_processing import TIMESTAMP_FORMAT
+from dependencies import load_module
+
+# Row fields holding the sparse histogram
+HISTOGRAM_KEYS = ('outcomes', 'counts')
+
+# Per-row state of a column when it does not hold a value
+NULL, ABSENT = 1, 2
+
+def _epoch(text):
+    """Wall-clock timestamp string as whole seconds since 1970, without any time zone shift"""
+    return calendar.timegm(time.strptime(text, TIMESTAMP_FORMAT))
+
+def _format_epoch(seconds):
+    return time.strftime(TIMESTAMP_FORMAT, time.gmtime(seconds))
+
+def _column_kind(name, values):
+    """Storage kind for the non-missing values of one field"""
+    if not values:
+        return 'category'
+    if all(isinstance(value, str) for value in values):
+        if name == 'timestamp':
+            try:
+                for value in values:
+                    time.strptime(value, TIMESTAMP_FORMAT)
+                return 'timestamp'
+            except ValueError:
+                pass
+        return 'category'
+    if all(isinstance(value, (bool, np.bool_)) for value in values):
+        return 'bool'
+    if all(isinstance(value, (int, np.integer)) and not isinstance(value, (bool, np.bool_)) for value in values):
+        return 'int'
+    if all(isinstance(value, (int, float, np.integer, np.floating)) for value in values):
+        return 'float'
+    return 'object'
+
+def _smallest_int(values):
+    """``values`` as int32 when they fit, int64 otherwise"""
+    array = np.asarray(values, dtype=np.int64)
+    if len(array) and (array.min() < np.iinfo(np.int32).min or array.max() > np.iinfo(np.int32).max):
+        return array
+    return array.astype(np.int32)
+
+class Column:
+    """One scalar field of a run
+    
+    ``values`` holds int32 codes into ``categories`` for strings (-1 when
+    missing), epoch seconds for timestamps and plain NumPy values otherwise.
+    ``state`` marks rows where the field is None or absent, and is None when
+    every row has a value.
+    """
+    
+    def __init__(self, kind, values, state=None, categories=None):
+        self.kind = kind
+        self.values = values
+        self.state = state
+        self.categories = categories
+    
+    @classmethod
+    def from_values(cls, name, values, state, interned):
+        present = [value for value, flag in zip(values, state) if not flag]
+        kind = _column_kind(name, present)
+        filled = state != 0
+        
+        categories = None
+        if kind == 'category':
+            # Strings repeat on every row, so each is stored once and referenced by code
+            codes, lookup = np.full(len(values), -1, dtype=np.int32), {}
+            for i, value in enumerate(values):
+                if not filled[i]:
+                    code = lookup.get(value)
+                    if code is None:
+                        code = lookup[value] = len(lookup)
+                    codes[i] = code
+            categories = [interned.setdefault(value, sys.intern(value)) for value in lookup]
+            array = codes
+        elif kind == 'timestamp':
+            array = np.array([0 if filled[i] else _epoch(value) for i, value in enumerate(values)], dtype=np.int64)
+        elif kind == 'int':
+            array = _smallest_int([0 if filled[i] else value for i, value in enumerate(values)])
+        elif kind == 'float':
+            array = np.array([np.nan if filled[i] else value for i, value in enumerate(values)], dtype=np.float64)
+        elif kind == 'bool':
+            array = np.array([False if filled[i] else value for i, value in enumerate(values)], dtype=bool)
+        else:
+            array = np.empty(len(values), dtype=object)
+            array[:] = values
+        return cls(kind, array, state if filled.any() else None, categories)
+    
+    def value(self, i):
+        if self.kind == 'category':
+            return self.categories[self.values[i]]
+        if self.kind == 'timestamp':
+            return _format_epoch(int(self.values[i]))
+        if self.kind == 'object':
+            return self.values[i]
+        return self.values[i].item()
+    
+    def missing(self):
+        """Rows where the field is None or absent"""
+        if self.state is None:
+            return np.zeros(len(self.values), dtype=bool)
+        return self.state != 0
+    
+    def decoded(self):
+        """Python-level values of every row, None where missing"""
+        if self.kind == 'category':
+            return np.array(self.categories + [None], dtype=object)[self.values]
+        if self.kind == 'timestamp':
+            values = np.array([_format_epoch(int(seconds)) for seconds in self.values], dtype=object)
+        elif self.state is None:
+            return self.values
+        else:
+            values = self.values.astype(object)
+        values[self.missing()] = None
+        return values
+    
+    def take(self, indices):
+        state = self.state[indices] if self.state is not None else None
+        if state is not None and not state.any():
+            state = None
+        return Column(self.kind, self.values[indices], state, self.categories)
+    
+    @property
+    def nbytes(self):
+        size = self.values.nbytes + (self.state.nbytes if self.state is not None else 0)
+        if self.kind == 'object':
+            size += sum(sys.getsizeof(value) for value in self.values)
+        return size
+
+class ResultTable:
+    """The result rows of one run stored column-wise
+    
+    Each scalar field is a ``Column``; histograms of every row are kept as
+    one CSR block of concatenated ``outcomes`` and ``counts`` with per-row
+    ``offsets``. Indexing or iterating yields row dicts whose histograms are
+    views into the block, so code written for lists of rows keeps working,
+    while ``count_matrix``, ``results_to_frame`` and ``rows_to_arrow`` read
+    the columns directly.
+    """
+    
+    def __init__(self, columns, outcomes, counts, offsets):
+        self.columns = columns
+        self.outcomes = outcomes
+        self.counts = counts
+        self.offsets = offsets
+    
+    @classmethod
+    def from_rows(cls, rows, interned=None):
+        """Build a table from row dicts; ``interned`` shares category strings between tables"""
+        rows = list(rows)
+        interned = {} if interned is None else interned
+        names = list(dict.fromkeys(key for row in rows for key in row if key not in HISTOGRAM_KEYS))
+        
+        columns = {}
+        for name in names:
+            values = [row.get(name) for row in rows]
+            state = np.fromiter(
+                (0 if value is not None else NULL if name in row else ABSENT for row, value in zip(rows, values)),
+                dtype=np.int8, count=len(rows)
+            )
+            columns[name] = Column.from_values(name, values, state, interned)
+        
+        lengths = np.fromiter((len(row['outcomes']) for row in rows), dtype=np.int64, count=len(rows))
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        wide = any(np.asarray(row['outcomes']).dtype == object for row in rows)
+        if rows:
+            outcomes = np.concatenate([np.asarray(row['outcomes'], dtype=object if wide else np.uint64) for row in rows])
+            counts = np.concatenate([np.asarray(row['counts'], dtype=np.int64) for row in rows])
+        else:
+            outcomes, counts = np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.int64)
+        if not len(counts) or counts.max() <= np.iinfo(np.int32).max:
+            counts = counts.astype(np.int32)
+        return cls(columns, outcomes, counts, offsets)
+    
+    def __len__(self):
+        return len(self.offsets) - 1
+    
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        
+        row = {}
+        for name, column in self.columns.items():
+            state = column.state[i] if column.state is not None else 0
+            if state != ABSENT:
+                row[name] = None if state == NULL else column.value(i)
+        start, stop = self.offsets[i], self.offsets[i + 1]
+        row['outcomes'] = self.outcomes[start:stop]
+        row['counts'] = self.counts[start:stop]
+        return row
+    
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+    
+    def column(self, name):
+        """Values of one field for every row, None where a row lacks it"""
+        if name not in self.columns:
+            return np.full(len(self), None, dtype=object)
+        return self.columns[name].decoded()
+    
+    def has_values(self, name):
+        """Rows that carry a value for ``name``"""
+        if name not in self.columns:
+            return np.zeros(len(self), dtype=bool)
+        return ~self.columns[name].missing()
+    
+    def histograms(self):
+        """``(outcomes, counts, lengths)`` of every row's histogram, concatenated"""
+        return self.outcomes, self.counts, np.diff(self.offsets)
+    
+    def take(self, indices):
+        """New table with the rows at ``indices``, in that order"""
+        indices = np.asarray(indices, dtype=np.int64)
+        starts = self.offsets[indices]
+        lengths = self.offsets[indices + 1] - starts
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        positions = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return ResultTable(
+            {name: column.take(indices) for name, column in self.columns.items()},
+            self.outcomes[positions], self.counts[positions], offsets
+        )
+    
+    def where(self, name, value):
+        """Rows whose ``name`` field equals ``value``"""
+        return self.take(np.flatnonzero(self.column(name) == value))
+    
+    def scalar_frame(self):
+        """DataFrame of the scalar columns, sharing the table's arrays where pandas allows
+        
+        Strings become categoricals over the stored codes and timestamps a
+        ``datetime64[s]`` view of the epoch seconds.
+        """
+        pd = load_module('pandas')
+        
+        data = {}
+        for name, column in self.columns.items():
+            missing = column.missing()
+            if column.kind == 'category':
+                data[name] = pd.Categorical.from_codes(column.values, column.categories)
+            elif column.kind == 'timestamp':
+                values = column.values.view('datetime64[s]')
+                if missing.any():
+                    values = values.copy()
+                    values[missing] = np.datetime64('NaT')
+                data[name] = values
+            elif column.kind == 'object' or not missing.any():
+                data[name] = column.values
+            else:
+                data[name] = column.decoded()
+        return pd.DataFrame(data)
+    
+    @property
+    def nbytes(self):
+        """Approximate memory held by the table"""
+        size = self.outcomes.nbytes + self.counts.nbytes + self.offsets.nbytes
+        if self.outcomes.dtype == object:
+            size += sum(sys.getsizeof(outcome) for outcome in self.outcomes)
+        return size + sum(column.nbytes for column in self.columns.values())
+    
+    def save(self, path):
+        """Write the table to an ``.npz`` file readable without pickle"""
+        arrays = {'offsets': self.offsets, 'counts': self.counts}
+        if self.outcomes.dtype == object:
+            arrays['outcomes_text'] = np.array([str(int(o)) for o in self.outcomes], dtype=str)
+        else:
+            arrays['outcomes'] = self.outcomes
+        
+        meta = []
+        for number, (name, column) in enumerate(self.columns.items()):
+            meta.append([name, column.kind, column.categories])
+            if column.kind == 'object':
+                arrays[f"values_{number}"] = np.array(json.dumps(column.values.tolist()))
+            else:
+                arrays[f"values_{number}"] = column.values
+            if column.state is not None:
+                arrays[f"state_{number}"] = column.state
+        arrays['meta'] = np.array(json.dumps(meta))
+        
+        with open(path, 'wb') as f:
+            np.savez(f, **arrays)
+    
+    @classmethod
+    def load(cls, path, interned=None):
+        """Read a table written by ``save``"""
+        interned = {} if interned is None else interned
+        with np.load(path, allow_pickle=False) as data:
+            columns = {}
+            for number, (name, kind, categories) in enumerate(json.loads(str(data['meta']))):
+                if kind == 'object':
+                    values = np.empty(len(data['offsets']) - 1, dtype=object)
+                    values[:] = json.loads(str(data[f"values_{number}"]))
+                else:
+                    values = data[f"values_{number}"]
+                if categories is not None:
+                    categories = [interned.setdefault(value, sys.intern(value)) for value in categories]
+                state = data[f"state_{number}"] if f"state_{number}" in data else None
+                columns[name] = Column(kind, values, state, categories)
+            
+            if 'outcomes_text' in data:
+                outcomes = np.array([int(o) for o in data['outcomes_text']], dtype=object)
+            else:
+                outcomes = data['outcomes']
+            return cls(columns, outcomes, data['counts'], data['offsets'])
+
+def approx_nbytes(value):
+    """Approximate memory held by a value derived from a run: tables, arrays, DataFrames and containers of them"""
+    if isinstance(value, ResultTable):
+        return value.nbytes
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if hasattr(value, 'memory_usage'):
+        return int(np.sum(value.memory_usage(deep=True)))
+    if isinstance(value, dict):
+        return sum(approx_nbytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(approx_nbytes(item) for item in value)
+    return sys.getsizeof(value)
+
+def remove_stale_spills(root=RESULTS_SPILL_DIR, max_age=RESULTS_SPILL_MAX_AGE):
+    """Delete session spill directories under ``root`` unused for ``max_age`` seconds
+    
+    Catches what a session's own cleanup missed, e.g. after the process was killed.
+    """
+    try:
+        entries = list(os.scandir(root))
+    except OSError:
+        return
+    cutoff = time.time() - max_age
+    for entry in entries:
+        try:
+            if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+        except OSError:
+            pass
+
+class ResultHistory:
+    """The runs of one session, newest last, with a cap on the memory they hold
+    
+    Once the tables in memory, plus the views derived from the run on
+    display (see ``track_views``), exceed ``memory_limit`` bytes, the oldest
+    runs other than the one on display are spilled to ``spill_dir`` and
+    loaded back when selected again. Beyond ``max_runs`` the oldest runs are
+    dropped, files included. ``spill_dir`` is removed once the history is
+    garbage collected, which happens when its session ends. Category strings
+    are interned across runs.
+    """
+    
+    def __init__(self, spill_dir, memory_limit=RESULTS_SESSION_MEMORY_MB * 2 ** 20, max_runs=RESULTS_HISTORY_RUNS):
+        self.spill_dir = spill_dir
+        self.memory_limit = memory_limit
+        self.max_runs = max_runs
+        self.current = None
+        self.view_bytes = 0
+        self._runs = OrderedDict()
+        self._interned = {}
+        weakref.finalize(self, shutil.rmtree, spill_dir, True)
+    
+    def table(self, rows):
+        """Columnar table of ``rows`` sharing this session's interned strings"""
+        if isinstance(rows, ResultTable):
+            return rows
+        return ResultTable.from_rows(rows, self._interned)
+    
+    def add(self, table, label, key=None):
+        """Store a run, make it the current one and return its key"""
+        key = key or uuid.uuid4().hex
+        self._drop(key)
+        self._runs[key] = {'label': label, 'rows': len(table), 'table': table, 'path': None}
+        self.current = key
+        self.view_bytes = 0
+        self._enforce()
+        return key
+    
+    def get(self, key):
+        """Table of a run, loading it back from disk if it was spilled, and make it current"""
+        entry = self._runs[key]
+        if entry['table'] is None:
+            entry['table'] = ResultTable.load(entry['path'], self._interned)
+        if key != self.current:
+            self.current = key
+            self.view_bytes = 0
+        self._enforce()
+        return entry['table']
+    
+    def runs(self):
+        """``(key, label, in_memory)`` of every run, oldest first"""
+        return [(key, entry['label'], entry['table'] is not None) for key, entry in self._runs.items()]
+    
+    def track_views(self, nbytes):
+        """Count ``nbytes`` of frames and other values derived from the current run against the cap"""
+        self.view_bytes = nbytes
+        self._enforce()
+    
+    @property
+    def memory_bytes(self):
+        tables = sum(entry['table'].nbytes for entry in self._runs.values() if entry['table'] is not None)
+        return tables + self.view_bytes
+    
+    def _enforce(self):
+        for key in [key for key in self._runs if key != self.current][:max(len(self._runs) - self.max_runs, 0)]:
+            self._drop(key)
+        for key, entry in self._runs.items():
+            if self.memory_bytes <= self.memory_limit:
+                break
+            if key != self.current and entry['table'] is not None:
+                self._spill(entry, key)
+    
+    def _spill(self, entry, key):
+        if entry['path'] is None:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            entry['path'] = os.path.join(self.spill_dir, f"{key}.npz")
+            entry['table'].save(entry['path'])
+        entry['table'] = None
+    
+    def _drop(self, key):
+        entry = self._runs.pop(key, None)
+        if entry and entry['path'] and os.path.exists(entry['path']):
+            os.remove(entry['path'])
+    
+    def clear(self):
+        for key in list(self._runs):
+            self._drop(key)
+        self.current = None
+        self.view_bytes = 0
\ No newline at end of file
@@ -0,0 +1,141 @@
+"""
+Process-wide pool of authenticated IBM Quantum services and backend handles
+"""
+
+import hashlib
+import re
+import threading
+import time
+from config import IBM_CHANNEL, SERVICE_CACHE_TTL
+from dependencies import load_module
+
+# HTTP status of an authentication failure, and phrases that identify one when only the message is available
+AUTH_STATUS_CODES = frozenset((401,))
+AUTH_ERROR_MARKERS = ("unauthorized", "not authorized", "invalid token")
+
+# Status codes as HTTP clients print them, e.g. "401 Client Error" or "status code: 401"
+STATUS_CODE_PATTERN = re.compile(r"\b(\d{3}) (?:client|server) error\b|\bstatus(?: code)?\s*[:=]?\s*(\d{3})\b")
+
+def hash_token(token, channel=IBM_CHANNEL):
+    """Hash a token so the raw value is never used as a cache key"""
+    return hashlib.sha256(f"{channel}:{token}".encode("utf-8")).hexdigest()
+
+def http_status_codes(error):
+    """HTTP status codes carried by an exception or printed in its message"""
+    codes = set()
+    for owner in (error, getattr(error, 'response', None)):
+        for attribute in ('status_code', 'status'):
+            value = getattr(owner, attribute, None)
+            if isinstance(value, int):
+                codes.add(value)
+    for match in STATUS_CODE_PATTERN.finditer(str(error).lower()):
+        codes.add(int(match.group(1) or match.group(2)))
+    return codes
+
+def is_auth_error(error):
+    """Check whether an exception looks like an authentication failure
+    
+    Matches the exception type, a 401 status or a well-known phrase, never
+    bare digits that may just as well be part of a job ID or a count.
+    """
+    if "NotAuthorized" in type(error).__name__ or "Unauthorized" in type(error).__name__:
+        return True
+    if http_status_codes(error) & AUTH_STATUS_CODES:
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in AUTH_ERROR_MARKERS)
+
+def _default_service_factory(channel, token):
+    """Create a real QiskitRuntimeService"""
+    QiskitRuntimeService = load_module('qiskit_ibm_runtime').QiskitRuntimeService
+    return QiskitRuntimeService(channel=channel, token=token)
+
+class ServicePool:
+    """Cache services and backends keyed by hashed token and channel
+    
+    Entries expire after ``ttl`` seconds and are dropped as soon as an auth
+    error is reported for them. The pool only ever hands a service back to a
+    caller presenting the same token, so sessions never see each other's
+    credentials.
+    """
+    
+    def __init__(self, service_factory=None, ttl=SERVICE_CACHE_TTL, clock=time.monotonic):
+        self._service_factory = service_factory or _default_service_factory
+        self._ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._services = {}
+        self._backends = {}
+    
+    def set_service_factory(self, service_factory):
+        """Swap the service factory (e.g. for a local fake) and drop cached entries"""
+        with self._lock:
+            self._service_factory = service_factory or _default_service_factory
+            self._services.clear()
+            self._backends.clear()
+    
+    def _fresh(self, entry):
+        return entry is not None and self._clock() - entry[1] < self._ttl
+    
+    def _evict_expired(self):
+        now = self._clock()
+        for cache in (self._services, self._backends):
+            for key in [k for k, (_, created) in cache.items() if now - created >= self._ttl]:
+                del cache[key]
+    
+    def get_service(self, token, channel=IBM_CHANNEL):
+        """Return a cached service for the token, authenticating on a miss"""
+        key = hash_token(token, channel)
+        with self._lock:
+            self._evict_expired()
+            entry = self._services.get(key)
+            if self._fresh(entry):
+                return entry[0]
+            factory = self._service_factory
+        
+        # Authenticate outside the lock so other accounts are not blocked
+        service = factory(channel, token)
+        
+        with self._lock:
+            self._services[key] = (service, self._clock())
+        return service
+    
+    def get_backend(self, token, backend_name, channel=IBM_CHANNEL):
+        """Return a cached backend handle for the token"""
+        key = (hash_token(token, channel), backend_name)
+        with self._lock:
+            entry = self._backends.get(key)
+            if self._fresh(entry):
+                return entry[0]
+        
+        try:
+            backend = self.get_service(token, channel).backend(backend_name)
+        except Exception as e:
+            if is_auth_error(e):
+                self.invalidate(token, channel)
+            raise
+        
+        with self._lock:
+            self._backends[key] = (backend, self._clock())
+        return backend
+    
+    def invalidate(self, token, channel=IBM_CHANNEL):
+        """Drop the service and backends cached for a token"""
+        key = hash_token(token, channel)
+        with self._lock:
+            self._services.pop(key, None)
+            for backend_key in [k for k in self._backends if k[0] == key]:
+                del self._backends[backend_key]
+    
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._services.clear()
+            self._backends.clear()
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._services)
+
+# Shared by every Streamlit session in this process
+service_pool = ServicePool()
\ No newline at end of file
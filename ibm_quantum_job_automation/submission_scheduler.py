@@ -0,0 +1,204 @@
+"""
+Process-wide submission scheduler: per-account rate limits, fair sharing and retries
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from config import (
+    SCHEDULER_ACCOUNT_CONCURRENCY, SCHEDULER_SUBMIT_RATE, SCHEDULER_SUBMIT_BURST,
+    JOB_RETRIES, RETRY_BASE_DELAY, RETRY_MAX_DELAY
+)
+from service_pool import is_auth_error, http_status_codes
+
+# HTTP status codes of failures worth retrying
+TRANSIENT_STATUS_CODES = frozenset((429, 500, 502, 503, 504))
+
+# Exception class names (anywhere in the MRO) of network failures raised by HTTP clients
+TRANSIENT_ERROR_TYPES = frozenset((
+    "ConnectionError", "Timeout", "TimeoutError", "ConnectTimeout", "ReadTimeout", "ChunkedEncodingError"
+))
+
+# Phrases that identify a failure worth retrying when only the message is available
+TRANSIENT_ERROR_PHRASES = (
+    "timed out", "temporarily unavailable", "service unavailable", "connection reset", "connection aborted",
+    "connection refused", "reset by peer", "rate limit", "too many requests"
+)
+
+class SchedulerCancelled(Exception):
+    """Raised when a run is cancelled while waiting for a submission slot"""
+
+def is_transient_error(error):
+    """Check whether an exception looks like a transient runtime or network failure
+    
+    Looks at the exception and the errors it wraps for network exception
+    types, retryable HTTP status codes and well-known transient messages.
+    """
+    if is_auth_error(error):
+        return False
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, (ConnectionError, TimeoutError)):
+            return True
+        if any(cls.__name__ in TRANSIENT_ERROR_TYPES for cls in type(error).__mro__):
+            return True
+        if http_status_codes(error) & TRANSIENT_STATUS_CODES:
+            return True
+        message = str(error).lower()
+        if any(phrase in message for phrase in TRANSIENT_ERROR_PHRASES):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+def backoff_delay(attempt, base=RETRY_BASE_DELAY, cap=RETRY_MAX_DELAY, rng=random.random):
+    """Exponential backoff with full jitter for the given retry attempt (0-based)"""
+    return rng() * min(cap, base * (2 ** attempt))
+
+def call_with_retry(fn, should_retry=is_transient_error, retries=JOB_RETRIES,
+                    sleep=time.sleep, delay=backoff_delay):
+    """Call ``fn`` and retry it up to ``retries`` times while ``should_retry(error)`` holds
+    
+    ``sleep`` may return True to abandon the retry (e.g. a cancellation
+    token's wait); the last error is raised.
+    """
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except Exception as e:
+            if attempt >= retries or not should_retry(e):
+                raise
+            if sleep(delay(attempt)):
+                raise
+            attempt += 1
+
+class TokenBucket:
+    """Allow ``rate`` submissions per second with bursts of up to ``capacity``"""
+    
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+    
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def wait_time(self):
+        """Seconds until a token is available (0 if one is available now)"""
+        self._refill()
+        return 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+    
+    def take(self):
+        self._refill()
+        self._tokens -= 1
+
+class _AccountQueue:
+    """Waiting submissions of one account, grouped per owner for round-robin"""
+    
+    def __init__(self, rate, burst):
+        self.bucket = TokenBucket(rate, burst)
+        self.active = 0
+        self.waiting = {}
+        self.rotation = deque()
+
+class SubmissionScheduler:
+    """Grant submission slots per account, fairly across the sessions sharing it
+    
+    A slot is held from submission until the job's result is in, so
+    ``concurrency`` bounds the jobs in flight per account and the token bucket
+    bounds how fast new ones are submitted. When several owners (Streamlit
+    sessions) wait on the same account, slots go to them in turn rather than
+    first come, first served.
+    """
+    
+    def __init__(self, concurrency=SCHEDULER_ACCOUNT_CONCURRENCY, rate=SCHEDULER_SUBMIT_RATE,
+                 burst=SCHEDULER_SUBMIT_BURST):
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = burst
+        self._accounts = {}
+        self._condition = threading.Condition()
+    
+    def _account(self, account):
+        queue = self._accounts.get(account)
+        if queue is None:
+            queue = self._accounts[account] = _AccountQueue(self.rate, self.burst)
+        return queue
+    
+    def acquire(self, account, owner, cancel_token=None):
+        """Block until this owner may submit a job for the account
+        
+        Returns False without taking a slot if ``cancel_token`` is cancelled
+        while waiting.
+        """
+        ticket = object()
+        with self._condition:
+            queue = self._account(account)
+            queue.waiting.setdefault(owner, deque()).append(ticket)
+            if owner not in queue.rotation:
+                queue.rotation.append(owner)
+            
+            try:
+                while True:
+                    if cancel_token is not None and cancel_token.cancelled:
+                        return False
+                    timeout = 0.5
+                    my_turn = queue.rotation[0] == owner and queue.waiting[owner][0] is ticket
+                    if my_turn and queue.active < self.concurrency:
+                        timeout = queue.bucket.wait_time()
+                        if timeout == 0:
+                            queue.bucket.take()
+                            queue.active += 1
+                            ticket = None
+                            return True
+                    self._condition.wait(timeout)
+            finally:
+                if ticket is not None:
+                    queue.waiting[owner].remove(ticket)
+                else:
+                    queue.waiting[owner].popleft()
+                # The owner goes to the back of the line, or leaves it when done
+                queue.rotation.remove(owner)
+                if queue.waiting[owner]:
+                    queue.rotation.append(owner)
+                else:
+                    del queue.waiting[owner]
+                self._condition.notify_all()
+    
+    def release(self, account):
+        """Free the slot taken by ``acquire``"""
+        with self._condition:
+            self._account(account).active -= 1
+            self._condition.notify_all()
+    
+    @contextmanager
+    def slot(self, account, owner, cancel_token=None):
+        """Hold a submission slot for the duration of the block"""
+        if not self.acquire(account, owner, cancel_token):
+            raise SchedulerCancelled()
+        try:
+            yield
+        finally:
+            self.release(account)
+    
+    def stats(self, account):
+        """Jobs in flight and submissions waiting for an account"""
+        with self._condition:
+            queue = self._accounts.get(account)
+            if queue is None:
+                return {'active': 0, 'waiting': 0, 'owners': 0}
+            return {
+                'active': queue.active,
+                'waiting': sum(len(tickets) for tickets in queue.waiting.values()),
+                'owners': len(queue.waiting)
+            }
+
+# Shared by every Streamlit session in this process
+submission_scheduler = SubmissionScheduler()
\ No newline at end of file
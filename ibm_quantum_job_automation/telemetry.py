@@ -0,0 +1,141 @@
+"""
+Per-job timing: client-side stage timers, runtime-reported metrics and metric export
+"""
+
+import threading
+import time
+from datetime import datetime
+from config import TELEMETRY_BUCKETS, OTEL_EXPORT
+from dependencies import is_available, load_module
+
+# Result columns added to every row, in seconds
+TIMING_COLUMNS = (
+    'submitted_at', 'submit_s', 'queue_s', 'exec_s', 'fetch_s', 'postprocess_s', 'span_s', 'usage_s'
+)
+
+# Stages shown in the latency breakdown, in the order they happen
+BREAKDOWN_STAGES = ('submit_s', 'queue_s', 'exec_s', 'fetch_s', 'postprocess_s')
+
+def _to_datetime(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+
+def _seconds_between(start, stop):
+    if start is None or stop is None:
+        return None
+    return max((stop - start).total_seconds(), 0.0)
+
+def runtime_metrics(job):
+    """Queue, execution and usage seconds reported by the runtime, when available"""
+    try:
+        metrics = job.metrics()
+        timestamps = {key: _to_datetime(value) for key, value in (metrics.get('timestamps') or {}).items()}
+        usage = metrics.get('usage') or {}
+    except Exception:
+        return {'queue_s': None, 'exec_s': None, 'usage_s': None}
+    
+    return {
+        'queue_s': _seconds_between(timestamps.get('created'), timestamps.get('running')),
+        'exec_s': _seconds_between(timestamps.get('running'), timestamps.get('finished')),
+        'usage_s': usage.get('quantum_seconds', usage.get('seconds'))
+    }
+
+def execution_span_seconds(result):
+    """Total duration of the execution spans in a result's metadata"""
+    try:
+        spans = result.metadata['execution']['execution_spans']
+        return sum(_seconds_between(span.start, span.stop) for span in spans)
+    except Exception:
+        return None
+
+def job_timing(job, result, submitted_at, submit_s, wait_s):
+    """Timing columns for a finished job
+    
+    ``wait_s`` is how long the client blocked on ``job.result()``; whatever
+    the runtime does not account for as queue or execution time is reported
+    as result-fetch latency (all of it when the runtime reports no
+    timestamps, as for local simulators).
+    """
+    timing = {'submitted_at': submitted_at, 'submit_s': submit_s}
+    timing.update(runtime_metrics(job))
+    server_s = (timing['queue_s'] or 0.0) + (timing['exec_s'] or 0.0)
+    timing['fetch_s'] = max(wait_s - server_s, 0.0)
+    timing['span_s'] = execution_span_seconds(result)
+    return timing
+
+class StageHistograms:
+    """Cumulative per-stage latency histograms for Prometheus-style export"""
+    
+    def __init__(self, buckets=TELEMETRY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._stages = {}
+    
+    def observe(self, stage, seconds):
+        if seconds is None:
+            return
+        with self._lock:
+            histogram = self._stages.setdefault(stage, {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0})
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram['buckets'][i] += 1
+            histogram['sum'] += seconds
+            histogram['count'] += 1
+    
+    def prometheus_text(self, metric="qjob_stage_seconds"):
+        """Render the histograms in the Prometheus text exposition format"""
+        lines = [
+            f"# HELP {metric} Time spent in each stage of a quantum job",
+            f"# TYPE {metric} histogram"
+        ]
+        with self._lock:
+            for stage, histogram in sorted(self._stages.items()):
+                for bound, bucket_count in zip(self.buckets, histogram['buckets']):
+                    lines.append(f'{metric}_bucket{{stage="{stage}",le="{bound}"}} {bucket_count}')
+                lines.append(f'{metric}_bucket{{stage="{stage}",le="+Inf"}} {histogram["count"]}')
+                lines.append(f'{metric}_sum{{stage="{stage}"}} {histogram["sum"]}')
+                lines.append(f'{metric}_count{{stage="{stage}"}} {histogram["count"]}')
+        return '\n'.join(lines) + '\n'
+
+# Shared by every run in this process
+stage_histograms = StageHistograms()
+
+def _emit_otel_span(row):
+    """Report a job as an OpenTelemetry span with one child span per stage"""
+    trace = load_module('opentelemetry.trace')
+    tracer = trace.get_tracer("ibm_quantum_job_automation")
+    start_ns = int(row['submitted_at'] * 1e9)
+    cursor = start_ns
+    job_span = tracer.start_span("quantum_job", start_time=start_ns, attributes={
+        'job.id': str(row.get('job_id')),
+        'job.idx': int(row['idx']),
+        'job.backend': str(row.get('backend', '')),
+        'job.shots': int(row['shots'])
+    })
+    context = trace.set_span_in_context(job_span)
+    for stage in BREAKDOWN_STAGES:
+        if row.get(stage) is None:
+            continue
+        end_ns = cursor + int(row[stage] * 1e9)
+        tracer.start_span(stage[:-2], context=context, start_time=cursor).end(end_time=end_ns)
+        cursor = end_ns
+    job_span.end(end_time=cursor)
+
+def record_row_timing(row):
+    """Feed a finished row's timing columns to the metric exporters"""
+    for stage in BREAKDOWN_STAGES:
+        stage_histograms.observe(stage[:-2], row.get(stage))
+    if OTEL_EXPORT and is_available('opentelemetry') and row.get('submitted_at'):
+        try:
+            _emit_otel_span(row)
+        except Exception:
+            pass
+
+def timed_row(build_row, timing):
+    """Build a results row and add the timing columns, including its own build time"""
+    start = time.perf_counter()
+    row = build_row()
+    row.update(timing)
+    row['postprocess_s'] = time.perf_counter() - start
+    return row
\ No newline at end of file
@@ -0,0 +1,16 @@
+"""
+Test setup: app modules import each other by bare name, and the job store and exports go to a temporary directory
+"""
+
+import os
+import sys
+import tempfile
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+# config reads these at import time, so they are set before any app module is imported
+_scratch = tempfile.mkdtemp(prefix="qjob-tests-")
+os.environ["JOB_STORE_PATH"] = os.path.join(_scratch, "job_store.sqlite3")
+os.environ["RESULTS_EXPORT_DIR"] = ""
+os.environ["RESULTS_SPILL_DIR"] = os.path.join(_scratch, "spill")
\ No newline at end of file
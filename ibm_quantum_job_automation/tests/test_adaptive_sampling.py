@@ -0,0 +1,60 @@
+"""
+Adaptive shot allocation: round sizing and the stopping rule
+"""
+
+import pytest
+from adaptive_sampling import PrecisionTarget
+from result_statistics import RunStatistics
+
+HADAMARD = 'OPENQASM 2.0;\ninclude "qelib1.inc";\nqreg q[1];\ncreg c[1];\nh q[0];\nmeasure q[0] -> c[0];'
+
+def statistics_for(jobs, shots, ones_fraction):
+    """RunStatistics of ``jobs`` one-bit jobs that each read 1 in ``ones_fraction`` of their shots"""
+    statistics = RunStatistics()
+    ones = round(shots * ones_fraction)
+    for idx in range(jobs):
+        statistics.add({'idx': idx, 'num_bits': 1, 'shots': shots, 'outcomes': [0, 1], 'counts': [shots - ones, ones]})
+    return statistics
+
+def test_invalid_outcome_is_rejected():
+    with pytest.raises(ValueError):
+        PrecisionTarget(0.05, ['012'])
+
+def test_pilot_round_comes_first():
+    target = PrecisionTarget(0.05, pilot_jobs=2)
+    assert target.next_round({}, 100, 0, 50) == 2
+    assert target.next_round({}, 100, 0, 1) == 1
+
+def test_round_is_sized_from_the_current_width():
+    target = PrecisionTarget(0.05, ['1'], max_round_jobs=100)
+    statistics = {'h': statistics_for(2, 100, 0.5)}
+    _, width = target.limiting(statistics['h'])
+    expected = -(-200 * ((width / 0.05) ** 2 - 1) // 100)
+    assert target.next_round(statistics, 100, 2, 1000) == expected
+    assert not target.met(statistics)
+
+def test_round_respects_budget_and_round_cap():
+    statistics = {'h': statistics_for(2, 100, 0.5)}
+    assert PrecisionTarget(0.05, max_round_jobs=5).next_round(statistics, 100, 2, 1000) == 5
+    assert PrecisionTarget(0.05, max_round_jobs=100).next_round(statistics, 100, 2, 6) == 4
+    assert PrecisionTarget(0.05).next_round(statistics, 100, 6, 6) == 0
+
+def test_met_once_every_circuit_is_precise_enough():
+    target = PrecisionTarget(0.05, ['1'])
+    precise, coarse = statistics_for(20, 100, 0.5), statistics_for(2, 100, 0.5)
+    assert target.met({'a': precise})
+    assert not target.met({'a': precise, 'b': coarse})
+    assert target.next_round({'a': precise}, 100, 20, 1000) == 0
+    assert not target.met({})
+
+def test_hadamard_run_stops_at_sixteen_jobs():
+    pytest.importorskip('qiskit_aer')
+    from quantum_service import execute_circuits
+    
+    target = PrecisionTarget(0.05)
+    results, status = execute_circuits([('h', HADAMARD)], '', 'aer_simulator', 100, 200, precision=target)
+    
+    # A 2-job pilot puts P(0) near 0.5 with width ~0.14, so 14 more jobs bring 1600 shots to ~0.049
+    assert status == "Success"
+    assert len(results) == 16
+    assert target.met({'h': RunStatistics.from_rows(results)})
\ No newline at end of file
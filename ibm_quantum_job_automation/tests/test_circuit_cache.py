@@ -0,0 +1,25 @@
+"""
+Circuit cache: an unwritable cache directory must not fail the run
+"""
+
+from qiskit import QuantumCircuit
+from circuit_compiler import CircuitCache
+
+def test_unwritable_cache_dir_keeps_circuit_in_memory(tmp_path, caplog):
+    blocker = tmp_path / 'not-a-directory'
+    blocker.write_text('')
+    cache = CircuitCache(maxsize=4, cache_dir=str(blocker / 'qpy'))
+    circuit = QuantumCircuit(1)
+    circuit.h(0)
+    
+    cache.put('key', circuit)
+    
+    assert cache.get('key') is circuit
+    assert "Could not write circuit cache entry" in caplog.text
+
+def test_cache_dir_round_trip(tmp_path):
+    circuit = QuantumCircuit(1)
+    circuit.x(0)
+    CircuitCache(cache_dir=str(tmp_path)).put('key', circuit)
+    
+    assert CircuitCache(cache_dir=str(tmp_path)).get('key') == circuit
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""
+Response cache: only complete, non-empty streams are stored
+"""
+
+from types import SimpleNamespace
+import pytest
+import llm_service
+from llm_service import stream_llm_response
+
+def chunk(content=None, finish_reason=None):
+    delta = SimpleNamespace(content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=finish_reason)])
+
+class FakeClient:
+    """Groq client stand-in streaming a fixed list of chunks, optionally failing partway"""
+    
+    def __init__(self, chunks, fail_after=None):
+        self.calls = 0
+        
+        def create(**kwargs):
+            self.calls += 1
+            return self._stream(chunks, fail_after)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=create))
+    
+    @staticmethod
+    def _stream(chunks, fail_after):
+        for position, item in enumerate(chunks):
+            if position == fail_after:
+                raise ConnectionError("stream interrupted")
+            yield item
+
+@pytest.fixture
+def client(monkeypatch):
+    llm_service.response_cache.clear()
+    holder = {}
+    monkeypatch.setattr(llm_service, 'get_groq_client', lambda key: holder['client'])
+    yield holder
+    llm_service.response_cache.clear()
+
+def run_twice(holder, fake):
+    holder['client'] = fake
+    first = ''.join(stream_llm_response("question", "key", use_cache=True))
+    second = ''.join(stream_llm_response("question", "key", use_cache=True))
+    return first, second
+
+def test_complete_stream_is_cached(client):
+    fake = FakeClient([chunk("Hello "), chunk("world"), chunk(finish_reason="stop")])
+    assert run_twice(client, fake) == ("Hello world", "Hello world")
+    assert fake.calls == 1
+
+def test_empty_stream_is_not_cached(client):
+    fake = FakeClient([chunk(finish_reason="stop")])
+    run_twice(client, fake)
+    assert fake.calls == 2
+
+def test_interrupted_stream_is_not_cached(client):
+    fake = FakeClient([chunk("Hello "), chunk("world"), chunk(finish_reason="stop")], fail_after=1)
+    first, _ = run_twice(client, fake)
+    assert first.startswith("Hello Error getting LLM response")
+    assert fake.calls == 2
+
+def test_stream_without_finish_reason_is_not_cached(client):
+    fake = FakeClient([chunk("Hello")])
+    run_twice(client, fake)
+    assert fake.calls == 2
\ No newline at end of file
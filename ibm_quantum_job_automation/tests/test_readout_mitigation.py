@@ -0,0 +1,68 @@
+"""
+Readout calibration cache: entries follow the backend's calibration
+"""
+
+from datetime import datetime, timedelta, timezone
+from qiskit import QuantumCircuit
+from readout_mitigation import ReadoutCalibrationCache, readout_columns
+from result_cache import CalibrationStamps
+
+class FakeProperties:
+    def __init__(self, last_update_date, error):
+        self.last_update_date = last_update_date
+        self.error = error
+    
+    def qubit_property(self, qubit):
+        return {'prob_meas1_prep0': (self.error, None), 'prob_meas0_prep1': (self.error, None)}
+
+class RecalibratingBackend:
+    """Backend whose handle caches properties until asked to refresh, like IBMBackend"""
+    
+    name = "fake_recalibrating"
+    
+    def __init__(self):
+        self.device = FakeProperties(datetime(2026, 1, 1, tzinfo=timezone.utc), 0.01)
+        self._cached = None
+    
+    def recalibrate(self, error):
+        self.device = FakeProperties(self.device.last_update_date + timedelta(hours=1), error)
+    
+    def properties(self, refresh=False):
+        if refresh or self._cached is None:
+            self._cached = self.device
+        return self._cached
+
+def measured_circuit():
+    qc = QuantumCircuit(1, 1)
+    qc.measure(0, 0)
+    return qc
+
+def test_recalibration_rebuilds_cached_readout_errors():
+    backend = RecalibratingBackend()
+    cache = ReadoutCalibrationCache()
+    stamps = CalibrationStamps(ttl=0)
+    
+    def columns():
+        return readout_columns(backend.name, backend, measured_circuit(), "backend", None, cache, stamps)
+    
+    first = columns()
+    assert first['readout_error'] == '[[0.01, 0.01]]'
+    assert columns() == first
+    assert cache.hits == 1
+    
+    backend.recalibrate(0.05)
+    rebuilt = columns()
+    assert rebuilt['readout_error'] == '[[0.05, 0.05]]'
+    assert rebuilt['readout_calibrated_at'] == '2026-01-01T01:00:00+00:00'
+    assert cache.misses == 2
+
+def test_stamp_is_reused_within_its_ttl():
+    backend = RecalibratingBackend()
+    now = [0.0]
+    stamps = CalibrationStamps(ttl=60, clock=lambda: now[0])
+    
+    first = stamps.get(backend)
+    backend.recalibrate(0.05)
+    assert stamps.get(backend) == first
+    now[0] = 61.0
+    assert stamps.get(backend) != first
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""
+Result reuse keys and policy, and queue-aware backend ranking
+"""
+
+from backend_router import rank_backends
+from result_cache import ReusePolicy, cache_key
+
+BELL = 'OPENQASM 2.0;\ninclude "qelib1.inc";\nqreg q[2];\ncreg c[2];\nh q[0];\ncx q[0],q[1];\nmeasure q -> c;'
+
+def key(qasm=BELL, token="token", backend="ibm_brisbane", calibrated_at="2026-01-01T00:00:00", shots=1000, level=1):
+    return cache_key(qasm, token, backend, calibrated_at, shots, level)
+
+def test_cache_key_ignores_comments_and_blank_lines():
+    commented = "// bell pair\n" + BELL.replace(";\n", ";  // step\n\n", 2)
+    assert key(commented) == key()
+
+def test_cache_key_changes_with_everything_that_changes_the_distribution():
+    different = [
+        key(BELL.replace("h q[0];", "x q[0];")),
+        key(token="other"),
+        key(backend="ibm_kyiv"),
+        key(calibrated_at="2026-01-02T00:00:00"),
+        key(shots=2000),
+        key(level=3)
+    ]
+    assert len({key(), *different}) == len(different) + 1
+
+def test_reuse_policy_limits_reusable_repetitions():
+    assert ReusePolicy().reusable(10) == 10
+    assert ReusePolicy(max_jobs=4).reusable(10) == 4
+    assert ReusePolicy(max_jobs=40).reusable(10) == 10
+    assert ReusePolicy(max_jobs=4, refresh=True).reusable(10) == 0
+
+def snapshot(name, pending_jobs, num_qubits=127, operational=True):
+    return {
+        'name': name, 'pending_jobs': pending_jobs, 'num_qubits': num_qubits,
+        'operational': operational, 'status_msg': None, 'error': None
+    }
+
+def test_rank_backends_orders_by_wait_and_skips_unusable():
+    snapshots = [
+        snapshot("ibm_kyiv", 40),
+        snapshot("ibm_brisbane", 5),
+        snapshot("ibm_offline", 0, operational=False),
+        snapshot("ibm_small", 0, num_qubits=5),
+        snapshot("ibm_alpha", 5)
+    ]
+    ranked = [s['name'] for s in rank_backends(snapshots, num_qubits=27)]
+    assert ranked == ["ibm_alpha", "ibm_brisbane", "ibm_kyiv"]
\ No newline at end of file
@@ -0,0 +1,21 @@
+"""
+Authentication failures: recognised by type, status and phrase, never by stray digits
+"""
+
+import pytest
+from service_pool import is_auth_error
+
+class IBMNotAuthorizedError(Exception):
+    pass
+
+@pytest.mark.parametrize("error, auth", [
+    (RuntimeError("401 Client Error: Unauthorized for url: https://api"), True),
+    (RuntimeError("status code: 401"), True),
+    (RuntimeError("Invalid token provided"), True),
+    (IBMNotAuthorizedError("denied"), True),
+    (RuntimeError("job d4015a01 failed on qubit 401"), False),
+    (RuntimeError("circuit uses 1401 gates"), False),
+    (RuntimeError("503 Server Error: Service Unavailable"), False)
+])
+def test_auth_errors(error, auth):
+    assert is_auth_error(error) is auth
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""
+Submission retries and per-account fair sharing
+"""
+
+import contextlib
+import threading
+import time
+import pytest
+from qiskit import QuantumCircuit
+from benchmarks.fake_runtime import FakeSampler
+from quantum_service import CancelToken, _submit_and_wait
+from submission_scheduler import SubmissionScheduler, call_with_retry, is_transient_error
+
+def no_wait(seconds):
+    return False
+
+def measured_circuit():
+    qc = QuantumCircuit(1, 1)
+    qc.h(0)
+    qc.measure(0, 0)
+    return qc
+
+class FlakySampler(FakeSampler):
+    """FakeSampler whose first ``run_failures`` submissions and first ``result_failures`` result fetches fail"""
+    
+    def __init__(self, run_failures=0, result_failures=0):
+        super().__init__()
+        self.run_failures = run_failures
+        self.result_failures = result_failures
+        self.submitted = []
+    
+    def run(self, pubs, shots=None):
+        if self.run_failures:
+            self.run_failures -= 1
+            raise ConnectionError("connection reset by peer")
+        job = super().run(pubs, shots=shots)
+        fetch = job.result
+        
+        def result():
+            if self.result_failures:
+                self.result_failures -= 1
+                raise RuntimeError("503 Server Error: Service Unavailable")
+            return fetch()
+        job.result = result
+        self.submitted.append(job.job_id())
+        return job
+
+@pytest.fixture
+def instant_retries(monkeypatch):
+    import quantum_service
+    monkeypatch.setattr(
+        quantum_service, 'call_with_retry', lambda fn, **kwargs: call_with_retry(fn, delay=lambda attempt: 0, **kwargs)
+    )
+
+def counting_slot(events):
+    @contextlib.contextmanager
+    def slot():
+        events.append('acquire')
+        try:
+            yield
+        finally:
+            events.append('release')
+    return slot
+
+def test_call_with_retry_retries_transient_errors_only():
+    calls = []
+    
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise TimeoutError("timed out")
+        return "done"
+    
+    assert call_with_retry(flaky, retries=3, sleep=no_wait, delay=lambda attempt: 0) == "done"
+    assert len(calls) == 3
+    
+    def broken():
+        calls.append(1)
+        raise ValueError("invalid circuit")
+    
+    calls.clear()
+    with pytest.raises(ValueError):
+        call_with_retry(broken, retries=3, sleep=no_wait, delay=lambda attempt: 0)
+    assert len(calls) == 1
+
+def test_failed_submission_is_retried_in_a_new_slot(instant_retries):
+    sampler, events, reported = FlakySampler(run_failures=1), [], []
+    job_id, result, _ = _submit_and_wait(
+        sampler, [measured_circuit()], 100, counting_slot(events), CancelToken(), reported.append
+    )
+    assert sampler.submitted == [job_id] == reported
+    assert events == ['acquire', 'release', 'acquire', 'release']
+    assert len(result) == 1
+
+def test_failed_result_fetch_never_resubmits(instant_retries):
+    sampler, events, reported = FlakySampler(result_failures=2), [], []
+    job_id, result, _ = _submit_and_wait(
+        sampler, [measured_circuit()], 100, counting_slot(events), CancelToken(), reported.append
+    )
+    assert sampler.submitted == [job_id] == reported
+    assert events == ['acquire', 'release']
+    assert len(result) == 1
+
+@pytest.mark.parametrize("message, transient", [
+    ("503 Server Error: Service Unavailable for url", True),
+    ("429 Client Error: Too Many Requests", True),
+    ("status code: 502", True),
+    ("request timed out", True),
+    ("5000 shots exceed the limit of 4000", False),
+    ("job d1a500b2 failed: invalid circuit", False),
+    ("Timeout must be positive", False)
+])
+def test_transient_errors_are_matched_on_status_and_phrase(message, transient):
+    assert is_transient_error(RuntimeError(message)) is transient
+
+def test_wrapped_network_error_is_transient():
+    class ReadTimeout(OSError):
+        pass
+    
+    try:
+        try:
+            raise ReadTimeout("read")
+        except ReadTimeout as cause:
+            raise RuntimeError("request failed") from cause
+    except RuntimeError as error:
+        assert is_transient_error(error)
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for the scheduler"
+        time.sleep(0.005)
+
+def test_slots_alternate_between_owners_of_an_account():
+    scheduler = SubmissionScheduler(concurrency=1, rate=1000, burst=1000)
+    granted, lock = [], threading.Lock()
+    
+    def submit(owner):
+        with scheduler.slot("account", owner):
+            with lock:
+                granted.append(owner)
+    
+    # Hold the only slot while both owners queue three submissions each, "a" first
+    assert scheduler.acquire("account", "holder")
+    threads = []
+    for owner in ["a"] * 3 + ["b"] * 3:
+        thread = threading.Thread(target=submit, args=(owner,))
+        thread.start()
+        threads.append(thread)
+        wait_until(lambda: scheduler.stats("account")['waiting'] == len(threads))
+    scheduler.release("account")
+    for thread in threads:
+        thread.join(5)
+    
+    assert granted == ["a", "b", "a", "b", "a", "b"]
+    assert scheduler.stats("account") == {'active': 0, 'waiting': 0, 'owners': 0}
\ No newline at end of file
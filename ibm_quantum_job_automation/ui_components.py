@@ -2,17 +2,42 @@
 UI components for the IBM Quantum Circuit JOB Automation application
 """
 
+import math
+import os
+import numpy as np
 import streamlit as st
-import pandas as pd
 from datetime import datetime
-from config import IBM_BACKENDS, QUICK_ACTIONS
+from config import (
+    IBM_BACKENDS, LOCAL_BACKENDS, AUTO_BACKEND, QUICK_ACTIONS, MAX_IN_FLIGHT_LIMIT, EXECUTION_MODES, OPTIMIZATION_LEVELS,
+    RUN_STATUS_REFRESH_SECONDS, MAX_SWEEP_POINTS, DEFAULT_SWEEP_POINTS, SWEEP_EXAMPLE_QASM, CHAT_PAGE_SIZE,
+    READOUT_MITIGATION_MODES, STATS_TOP_OUTCOMES, DEFAULT_CIRCUIT_NAME, ADAPTIVE_MAX_JOBS
+)
 from utils import (
     validate_qasm, calculate_success_metrics, 
     add_message_to_chat, clear_chat_history, 
-    get_results_csv, format_timestamp, check_qiskit, check_groq
+    format_timestamp, check_qiskit, check_groq, set_results, select_results, get_results_csv,
+    add_to_workspace, remove_from_workspace
+)
+from llm_service import stream_llm_response, stream_quick_action
+from qasm_extraction import extract_qasm_candidates
+from execution_engine import ExecutionEngine
+from circuit_compiler import circuit_cache, circuit_parameters
+from backends import is_local_backend
+from backend_router import get_backend_snapshots, expected_wait
+from result_processing import (
+    results_to_records, aggregate_sweep, outcome_label, aggregate_by_circuit, total_variation_distances, row_values,
+    count_jobs
 )
-from llm_service import get_llm_response, process_quick_action
-from quantum_service import execute_quantum_circuit
+from result_export import results_to_frame, run_parquet_bytes, check_pyarrow
+from job_store import get_job_store, account_key, reconcile_pending_jobs
+from dependencies import load_module, import_report
+from telemetry import BREAKDOWN_STAGES, stage_histograms
+from result_statistics import RunStatistics, wilson_interval
+from readout_mitigation import mitigated_distribution
+from quantum_service import reusable_jobs
+from result_cache import ReusePolicy, get_result_cache
+from adaptive_sampling import PrecisionTarget
+from result_table import approx_nbytes
 
 def render_header():
     """Render the main header"""
@@ -45,8 +70,10 @@ def render_circuit_parameters():
     with st.expander("⚙️ Circuit Parameters", expanded=True):
         backend_name = st.selectbox(
             "Quantum Backend",
-            IBM_BACKENDS,
-            help="Choose your IBM Quantum backend"
+            [AUTO_BACKEND] + IBM_BACKENDS + list(LOCAL_BACKENDS),
+            format_func=lambda name: "auto (least-loaded hardware)" if name == AUTO_BACKEND else name,
+            help="Choose your IBM Quantum backend, a local simulator to run offline, "
+                 "or auto to route each run to the shortest queue that fits the circuit"
         )
         
         st.session_state.shots = st.number_input(
@@ -57,12 +84,89 @@ def render_circuit_parameters():
             step=100
         )
         
+        st.session_state.adaptive_enabled = st.checkbox(
+            "Adaptive shot allocation",
+            value=st.session_state.adaptive_enabled,
+            help="Submit jobs in rounds and stop once the chosen outcome probabilities are precise enough"
+        )
+        max_jobs = ADAPTIVE_MAX_JOBS if st.session_state.adaptive_enabled else 50
         st.session_state.jobs_count = st.number_input(
-            "Number of Jobs",
+            "Job Budget" if st.session_state.adaptive_enabled else "Number of Jobs",
             min_value=1,
-            max_value=50,
-            value=st.session_state.jobs_count
+            max_value=max_jobs,
+            value=min(st.session_state.jobs_count, max_jobs),
+            help="Most jobs an adaptive run may submit" if st.session_state.adaptive_enabled else None
+        )
+        if st.session_state.adaptive_enabled:
+            st.session_state.target_ci_width = st.number_input(
+                "Target Interval Width",
+                min_value=0.001,
+                max_value=0.5,
+                value=float(st.session_state.target_ci_width),
+                step=0.005,
+                format="%.3f",
+                help="Largest acceptable Wilson confidence interval width (high - low) of each target outcome"
+            )
+            st.session_state.target_outcomes = st.text_input(
+                "Target Outcomes",
+                value=st.session_state.target_outcomes,
+                placeholder="e.g. 00, 11 (empty: leading outcome)",
+                help="Comma-separated bitstrings whose probabilities must reach the target width"
+            )
+        
+        st.session_state.max_in_flight = st.number_input(
+            "Max Jobs in Flight",
+            min_value=1,
+            max_value=MAX_IN_FLIGHT_LIMIT,
+            value=st.session_state.max_in_flight,
+            help="Jobs are queued up front and results are collected as they finish"
+        )
+        
+        modes = list(EXECUTION_MODES)
+        st.session_state.execution_mode = st.radio(
+            "Execution Mode",
+            modes,
+            index=modes.index(st.session_state.execution_mode),
+            format_func=EXECUTION_MODES.get,
+            help="Independent jobs each take a queue slot, a batched job packs every "
+                 "repetition into one submission, a session runs the jobs back to back"
+        )
+        
+        st.session_state.optimization_level = st.selectbox(
+            "Transpiler Optimization Level",
+            OPTIMIZATION_LEVELS,
+            index=OPTIMIZATION_LEVELS.index(st.session_state.optimization_level),
+            help="The circuit is transpiled once per backend and level, then reused"
+        )
+        
+        mitigation_modes = list(READOUT_MITIGATION_MODES)
+        st.session_state.readout_mitigation = st.selectbox(
+            "Readout Mitigation",
+            mitigation_modes,
+            index=mitigation_modes.index(st.session_state.readout_mitigation),
+            format_func=READOUT_MITIGATION_MODES.get,
+            help="Correct counts for measurement errors; calibrations are cached per backend"
+        )
+        
+        st.session_state.reuse_results = st.checkbox(
+            "Reuse cached results",
+            value=st.session_state.reuse_results,
+            help="Take repetitions already measured on the same backend calibration with the same "
+                 "shots and options from the local result cache, and only submit the rest"
         )
+        if st.session_state.reuse_results:
+            st.session_state.reuse_max_age_hours = st.number_input(
+                "Max cache age (hours)",
+                min_value=0.1,
+                max_value=24.0 * 30,
+                value=float(st.session_state.reuse_max_age_hours),
+                step=1.0
+            )
+            st.session_state.reuse_refresh = st.checkbox(
+                "Force refresh",
+                value=st.session_state.reuse_refresh,
+                help="Submit every job again; the new results still go to the cache"
+            )
     
     return backend_name
 
@@ -84,72 +188,614 @@ def render_qasm_editor():
             else:
                 st.error(f"❌ QASM validation failed: {message}")
 
+def render_workspace_section():
+    """Render the workspace of named circuits run together as one campaign"""
+    workspace = st.session_state.workspace
+    with st.expander(f"🗂️ Circuit Workspace ({len(workspace)})", expanded=st.session_state.workspace_enabled):
+        col_name, col_add = st.columns([2, 1])
+        name = col_name.text_input("Circuit name", value=DEFAULT_CIRCUIT_NAME, key="workspace_name")
+        with col_add:
+            if st.button("➕ Add editor circuit"):
+                is_valid, message = validate_qasm(st.session_state.current_qasm)
+                if is_valid:
+                    add_to_workspace(name, st.session_state.current_qasm)
+                else:
+                    st.error(f"❌ QASM validation failed: {message}")
+        
+        uploaded = st.file_uploader("Upload QASM files", type=["qasm"], accept_multiple_files=True)
+        if uploaded and st.button("➕ Add uploaded files"):
+            for file in uploaded:
+                qasm_code = file.getvalue().decode('utf-8')
+                is_valid, message = validate_qasm(qasm_code)
+                if is_valid:
+                    add_to_workspace(os.path.splitext(file.name)[0], qasm_code)
+                else:
+                    st.error(f"❌ {file.name} does not parse: {message}")
+        
+        for entry in workspace:
+            col_label, col_load, col_remove = st.columns([3, 1, 1])
+            col_label.text(f"{entry['name']} · {entry['hash']}")
+            if col_load.button("📝", key=f"load_{entry['hash']}", help="Load into the editor"):
+                st.session_state.current_qasm = entry['qasm']
+                st.rerun()
+            if col_remove.button("🗑️", key=f"remove_{entry['hash']}", help="Remove from the workspace"):
+                remove_from_workspace(entry['name'])
+                st.rerun()
+        
+        st.session_state.workspace_enabled = st.checkbox(
+            "Run the workspace as one campaign",
+            value=st.session_state.workspace_enabled and bool(workspace),
+            disabled=not workspace,
+            help="Every job carries one PUB per circuit, so the whole workspace shares each submission"
+        )
+
+def render_sweep_section():
+    """Render parameter sweep configuration"""
+    with st.expander("📐 Parameter Sweep", expanded=st.session_state.sweep_enabled):
+        st.session_state.sweep_enabled = st.checkbox(
+            "Enable sweep mode",
+            value=st.session_state.sweep_enabled,
+            help="Bind every free parameter to a value range and submit the whole grid as one job"
+        )
+        
+        if st.button("Load Example Sweep Circuit"):
+            st.session_state.current_qasm = SWEEP_EXAMPLE_QASM
+            st.rerun()
+        
+        if not st.session_state.sweep_enabled:
+            return
+        
+        try:
+            names = circuit_parameters(st.session_state.current_qasm)
+        except Exception as e:
+            st.error(f"❌ Could not parse circuit: {str(e)}")
+            return
+        
+        if not names:
+            st.info("The current circuit has no free parameters. Declare them in OpenQASM 3 with `input float[64] theta;`")
+            return
+        
+        grid_points = 1
+        for name in names:
+            current = st.session_state.sweep_ranges.get(
+                name, {'start': 0.0, 'stop': math.pi, 'points': DEFAULT_SWEEP_POINTS}
+            )
+            col_a, col_b, col_c = st.columns(3)
+            start = col_a.number_input(f"{name} start", value=float(current['start']), key=f"sweep_{name}_start")
+            stop = col_b.number_input(f"{name} stop", value=float(current['stop']), key=f"sweep_{name}_stop")
+            points = col_c.number_input(
+                f"{name} points",
+                min_value=1,
+                max_value=MAX_SWEEP_POINTS,
+                value=int(current['points']),
+                key=f"sweep_{name}_points"
+            )
+            st.session_state.sweep_ranges[name] = {'start': start, 'stop': stop, 'points': points}
+            grid_points *= points
+        
+        st.caption(f"{grid_points} grid points × {st.session_state.jobs_count} repetitions in one submission")
+        if grid_points > MAX_SWEEP_POINTS:
+            st.warning(f"⚠️ The grid exceeds the limit of {MAX_SWEEP_POINTS} points")
+
+def _recheck_pending_jobs():
+    st.session_state.recovered_account = None
+
+def render_job_recovery(ibm_api_key):
+    """Reconcile pending jobs from the job store and restore the last run
+    
+    Reconciliation runs once per account; the pending-jobs notice and its
+    button stay on every rerun until no job is left pending. Without an IBM
+    token every visitor shares the same ledger account, so nothing is
+    recovered or restored then; the session only shows runs it started.
+    """
+    if not ibm_api_key:
+        return
+    account = account_key(ibm_api_key)
+    if st.session_state.recovered_account != account:
+        st.session_state.recovered_account = account
+        
+        store = get_job_store()
+        recovered, st.session_state.pending_jobs = reconcile_pending_jobs(store, ibm_api_key)
+        
+        if not st.session_state.results_data:
+            run_id = store.latest_run_id(ibm_api_key)
+            if run_id:
+                set_results(store.load_run(run_id), run_id=run_id)
+        
+        if recovered:
+            st.success(f"✅ Recovered {recovered} finished jobs from the job store")
+    
+    if st.session_state.pending_jobs:
+        st.info(f"⏳ {st.session_state.pending_jobs} submitted jobs are still pending on the backend")
+        st.button("🔄 Check Pending Jobs", on_click=_recheck_pending_jobs)
+
+@st.cache_resource
+def get_execution_engine():
+    """Background engine shared by every session of this server process"""
+    return ExecutionEngine()
+
+def get_reuse_policy():
+    """Result reuse policy chosen in the sidebar, or None when reuse is off"""
+    if not st.session_state.reuse_results:
+        return None
+    return ReusePolicy(
+        max_age=st.session_state.reuse_max_age_hours * 3600,
+        refresh=st.session_state.reuse_refresh
+    )
+
+def get_precision_target():
+    """Adaptive shot allocation target chosen in the sidebar as ``(target, error)``
+    
+    The target is None for a fixed number of jobs.
+    """
+    if not st.session_state.adaptive_enabled:
+        return None, None
+    outcomes = [label.strip() for label in st.session_state.target_outcomes.split(',') if label.strip()]
+    try:
+        return PrecisionTarget(width=st.session_state.target_ci_width, outcomes=outcomes), None
+    except ValueError as e:
+        return None, f"Target outcomes: {e}"
+
+def render_reuse_preview(circuits, ibm_api_key, backend_name, reuse):
+    """Tell the user how many jobs the next run takes from the result cache"""
+    if st.session_state.sweep_enabled:
+        st.caption("Parameter sweeps are always submitted; result reuse is skipped")
+        return
+    if not ibm_api_key and not is_local_backend(backend_name):
+        return
+    
+    jobs_count = st.session_state.jobs_count
+    reused = reusable_jobs(
+        circuits, ibm_api_key, backend_name, st.session_state.shots, jobs_count,
+        st.session_state.optimization_level, reuse
+    )
+    if reused is None:
+        st.caption("Cached results are looked up once the backend is chosen")
+    elif reused and st.session_state.adaptive_enabled:
+        st.caption(f"♻️ Reusing {reused} cached jobs; adaptive rounds submit at most {jobs_count - reused} more")
+    elif reused:
+        st.caption(f"♻️ Reusing {reused} cached jobs and submitting {jobs_count - reused} new ones")
+    else:
+        st.caption("No cached results match; every job is submitted")
+
 def render_execution_section(ibm_api_key, backend_name):
     """Render circuit execution section"""
     st.header("Execute")
     
+    engine = get_execution_engine()
+    
+    if st.session_state.workspace_enabled and st.session_state.workspace:
+        circuits = [(entry['name'], entry['qasm']) for entry in st.session_state.workspace]
+    else:
+        circuits = [(DEFAULT_CIRCUIT_NAME, st.session_state.current_qasm)]
+    reuse = get_reuse_policy()
+    if reuse and not reuse.refresh:
+        render_reuse_preview(circuits, ibm_api_key, backend_name, reuse)
+    
     if st.button("Run Quantum Circuit", disabled=st.session_state.job_running):
-        if not ibm_api_key:
+        precision, precision_error = get_precision_target()
+        if not ibm_api_key and not is_local_backend(backend_name):
             st.error("❌ Please provide IBM Quantum API token")
+        elif precision_error:
+            st.error(f"❌ {precision_error}")
+        elif precision and st.session_state.sweep_enabled:
+            st.error("❌ Adaptive shot allocation does not support parameter sweeps")
         else:
+            st.session_state.active_precision = precision
+            st.session_state.active_run_id = engine.submit(
+                circuits,
+                ibm_api_key,
+                backend_name,
+                st.session_state.shots,
+                st.session_state.jobs_count,
+                max_in_flight=st.session_state.max_in_flight,
+                execution_mode=st.session_state.execution_mode,
+                optimization_level=st.session_state.optimization_level,
+                sweep=st.session_state.sweep_ranges if st.session_state.sweep_enabled else None,
+                owner=st.session_state.session_id,
+                mitigation=st.session_state.readout_mitigation,
+                reuse=reuse,
+                precision=precision
+            )
             st.session_state.job_running = True
-            
-            with st.spinner("Executing quantum circuit..."):
-                results, status = execute_quantum_circuit(
-                    st.session_state.current_qasm,
-                    ibm_api_key,
-                    backend_name,
-                    st.session_state.shots,
-                    st.session_state.jobs_count
+            st.session_state.run_outcome = None
+            st.rerun()
+    
+    if backend_name == AUTO_BACKEND and ibm_api_key:
+        render_backend_queues(ibm_api_key)
+    
+    if st.session_state.active_run_id:
+        render_run_status()
+    
+    # Outcome of the last finished run
+    if st.session_state.run_outcome:
+        status, count = st.session_state.run_outcome
+        if status == "Success":
+            st.success(f"✅ Successfully completed {count} jobs!")
+            reused = count_jobs(st.session_state.results_data, only='reused_from')
+            if reused:
+                st.caption(f"♻️ {reused} of {count} jobs were served from the result cache")
+        elif status == "Cancelled":
+            st.warning(f"⏹️ Run cancelled after {count} completed jobs")
+        else:
+            st.error(f"❌ Execution failed: {status}")
+            if count:
+                st.warning(f"⚠️ Kept {count} completed jobs from the job store")
+    
+    # Compile cache report
+    cache_stats = circuit_cache.stats()
+    if cache_stats['last']:
+        outcome = "hit" if cache_stats['last']['hit'] else "miss"
+        st.caption(
+            f"Transpile cache {outcome} ({cache_stats['last']['seconds'] * 1000:.1f} ms) · "
+            f"{cache_stats['hits']} hits / {cache_stats['misses']} misses · "
+            f"avg hit {cache_stats['avg_hit_ms']:.1f} ms, avg miss {cache_stats['avg_miss_ms']:.1f} ms"
+        )
+    
+    result_cache = get_result_cache()
+    if result_cache.hit_rate is not None:
+        st.caption(
+            f"Result cache: {result_cache.hits} jobs reused / {result_cache.misses} submitted · "
+            f"{result_cache.hit_rate:.0%} hit rate"
+        )
+
+def render_backend_queues(ibm_api_key):
+    """Show the status snapshots the auto router chooses from"""
+    with st.expander("📶 Backend Queues"):
+        st.dataframe(
+            [
+                {
+                    'backend': snapshot['name'],
+                    'operational': snapshot['operational'],
+                    'qubits': snapshot['num_qubits'],
+                    'pending_jobs': snapshot['pending_jobs'],
+                    'expected_wait_min': (
+                        round(expected_wait(snapshot) / 60, 1) if snapshot['pending_jobs'] is not None else None
+                    ),
+                    'error': snapshot['error']
+                }
+                for snapshot in get_backend_snapshots(ibm_api_key)
+            ],
+            use_container_width=True
+        )
+
+@st.fragment(run_every=RUN_STATUS_REFRESH_SECONDS)
+def render_run_status():
+    """Poll the background engine and show progress of the active run"""
+    engine = get_execution_engine()
+    run_id = st.session_state.active_run_id
+    run = engine.status(run_id) if run_id else None
+    
+    if run is None:
+        st.session_state.active_run_id = None
+        st.session_state.job_running = False
+        return
+    
+    if not run['finished']:
+        st.progress(run['completed'] / run['total'] if run['total'] else 0)
+        st.text(f"{run['status'].title()}: {run['completed']}/{run['total']} jobs complete...")
+        precision = st.session_state.active_precision
+        if precision:
+            st.caption(
+                f"Adaptive run: stops once the interval width reaches {precision.width:.3g} "
+                f"or the budget of {run['total']} is spent"
+            )
+        if len(run['statistics']) == 1:
+            pooled = next(iter(run['statistics'].values())).pooled()
+            if pooled['total_shots']:
+                st.caption(
+                    f"Leading outcome so far: '{pooled['labels'][0]}' "
+                    f"p = {pooled['probabilities'][0]:.4f} "
+                    f"[{pooled['ci_low'][0]:.4f}, {pooled['ci_high'][0]:.4f}]"
                 )
-            
-            st.session_state.job_running = False
-            
-            if status == "Success":
-                st.session_state.results_data = results
-                st.success(f"✅ Successfully completed {len(results)} jobs!")
-            else:
-                st.error(f"❌ Execution failed: {status}")
+        if run['results']:
+            st.dataframe(results_to_records(run['results']), use_container_width=True)
+        if st.button("⏹️ Cancel Run"):
+            engine.cancel(run_id)
+        return
+    
+    # Run finished: hand the results to the session and refresh the whole page
+    results = run['results']
+    statistics = run['statistics']
+    status = run['message'] or run['status'].title()
+    if run['status'] == "failed":
+        # Keep whatever finished before the failure
+        results = get_job_store().load_run(run_id)
+        statistics = None
+    if results:
+        set_results(results, statistics, st.session_state.active_precision, run_id)
+    
+    st.session_state.run_outcome = (status, count_jobs(results))
+    st.session_state.active_run_id = None
+    st.session_state.job_running = False
+    engine.forget(run_id)
+    st.rerun()
+
+def cached_result_view(key, compute):
+    """Value derived from the session results, recomputed only when new results arrive
+    
+    The memory the cached values hold counts against the session's results memory cap.
+    """
+    cache = st.session_state.get('results_views')
+    if cache is None or cache['version'] != st.session_state.results_version:
+        cache = {'version': st.session_state.results_version, 'values': {}, 'nbytes': 0}
+        st.session_state.results_views = cache
+    if key not in cache['values']:
+        value = cache['values'][key] = compute()
+        cache['nbytes'] += approx_nbytes(value)
+        st.session_state.results_history.track_views(cache['nbytes'])
+    return cache['values'][key]
+
+def get_results_statistics(circ_name, results_data):
+    """Statistics of one circuit's session results, built from its rows only when the run did not provide them"""
+    statistics = st.session_state.results_statistics
+    if circ_name not in statistics:
+        statistics[circ_name] = RunStatistics.from_rows(results_data)
+    return statistics[circ_name]
 
 def render_results_section():
     """Render results display section"""
     if st.session_state.results_data:
         st.header("Results")
+        render_results_history()
         
-        df = pd.DataFrame(st.session_state.results_data)
-        st.dataframe(df, use_container_width=True)
+        results_data = st.session_state.results_data
+        frame = cached_result_view('frame', lambda: results_to_frame(results_data))
+        st.dataframe(frame, use_container_width=True)
         
-        # Download CSV
-        csv = get_results_csv(st.session_state.results_data)
-        st.download_button(
+        # Downloads are generated when clicked, so no payload is kept in the session
+        timestamp = format_timestamp()
+        run_id = st.session_state.results_history.current
+        col_csv, col_parquet = st.columns(2)
+        col_csv.download_button(
             label="Download Results CSV",
-            data=csv,
-            file_name=f"quantum_results_{format_timestamp()}.csv",
+            data=lambda: get_results_csv(results_data, run_id),
+            file_name=f"quantum_results_{timestamp}.csv",
             mime="text/csv"
         )
+        if check_pyarrow():
+            col_parquet.download_button(
+                label="Download Results Parquet",
+                data=lambda: run_parquet_bytes(results_data, run_id),
+                file_name=f"quantum_results_{timestamp}.parquet",
+                mime="application/vnd.apache.parquet"
+            )
         
         # Quick stats
-        total_shots, total_1s, success_rate = calculate_success_metrics(df)
+        total_shots, top_outcome, top_count, success_rate = cached_result_view(
+            'metrics', lambda: calculate_success_metrics(results_data)
+        )
         
         col1a, col1b, col1c = st.columns(3)
         col1a.metric("Total Shots", total_shots)
-        col1b.metric("'1' Results", total_1s)
+        col1b.metric(f"'{top_outcome}' Results", top_count)
         col1c.metric("Success Rate", f"{success_rate:.1f}%")
+        
+        names = list(dict.fromkeys(row_values(results_data, 'circ_name')))
+        if 'sweep_point' in results_data[0]:
+            render_sweep_results(results_data)
+        else:
+            if st.session_state.results_precision:
+                render_precision_summary(st.session_state.results_precision, results_data, names)
+            if len(names) > 1:
+                render_circuit_comparison(results_data)
+                selected = st.selectbox("Circuit Details", names)
+                circuit_rows = cached_result_view(('rows', selected), lambda: results_data.where('circ_name', selected))
+            else:
+                selected, circuit_rows = names[0], results_data
+            
+            statistics = get_results_statistics(selected, circuit_rows)
+            render_statistics(statistics)
+            if circuit_rows.has_values('readout_error').any():
+                render_mitigated_results(circuit_rows, statistics, selected)
+        
+        if results_data.has_values('submit_s').any():
+            render_latency_breakdown(results_data)
+
+def render_results_history():
+    """Let the user switch between the runs of this session"""
+    history = st.session_state.results_history
+    runs = history.runs()
+    if len(runs) < 2:
+        return
+    
+    keys = [key for key, _, _ in runs][::-1]
+    labels = {key: label + ("" if in_memory else " (on disk)") for key, label, in_memory in runs}
+    selected = st.selectbox(
+        "Previous runs", keys, index=keys.index(history.current), format_func=labels.get
+    )
+    if selected != history.current:
+        select_results(selected)
+        st.rerun()
+    st.caption(f"{len(runs)} runs this session, {history.memory_bytes / 2 ** 20:.1f} MB in memory")
+
+def render_precision_summary(precision, results_data, names):
+    """Report whether an adaptive run reached its target interval width in every circuit"""
+    limiting = {}
+    for name in names:
+        rows = cached_result_view(('rows', name), lambda: results_data.where('circ_name', name))
+        limiting[name] = precision.limiting(get_results_statistics(name, rows))
+    
+    jobs = len(results_data) // len(names)
+    if all(width <= precision.width for _, width in limiting.values()):
+        st.success(f"🎯 Target interval width {precision.width:.3g} reached after {jobs} jobs")
+    else:
+        st.warning(f"🎯 Stopped after {jobs} jobs before reaching the target interval width {precision.width:.3g}")
+    st.caption(" · ".join(
+        f"{name}: P({label}) interval width {width:.4f}" for name, (label, width) in limiting.items()
+    ))
+
+def render_circuit_comparison(results_data):
+    """Render outcome probabilities of every circuit in a workspace run side by side"""
+    pd = load_module('pandas')
+    st.subheader("Circuit Comparison")
+    
+    by_circuit = cached_result_view('by_circuit', lambda: aggregate_by_circuit(results_data))
+    totals, probabilities = by_circuit['totals'], by_circuit['probabilities']
+    shots = totals.sum(axis=1)
+    top = probabilities.argmax(axis=1)
+    low, high = wilson_interval(totals[np.arange(len(top)), top], shots)
+    
+    st.dataframe(
+        pd.DataFrame({
+            'circuit': by_circuit['names'],
+            'hash': by_circuit['hashes'],
+            'jobs': by_circuit['jobs'],
+            'shots': shots,
+            'top_outcome': [by_circuit['labels'][column] for column in top],
+            'probability': probabilities[np.arange(len(top)), top],
+            'wilson_low': low,
+            'wilson_high': high
+        }),
+        use_container_width=True
+    )
+    
+    # Outcomes that are likely for at least one circuit
+    columns = np.argsort(-probabilities.max(axis=0), kind='stable')[:STATS_TOP_OUTCOMES]
+    chart = pd.DataFrame(
+        probabilities[:, columns],
+        index=pd.Index(by_circuit['names'], name='circuit'),
+        columns=[by_circuit['labels'][column] for column in columns]
+    )
+    st.bar_chart(chart)
+    
+    st.caption("Total variation distance between circuits (0 = identical distributions, 1 = disjoint)")
+    st.dataframe(
+        pd.DataFrame(
+            total_variation_distances(probabilities),
+            index=by_circuit['names'],
+            columns=by_circuit['names']
+        ).round(4),
+        use_container_width=True
+    )
+
+def render_statistics(statistics):
+    """Render confidence intervals, job-to-job consistency and drift of the repeated jobs"""
+    pd = load_module('pandas')
+    st.subheader("Statistics")
+    confidence = f"{statistics.confidence:.0%}"
+    
+    st.dataframe(pd.DataFrame(statistics.outcome_table()), use_container_width=True)
+    st.caption(
+        f"Wilson intervals ({confidence}) reflect shot noise only; bootstrap intervals resample "
+        f"whole jobs and include job-to-job variation. Drift is the fitted change in probability "
+        f"from the first to the last job."
+    )
+    
+    consistency = statistics.consistency()
+    if consistency:
+        col_p, col_chi2, col_jobs = st.columns(3)
+        col_p.metric("Consistency p-value", f"{consistency['p_value']:.3g}")
+        col_chi2.metric("Reduced χ²", f"{consistency['reduced_chi2']:.2f}")
+        col_jobs.metric("Jobs", statistics.num_jobs)
+        if consistency['p_value'] < 1 - statistics.confidence:
+            st.warning("⚠️ Jobs disagree more than shot noise explains; check the drift column")
+        if consistency['min_expected'] < 5:
+            st.caption("Some expected counts are below 5, so the chi-square p-value is approximate.")
+    
+    per_job = statistics.per_job(top=1)
+    if len(per_job['idx']) > 1:
+        label = per_job['labels'][0]
+        chart = pd.DataFrame(
+            {
+                f"P({label})": per_job['probabilities'][:, 0],
+                'low': per_job['ci_low'][:, 0],
+                'high': per_job['ci_high'][:, 0]
+            },
+            index=pd.Index(per_job['idx'], name='job')
+        )
+        st.line_chart(chart)
+
+def render_mitigated_results(results_data, statistics, circ_name):
+    """Render raw and readout-mitigated probabilities of the most likely outcomes side by side"""
+    pd = load_module('pandas')
+    st.subheader("Readout Mitigation")
+    
+    mitigated = cached_result_view(('mitigation', circ_name), lambda: mitigated_distribution(results_data))
+    if mitigated is None:
+        st.caption("Not every job carries readout errors (or a register is wider than 64 bits), so counts are shown raw.")
+        return
+    
+    pooled = statistics.pooled()
+    mitigated_outcomes, mitigated_probabilities = mitigated
+    top = np.argsort(-mitigated_probabilities, kind='stable')[:STATS_TOP_OUTCOMES]
+    raw = dict(zip(pooled['labels'], pooled['probabilities']))
+    num_bits = max(row_values(results_data, 'num_bits'))
+    
+    table = pd.DataFrame({'outcome': [outcome_label(o, num_bits) for o in mitigated_outcomes[top]]})
+    table['raw'] = [float(raw.get(label, 0.0)) for label in table['outcome']]
+    table['mitigated'] = mitigated_probabilities[top]
+    st.dataframe(table, use_container_width=True)
+    st.caption(f"Calibration from {results_data[0].get('readout_calibrated_at') or 'unknown time'}")
+
+def render_latency_breakdown(results_data):
+    """Render where the time of each job went, stage by stage"""
+    pd = load_module('pandas')
+    st.subheader("Latency Breakdown")
+    
+    frame = cached_result_view('scalars', results_data.scalar_frame)
+    timed = frame[results_data.has_values('submit_s')]
+    chart = pd.DataFrame(
+        {stage[:-2]: timed[stage].fillna(0.0).to_numpy() for stage in BREAKDOWN_STAGES},
+        index=pd.Index(timed['idx'].to_numpy(), name='job')
+    )
+    st.bar_chart(chart)
+    
+    totals = chart.sum()
+    st.caption(" · ".join(f"{stage} {seconds:.2f} s" for stage, seconds in totals.items()))
+    if timed['queue_s'].isna().all():
+        st.caption("The backend reported no queue or execution timestamps, so the whole wait is counted as fetch.")
+    
+    st.download_button(
+        label="Download Server Metrics (Prometheus)",
+        data=stage_histograms.prometheus_text,
+        file_name=f"quantum_job_metrics_{format_timestamp()}.prom",
+        mime="text/plain",
+        help="Stage latency histograms of every job this server process has run, across all sessions"
+    )
+
+def render_sweep_results(results_data):
+    """Render outcome probabilities across the sweep grid"""
+    pd = load_module('pandas')
+    st.subheader("Sweep Results")
+    
+    names = [key[len('param_'):] for key in results_data[0] if key.startswith('param_')]
+    labels, point_values, probabilities = aggregate_sweep(results_data, names)
+    
+    if len(names) == 1:
+        chart = pd.DataFrame(probabilities, index=pd.Index(point_values[:, 0], name=names[0]), columns=labels)
+        st.line_chart(chart)
+    else:
+        table = pd.DataFrame(point_values, columns=names)
+        for column, label in enumerate(labels):
+            table[f"P({label})"] = probabilities[:, column]
+        st.dataframe(table, use_container_width=True)
 
 def render_chat_interface(groq_api_key):
     """Render AI chat interface"""
     st.header("🤖 AI Assistant Chat")
     
-    # Chat History Display
+    # Chat History Display (latest page only; older messages on request)
+    history = st.session_state.chat_history
+    hidden = max(len(history) - st.session_state.chat_visible, 0)
+    if hidden:
+        if st.button(f"Show earlier messages ({hidden} hidden)"):
+            st.session_state.chat_visible += CHAT_PAGE_SIZE
+            st.rerun()
+    if st.session_state.chat_summary and not hidden:
+        st.caption("Older messages were summarized to keep the conversation short.")
+    
     chat_container = st.container()
     with chat_container:
         st.markdown('<div class="chat-container">', unsafe_allow_html=True)
         
-        for message in st.session_state.chat_history:
+        for position, message in enumerate(history[hidden:], start=hidden):
             if message["role"] == "user":
                 st.markdown(f'<div class="user-message">👤 You: {message["content"]}</div>', unsafe_allow_html=True)
             else:
                 st.markdown(f'<div class="assistant-message">🤖 Assistant: {message["content"]}</div>', unsafe_allow_html=True)
+                if "OPENQASM" in message["content"]:
+                    render_qasm_candidates(message["content"], position)
         
         st.markdown('</div>', unsafe_allow_html=True)
     
@@ -167,20 +813,23 @@ def render_chat_interface(groq_api_key):
         with col2a:
             if st.button("Send"):
                 if user_input.strip() and groq_api_key:
+                    # Earlier turns and the editor QASM go along as context
+                    response_stream = stream_llm_response(
+                        user_input, groq_api_key,
+                        history=list(st.session_state.chat_history),
+                        summary=st.session_state.chat_summary,
+                        qasm=st.session_state.current_qasm
+                    )
+                    
                     # Add user message to history
                     add_message_to_chat("user", user_input)
                     
-                    # Get AI response
-                    with st.spinner("AI is thinking..."):
-                        ai_response = get_llm_response(user_input, groq_api_key)
+                    # Stream AI response as it is generated
+                    with chat_container:
+                        ai_response = st.write_stream(response_stream)
                     
-                    # Add AI response to history
+                    # Add AI response to history; QASM in it gets an apply button
                     add_message_to_chat("assistant", ai_response)
-                    
-                    # Check if response contains QASM code and offer to update
-                    if "OPENQASM" in ai_response:
-                        st.info("💡 The AI response contains QASM code. You can copy it to the QASM editor on the left.")
-                    
                     st.rerun()
                 elif not groq_api_key:
                     st.error("❌ Please provide Groq API key")
@@ -192,6 +841,24 @@ def render_chat_interface(groq_api_key):
                 clear_chat_history()
                 st.rerun()
 
+def render_qasm_candidates(response, position):
+    """Offer each QASM program in an assistant message for the editor"""
+    for number, (qasm_code, is_valid, message) in enumerate(extract_qasm_candidates(response), start=1):
+        col_apply, col_add, col_status = st.columns([1, 1, 2])
+        with col_apply:
+            if st.button("📥 Apply to editor", key=f"apply_qasm_{position}_{number}", disabled=not is_valid):
+                st.session_state.current_qasm = qasm_code
+                st.rerun()
+        with col_add:
+            if st.button("🗂️ Add to workspace", key=f"add_qasm_{position}_{number}", disabled=not is_valid):
+                add_to_workspace(f"assistant_{position}_{number}", qasm_code)
+                st.rerun()
+        with col_status:
+            if is_valid:
+                st.caption(f"✅ Circuit {number}: {message}")
+            else:
+                st.caption(f"❌ Circuit {number} does not parse: {message}")
+
 def render_quick_actions(groq_api_key):
     """Render quick action buttons"""
     st.header("⚡ Quick Actions")
@@ -202,7 +869,7 @@ def render_quick_actions(groq_api_key):
         if st.button("Generate Bell State"):
             if groq_api_key:
                 add_message_to_chat("user", QUICK_ACTIONS["bell_state"])
-                ai_response = process_quick_action("bell_state", groq_api_key)
+                ai_response = st.write_stream(stream_quick_action("bell_state", groq_api_key))
                 add_message_to_chat("assistant", ai_response)
                 st.rerun()
             else:
@@ -212,7 +879,7 @@ def render_quick_actions(groq_api_key):
         if st.button("🔄 Generate Random Circuit"):
             if groq_api_key:
                 add_message_to_chat("user", QUICK_ACTIONS["random_circuit"])
-                ai_response = process_quick_action("random_circuit", groq_api_key)
+                ai_response = st.write_stream(stream_quick_action("random_circuit", groq_api_key))
                 add_message_to_chat("assistant", ai_response)
                 st.rerun()
             else:
@@ -235,6 +902,23 @@ def render_status_indicators(ibm_api_key, groq_api_key):
     with col2h:
         qiskit_status = "🟢 Available" if check_qiskit() else "🔴 Not Available"
         st.markdown(f"**Qiskit:** {qiskit_status}")
+    
+    render_import_report()
+
+def render_import_report():
+    """Render first-use import costs and the duration of the previous rerun"""
+    with st.expander("⏱️ Startup & Rerun Timings"):
+        if st.session_state.last_rerun_ms is not None:
+            st.markdown(f"**Previous rerun:** {st.session_state.last_rerun_ms:.0f} ms")
+        
+        report = import_report()
+        if report:
+            st.dataframe(
+                [{'module': name, 'import_ms': round(ms, 1)} for name, ms in report],
+                use_container_width=True
+            )
+        else:
+            st.caption("No heavy modules loaded yet.")
 
 def render_footer():
     """Render footer"""
@@ -2,41 +2,98 @@
 Utility functions for the IBM Quantum Circuit JOB Automation application
 """
 
+import os
+import uuid
 import streamlit as st
 from datetime import datetime
-import pandas as pd
-from config import DEFAULT_QASM, DEFAULT_SHOTS, DEFAULT_JOBS_COUNT
+from result_processing import aggregate_counts
+from result_export import results_csv_file
+from result_table import ResultHistory, remove_stale_spills
+from chat_context import evict_messages
+from circuit_compiler import check_qasm, circuit_hash
+# Library availability checks, re-exported for the UI
+from dependencies import check_qiskit, check_groq
+from config import (
+    DEFAULT_QASM, DEFAULT_SHOTS, DEFAULT_JOBS_COUNT, DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_EXECUTION_MODE, DEFAULT_OPTIMIZATION_LEVEL, CHAT_HISTORY_LIMIT, CHAT_PAGE_SIZE,
+    DEFAULT_READOUT_MITIGATION, RESULT_CACHE_MAX_AGE, DEFAULT_TARGET_CI_WIDTH, RESULTS_SPILL_DIR
+)
 
-# Check library availability
-def check_qiskit():
-    """Check if Qiskit is available"""
-    try:
-        from qiskit import QuantumCircuit
-        from qiskit_ibm_runtime import QiskitRuntimeService, SamplerV2 as Sampler
-        return True
-    except ImportError:
-        return False
-
-def check_groq():
-    """Check if Groq is available"""
-    try:
-        from groq import Groq
-        return True
-    except ImportError:
-        return False
 
 def init_session_state():
     """Initialize Streamlit session state variables"""
+    if 'session_id' not in st.session_state:
+        # Identifies this browser session to the shared submission scheduler
+        st.session_state.session_id = uuid.uuid4().hex
     if 'chat_history' not in st.session_state:
         st.session_state.chat_history = []
+    if 'last_rerun_ms' not in st.session_state:
+        st.session_state.last_rerun_ms = None
+    if 'chat_summary' not in st.session_state:
+        st.session_state.chat_summary = ""
+    if 'chat_visible' not in st.session_state:
+        st.session_state.chat_visible = CHAT_PAGE_SIZE
     if 'current_qasm' not in st.session_state:
         st.session_state.current_qasm = DEFAULT_QASM
     if 'shots' not in st.session_state:
         st.session_state.shots = DEFAULT_SHOTS
     if 'jobs_count' not in st.session_state:
         st.session_state.jobs_count = DEFAULT_JOBS_COUNT
+    if 'max_in_flight' not in st.session_state:
+        st.session_state.max_in_flight = DEFAULT_MAX_IN_FLIGHT
+    if 'execution_mode' not in st.session_state:
+        st.session_state.execution_mode = DEFAULT_EXECUTION_MODE
+    if 'optimization_level' not in st.session_state:
+        st.session_state.optimization_level = DEFAULT_OPTIMIZATION_LEVEL
+    if 'readout_mitigation' not in st.session_state:
+        st.session_state.readout_mitigation = DEFAULT_READOUT_MITIGATION
+    if 'adaptive_enabled' not in st.session_state:
+        # Adaptive shot allocation: jobs_count becomes the budget
+        st.session_state.adaptive_enabled = False
+    if 'target_ci_width' not in st.session_state:
+        st.session_state.target_ci_width = DEFAULT_TARGET_CI_WIDTH
+    if 'target_outcomes' not in st.session_state:
+        st.session_state.target_outcomes = ""
+    if 'active_precision' not in st.session_state:
+        st.session_state.active_precision = None
+    if 'reuse_results' not in st.session_state:
+        # Result reuse policy: off, or cached rows up to this age in hours
+        st.session_state.reuse_results = False
+    if 'reuse_max_age_hours' not in st.session_state:
+        st.session_state.reuse_max_age_hours = RESULT_CACHE_MAX_AGE / 3600
+    if 'reuse_refresh' not in st.session_state:
+        st.session_state.reuse_refresh = False
+    if 'workspace' not in st.session_state:
+        # Named circuits run together as one campaign
+        st.session_state.workspace = []
+    if 'workspace_enabled' not in st.session_state:
+        st.session_state.workspace_enabled = False
+    if 'sweep_enabled' not in st.session_state:
+        st.session_state.sweep_enabled = False
+    if 'sweep_ranges' not in st.session_state:
+        st.session_state.sweep_ranges = {}
+    if 'active_run_id' not in st.session_state:
+        st.session_state.active_run_id = None
+    if 'run_outcome' not in st.session_state:
+        st.session_state.run_outcome = None
+    if 'recovered_account' not in st.session_state:
+        st.session_state.recovered_account = None
+    if 'pending_jobs' not in st.session_state:
+        st.session_state.pending_jobs = 0
+    if 'results_history' not in st.session_state:
+        # Columnar tables of this session's runs, spilled to disk past the memory cap
+        remove_stale_spills()
+        st.session_state.results_history = ResultHistory(
+            os.path.join(RESULTS_SPILL_DIR, st.session_state.session_id)
+        )
     if 'results_data' not in st.session_state:
         st.session_state.results_data = []
+    if 'results_version' not in st.session_state:
+        st.session_state.results_version = 0
+    if 'results_statistics' not in st.session_state:
+        st.session_state.results_statistics = {}
+    if 'results_precision' not in st.session_state:
+        st.session_state.results_precision = None
     if 'job_running' not in st.session_state:
         st.session_state.job_running = False
 
@@ -45,43 +102,99 @@ def validate_qasm(qasm_code):
     if not check_qiskit():
         return False, "Qiskit not available"
     
-    try:
-        from qiskit import QuantumCircuit
-        qc = QuantumCircuit.from_qasm_str(qasm_code)
-        return True, f"Circuit: {qc.num_qubits} qubits, {qc.depth()} depth"
-    except Exception as e:
-        return False, str(e)
+    return check_qasm(qasm_code)
 
 def format_timestamp():
     """Get formatted timestamp for file names"""
     return datetime.now().strftime('%Y%m%d_%H%M%S')
 
-def calculate_success_metrics(results_df):
-    """Calculate success metrics from results dataframe"""
-    if results_df.empty:
-        return 0, 0, 0
+def calculate_success_metrics(results_data):
+    """Calculate total shots and the most frequent outcome across all jobs"""
+    if not results_data:
+        return 0, None, 0, 0
+    
+    aggregate = aggregate_counts(results_data)
+    if not aggregate['total_shots']:
+        return 0, None, 0, 0
+    
+    top = int(aggregate['totals'].argmax())
+    top_count = int(aggregate['totals'][top])
+    success_rate = aggregate['probabilities'][top] * 100
     
-    total_shots = sum(results_df['count0'] + results_df['count1'])
-    total_1s = sum(results_df['count1'])
-    success_rate = (total_1s / total_shots * 100) if total_shots > 0 else 0
+    return aggregate['total_shots'], aggregate['labels'][top], top_count, success_rate
+
+def results_label(table):
+    """Short description of a run for the run history"""
+    names = list(dict.fromkeys(name for name in table.column('circ_name') if name))
+    started = table.column('timestamp')[0] if len(table) else None
+    circuits = ', '.join(names[:3]) + (f" +{len(names) - 3}" if len(names) > 3 else "")
+    return f"{started or 'unknown time'} · {circuits or 'circuit'} · {len(table)} rows"
+
+def set_results(results_data, statistics=None, precision=None, run_id=None):
+    """Replace the session results and invalidate cached tables and exports
     
-    return total_shots, total_1s, success_rate
+    Rows are stored as a columnar ``ResultTable`` in the session's run
+    history under ``run_id``. ``statistics`` maps circuit names to the run's
+    incrementally built ``RunStatistics``; circuits without one are rebuilt
+    from the rows on first use. ``precision`` is the target of an adaptive
+    run.
+    """
+    history = st.session_state.results_history
+    table = history.table(results_data)
+    history.add(table, results_label(table), run_id)
+    show_results(table, statistics, precision)
+
+def show_results(table, statistics=None, precision=None):
+    """Display ``table`` as the session results"""
+    st.session_state.results_data = table
+    st.session_state.results_statistics = dict(statistics or {})
+    st.session_state.results_precision = precision
+    st.session_state.results_version += 1
+
+def select_results(key):
+    """Display an earlier run of this session, loading it back from disk if it was spilled"""
+    show_results(st.session_state.results_history.get(key))
 
 def add_message_to_chat(role, content):
-    """Add a message to chat history"""
+    """Add a message to chat history, folding the oldest into the summary past the cap"""
     st.session_state.chat_history.append({
         "role": role,
         "content": content
     })
+    st.session_state.chat_history, st.session_state.chat_summary = evict_messages(
+        st.session_state.chat_history, st.session_state.chat_summary, CHAT_HISTORY_LIMIT
+    )
+
+def add_to_workspace(name, qasm_code):
+    """Add a circuit to the workspace under a unique name; returns the name it is listed under
+    
+    A circuit whose QASM is already in the workspace is not added twice.
+    """
+    workspace = st.session_state.workspace
+    code_hash = circuit_hash(qasm_code)
+    for entry in workspace:
+        if entry['hash'] == code_hash:
+            return entry['name']
+    
+    base = name.strip() or "circuit"
+    taken = {entry['name'] for entry in workspace}
+    unique, number = base, 2
+    while unique in taken:
+        unique, number = f"{base}_{number}", number + 1
+    
+    workspace.append({'name': unique, 'qasm': qasm_code, 'hash': code_hash})
+    return unique
+
+def remove_from_workspace(name):
+    """Remove a circuit from the workspace"""
+    st.session_state.workspace = [entry for entry in st.session_state.workspace if entry['name'] != name]
 
 def clear_chat_history():
     """Clear the chat history"""
     st.session_state.chat_history = []
+    st.session_state.chat_summary = ""
+    st.session_state.chat_visible = CHAT_PAGE_SIZE
 
-def get_results_csv(results_data):
-    """Convert results data to CSV format"""
-    if not results_data:
-        return ""
-    
-    df = pd.DataFrame(results_data)
-    return df.to_csv(index=False)
\ No newline at end of file
+def get_results_csv(results_data, run_id=None):
+    """Results as a CSV file written chunk by chunk, open for reading (see ``results_csv_file``)"""
+    return results_csv_file(results_data, run_id)
\ No newline at end of file